@@ -0,0 +1,211 @@
+import functools
+import weakref
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Value
+from django.utils import timezone
+
+from api.models import ExpressionOfInterest, OpenSourceProject, User, UserAnalytics
+
+
+ANALYTICS_CHUNK_SIZE = 500
+
+# Users to refresh when the open transaction of each connection commits
+# (see schedule_analytics_refresh)
+_pending_refreshes = weakref.WeakKeyDictionary()
+
+
+def compute_users_analytics(user_ids, using=None):
+    """
+    Compute the analytics of many users from the source tables.
+
+    Each chunk of ``ANALYTICS_CHUNK_SIZE`` users costs a single query, the
+    union of the four name lists, whatever the number of users. The counts
+    are the lengths of the lists. Lists keep the order in which the rows
+    were created, so the summary matches what the endpoint used to return.
+
+    Args:
+        user_ids: Iterable of user primary keys.
+        using: Alias of the database to read, the router's choice by default.
+
+    Returns:
+        A dict mapping each user id to a dict of UserAnalytics field values.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    names = {
+        'projects_name': defaultdict(list),
+        'collaborations_name': defaultdict(list),
+        'interests_project_name': defaultdict(list),
+        'skills_name': defaultdict(list),
+    }
+    for start in range(0, len(user_ids), ANALYTICS_CHUNK_SIZE):
+        chunk = user_ids[start:start + ANALYTICS_CHUNK_SIZE]
+        # (user id, name, row id, name list) rows of every list
+        queries = [
+            OpenSourceProject.objects.using(using).filter(creator_id__in=chunk).values_list(
+                'creator_id', 'project_name', 'id', Value('projects_name')),
+            OpenSourceProject.collaborators.through.objects.using(using).filter(user_id__in=chunk).values_list(
+                'user_id', 'opensourceproject__project_name', 'id', Value('collaborations_name')),
+            ExpressionOfInterest.objects.using(using).filter(user_id__in=chunk).values_list(
+                'user_id', 'project__project_name', 'id', Value('interests_project_name')),
+            User.programming_skills.through.objects.using(using).filter(user_id__in=chunk).values_list(
+                'user_id', 'programmingskill__name', 'id', Value('skills_name')),
+        ]
+        # Row ids of different tables interleave, but each list stays in order
+        for user_id, name, _, field in queries[0].union(*queries[1:], all=True).order_by('id'):
+            names[field][user_id].append(name)
+
+    analytics = {}
+    for user_id in user_ids:
+        projects_name = names['projects_name'][user_id]
+        collaborations_name = names['collaborations_name'][user_id]
+        interests_project_name = names['interests_project_name'][user_id]
+        skills_name = names['skills_name'][user_id]
+        analytics[user_id] = {
+            'projects_as_creator': len(projects_name),
+            'projects_name': projects_name,
+            'collaborations': len(collaborations_name),
+            'collaborations_name': collaborations_name,
+            'interests': len(interests_project_name),
+            'interests_project_name': interests_project_name,
+            'skills': len(skills_name),
+            'skills_name': skills_name,
+        }
+    return analytics
+
+
+def compute_user_analytics(user_id):
+    """
+    Compute the analytics of a single user, see ``compute_users_analytics``.
+    """
+    return compute_users_analytics([user_id])[user_id]
+
+
+def refresh_user_analytics(user_ids):
+    """
+    Recompute and store the analytics of the given users right away.
+
+    Signal handlers go through ``schedule_analytics_refresh`` instead. Users
+    that no longer exist are skipped.
+
+    Args:
+        user_ids: Iterable of user primary keys.
+
+    Returns:
+        A dict mapping each refreshed user id to its UserAnalytics row.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    # Existing users, with the primary key of their summary if they have one.
+    # Everything runs on the primary: a lagging replica could miss a
+    # summary just inserted, which the insert below would then conflict
+    # with, or rows the stored summaries would then permanently miss
+    existing = dict(User.objects.using(DEFAULT_DB_ALIAS)
+                    .filter(pk__in=user_ids).values_list('pk', 'analytics'))
+
+    now = timezone.now()
+    summaries = {
+        user_id: UserAnalytics(user_id=user_id, updated_at=now, **values)
+        for user_id, values in compute_users_analytics(existing, using=DEFAULT_DB_ALIAS).items()
+    }
+    fields = [field.name for field in UserAnalytics._meta.concrete_fields
+              if not field.primary_key]
+    UserAnalytics.objects.using(DEFAULT_DB_ALIAS).bulk_update(
+        [summary for user_id, summary in summaries.items() if existing[user_id]],
+        fields, batch_size=ANALYTICS_CHUNK_SIZE)
+    # Another transaction refreshing the same new user may insert its summary
+    # first; update it then instead of failing after the commit
+    UserAnalytics.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+        [summary for user_id, summary in summaries.items() if not existing[user_id]],
+        batch_size=ANALYTICS_CHUNK_SIZE, update_conflicts=True,
+        unique_fields=['user'], update_fields=fields)
+    return summaries
+
+
+def schedule_analytics_refresh(user_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Refresh the analytics of the given users once the current transaction
+    commits, or right away outside a transaction.
+
+    The users are collected per connection, and the first callback to run
+    at commit refreshes all of them with a single ``refresh_user_analytics``
+    call, however many rows the transaction changed: deleting a project
+    with hundreds of interests or accepting a batch of them costs a
+    constant number of queries. Users left over by a rolled back
+    transaction are refreshed along with the next ones, which is harmless.
+
+    Args:
+        user_ids: Iterable of user primary keys.
+        using: Alias of the database the changes were written to.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    connection = connections[using]
+    _pending_refreshes.setdefault(connection, set()).update(user_ids)
+    transaction.on_commit(functools.partial(_refresh_pending, connection), using=using)
+
+
+def _refresh_pending(connection):
+    refresh_user_analytics(_pending_refreshes.pop(connection, ()))
+
+
+def get_users_analytics_summaries(user_ids):
+    """
+    Return the stored analytics of many users, building missing rows.
+
+    Args:
+        user_ids: Iterable of user primary keys.
+
+    Returns:
+        A dict mapping user ids to UserAnalytics rows. Ids of users that do
+        not exist are left out.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    summaries = {}
+    for start in range(0, len(user_ids), ANALYTICS_CHUNK_SIZE):
+        summaries.update(UserAnalytics.objects.in_bulk(
+            user_ids[start:start + ANALYTICS_CHUNK_SIZE]))
+    missing = [user_id for user_id in user_ids if user_id not in summaries]
+    if missing:
+        summaries.update(refresh_user_analytics(missing))
+    return summaries
+
+
+def get_user_analytics_summary(user_id):
+    """
+    Return the stored analytics of a user, building the row on first access.
+
+    Returns:
+        The UserAnalytics row, or None if the user does not exist.
+    """
+    return get_users_analytics_summaries([user_id]).get(user_id)
+
+
+def serialize_user_analytics(summary):
+    """
+    Response payload of the get_user_analytics endpoint.
+    """
+    return {
+        'user_projects_as_creator': summary.projects_as_creator,
+        'projects_name': summary.projects_name,
+        'user_collaborations': summary.collaborations,
+        'collaborations_name': summary.collaborations_name,
+        'user_interests': summary.interests,
+        'interests_project_name': summary.interests_project_name,
+        'user_skills': summary.skills_name,
+    }
+
+
+def project_user_ids(project):
+    """
+    Users whose analytics mention the given project.
+    """
+    collaborators = OpenSourceProject.collaborators.through.objects.filter(
+        opensourceproject_id=project.pk).values_list('user_id')
+    interested = ExpressionOfInterest.objects.filter(project_id=project.pk).values_list('user_id')
+    user_ids = {user_id for user_id, in collaborators.union(interested)}
+    user_ids.add(project.creator_id)
+    return user_ids
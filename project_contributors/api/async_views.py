@@ -0,0 +1,291 @@
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.request import Request
+
+from api.analytics import get_user_analytics_summary, serialize_user_analytics
+from api.authentication import CachedTokenAuthentication
+from api.cache import LISTING_VERSION, aget_cache_version, listing_cache
+from api.conditional import ainterests_etag, not_modified, request_etag, set_validator
+from api.hashing import aauthenticate, amake_password
+from api.models import ExpressionOfInterest, OpenSourceProject, UserAnalytics
+from api.pagination import AvailableProjectsPagination, ProjectInterestsPagination
+from api.serializers import ExpressionOfInterestSerializer
+from api.skills import user_skill_names
+
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def _request_data(request):
+    """
+    Read a JSON or form encoded request body into a dict.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+async def _authenticate(request):
+    """
+    Token authentication for async views.
+
+    Returns:
+        ``(user, None)`` on success, or ``(None, response)`` with the 401
+        response DRF would have sent.
+    """
+    authenticator = CachedTokenAuthentication()
+    try:
+        result = await authenticator.aauthenticate(request)
+    except AuthenticationFailed as e:
+        detail = e.detail
+    else:
+        if result is not None:
+            return result[0], None
+        detail = 'Authentication credentials were not provided.'
+    response = JsonResponse({'detail': str(detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+    return None, response
+
+
+def _paginated_response(paginator, data):
+    """
+    JsonResponse counterpart of ``paginator.get_paginated_response``.
+    """
+    response = JsonResponse(data, safe=False, status=status.HTTP_200_OK)
+    link_header = paginator.get_link_header()
+    if link_header:
+        response['Link'] = link_header
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def create_user(request):
+    data = _request_data(request)
+    username = data.get('username')
+    password = data.get('password')
+    email = data.get('email')
+
+    logger.info("Received request data: username=%s, email=%s", username, email)
+
+    if not (username and password and email):
+        logger.error('Please provide username, password, and email')
+        return JsonResponse({'error': 'Please provide username, password, and email'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if await User.objects.filter(username=username).aexists():
+        logger.warning("Username '%s' already exists", username)
+        return JsonResponse({'error': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if await User.objects.filter(email=email).aexists():
+        logger.warning("Email '%s' already exists", email)
+        return JsonResponse({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Hash on the password hashing executor, not on the event loop
+    user = User(
+        username=User.normalize_username(username),
+        email=User.objects.normalize_email(email),
+        password=await amake_password(password),
+        age=data.get('age'),
+        country=data.get('country'),
+        residence=data.get('residence')
+    )
+    await user.asave()
+    logger.info("User '%s' created successfully", username)
+
+    return JsonResponse({'message': 'User created successfully'}, status=status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_POST
+async def reset_password(request):
+    data = _request_data(request)
+    username = data.get('username')
+    password = data.get('password')
+
+    if not username or not password:
+        logger.error('Username and password are required')
+        return JsonResponse({'message': 'Username and password are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        user = await User.objects.aget(username=username)
+    except User.DoesNotExist:
+        logger.error('User does not exist')
+        return JsonResponse({'message': 'User does not exist'}, status=status.HTTP_404_NOT_FOUND)
+
+    user.password = await amake_password(password)
+    await user.asave(update_fields=['password'])
+
+    logger.info('Password reset for user: %s', username)
+    return JsonResponse({'message': 'Password reset successfully'}, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@require_POST
+async def obtain_auth_token(request):
+    data = _request_data(request)
+    username = data.get('username')
+    password = data.get('password')
+
+    if not username or not password:
+        logger.error('Username and password are required')
+        return JsonResponse({'non_field_errors': ['Must include "username" and "password".']}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Through AUTHENTICATION_BACKENDS, like ObtainAuthToken, on the password
+    # hashing executor
+    user = await aauthenticate(request, username=username, password=password)
+    if user is None:
+        logger.warning('Unable to log in with provided credentials')
+        return JsonResponse({'non_field_errors': ['Unable to log in with provided credentials.']}, status=status.HTTP_400_BAD_REQUEST)
+
+    token, _ = await Token.objects.aget_or_create(user=user)
+    return JsonResponse({'token': token.key}, status=status.HTTP_200_OK)
+
+
+@require_GET
+async def available_projects(request):
+    # Same validator and versioned cache as views.available_projects
+    version = await aget_cache_version(LISTING_VERSION)
+    etag = request_etag(request, version) if version is not None else None
+    response = not_modified(request, etag)
+    if response is not None:
+        logger.info('Available projects not modified')
+        return response
+
+    cache_enabled = listing_cache.enabled
+    if cache_enabled:
+        cache_key = listing_cache.key(request)
+        cached = await listing_cache.aget(cache_key, version)
+        if cached is not None:
+            serialized_projects, link_header = cached
+            response = JsonResponse(serialized_projects, safe=False, status=status.HTTP_200_OK)
+            if link_header:
+                response['Link'] = link_header
+            logger.info('Retrieved available projects from cache')
+            return set_validator(response, etag)
+
+    paginator = AvailableProjectsPagination()
+    available_projects = OpenSourceProject.objects.select_related('creator').filter(
+        current_collaborators__lt=F('maximum_collaborators'))
+
+    try:
+        page = await paginator.apaginate_queryset(available_projects, Request(request))
+    except NotFound:
+        logger.error('Invalid cursor')
+        return JsonResponse({'message': 'Invalid cursor'}, status=status.HTTP_404_NOT_FOUND)
+
+    serialized_projects = []
+    for project in page:
+        serialized_projects.append({
+            'id': project.id,
+            'project_name': project.project_name,
+            'description': project.description,
+            'maximum_collaborators': project.maximum_collaborators,
+            'current_collaborators': project.current_collaborators,
+            'creator': project.creator.username,
+            'status': project.status
+        })
+
+    if cache_enabled:
+        await listing_cache.aset(cache_key, version, (serialized_projects, paginator.get_link_header()))
+
+    logger.info('Retrieved available projects successfully')
+    return set_validator(_paginated_response(paginator, serialized_projects), etag)
+
+
+@require_GET
+async def project_interests(request, project_id):
+    user, error_response = await _authenticate(request)
+    if error_response is not None:
+        return error_response
+
+    try:
+        project = await OpenSourceProject.objects.only('creator_id').aget(id=project_id)
+    except OpenSourceProject.DoesNotExist:
+        logger.error('Project does not exist')
+        return JsonResponse({'message': 'Project does not exist'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Check if the current user is the creator of the project
+    if user.id != project.creator_id:
+        logger.warning('User is not authorized to see interests for this project')
+        return JsonResponse({'message': 'You are not authorized to see interests for this project'}, status=status.HTTP_403_FORBIDDEN)
+
+    interests = ExpressionOfInterest.objects.filter(project_id=project_id)
+
+    # Optionally filter by status
+    interest_status = request.GET.get('status')
+    if interest_status:
+        if interest_status not in dict(ExpressionOfInterest.STATUS_CHOICES):
+            logger.error('Invalid status filter: %s', interest_status)
+            return JsonResponse({'message': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        interests = interests.filter(status=interest_status)
+
+    etag = await ainterests_etag(request, interests)
+    response = not_modified(request, etag)
+    if response is not None:
+        logger.info('Project interests not modified')
+        return response
+
+    interests = interests.select_related('user')
+
+    paginator = ProjectInterestsPagination()
+    try:
+        page = await paginator.apaginate_queryset(interests, Request(request))
+    except NotFound:
+        logger.error('Invalid cursor')
+        return JsonResponse({'message': 'Invalid cursor'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Everything the serializer reads is loaded with the page and the skills
+    skill_names = await sync_to_async(user_skill_names)({interest.user_id for interest in page})
+    serializer = ExpressionOfInterestSerializer(page, many=True, context={'skill_names': skill_names})
+    return set_validator(_paginated_response(paginator, serializer.data), etag, private=True)
+
+
+@require_GET
+async def get_user_analytics(request, user_id):
+    user, error_response = await _authenticate(request)
+    if error_response is not None:
+        return error_response
+
+    # Users can see their own analytics, admins can see everyone's
+    if user_id != user.id and not user.is_staff:
+        logger.warning('User is not authorized to see analytics of another user')
+        return JsonResponse({'message': 'You are not authorized to see analytics of this user'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        try:
+            summary = await UserAnalytics.objects.aget(pk=user_id)
+        except UserAnalytics.DoesNotExist:
+            # First access: build the summary row, which takes a few writes
+            summary = await sync_to_async(get_user_analytics_summary)(user_id)
+        if summary is None:
+            logger.error('User does not exist')
+            return JsonResponse({'message': 'User does not exist'}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = request_etag(request, summary.updated_at.isoformat())
+        response = not_modified(request, etag)
+        if response is not None:
+            logger.info('User analytics not modified')
+            return response
+
+        logger.info('User analytics retrieved successfully')
+        response = JsonResponse(serialize_user_analytics(summary), status=status.HTTP_200_OK)
+        return set_validator(response, etag, private=True)
+    except Exception as e:
+        logger.error('Error retrieving user analytics: %s', e)
+        return JsonResponse({'message': 'Internal server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
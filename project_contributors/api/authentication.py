@@ -0,0 +1,173 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+
+class TokenCache:
+    """
+    Bounded, thread-safe LRU cache of token key -> (user, token) with a TTL.
+
+    The cache is per process. Entries are dropped explicitly when a token
+    is deleted or regenerated and when its user is saved (deactivation,
+    password change), see ``api/signals.py``. Changes made by other
+    processes become visible after at most ``TTL`` seconds.
+
+    Configured by the ``TOKEN_CACHE`` setting, a dict with ``MAX_SIZE``
+    (0 disables the cache) and ``TTL`` in seconds.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def config(self):
+        config = getattr(settings, 'TOKEN_CACHE', {})
+        return config.get('MAX_SIZE', 10000), config.get('TTL', 60)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, user, token = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return user, token
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, user, token):
+        max_size, ttl = self.config
+        if max_size <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        max_size, ttl = self.config
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': max_size,
+                'ttl': ttl,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            user_id = entry[1].pk
+            keys = self._keys_by_user.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[user_id]
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers token -> user lookups in ``token_cache``.
+
+    A cache hit saves the SELECT joining ``authtoken_token`` and the user
+    table that DRF runs on every authenticated request. Every request gets
+    its own copy of the cached user, so views can never leak state into
+    each other through it.
+
+    ``aauthenticate`` does the same for async views, with the cache miss
+    served by the async ORM.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token)
+        else:
+            user, token = cached
+        return copy.copy(user), token
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of ``authenticate`` for plain Django async views.
+
+        Returns:
+            ``(user, token)``, or None when the request carries no token.
+
+        Raises:
+            AuthenticationFailed: The header is malformed, the token is
+                unknown or its user is inactive.
+        """
+        key = self.get_token_key(request)
+        if key is None:
+            return None
+
+        cached = token_cache.get(key)
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related('user').aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+            user = token.user
+            token_cache.set(key, user, token)
+        else:
+            user, token = cached
+        return copy.copy(user), token
+
+    def get_token_key(self, request):
+        """
+        Read the token key from the Authorization header, see
+        ``TokenAuthentication.authenticate``.
+        """
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        elif len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.'))
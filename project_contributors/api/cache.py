@@ -0,0 +1,164 @@
+import hashlib
+import threading
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+
+from api.models import CacheVersion
+
+
+# Name of the CacheVersion rows guarding the available_projects responses.
+# Database triggers replace the token on every write to the projects table
+# or to a username (migration 0011), so there is nothing to bump in Python.
+# On PostgreSQL it is striped over several rows (migration 0014).
+LISTING_VERSION = 'available_projects'
+
+
+def _rows(name):
+    # The row of a group, or its stripes '<name>:<n>'
+    return CacheVersion.objects.filter(Q(name=name) | Q(name__startswith=f'{name}:'))
+
+
+def _versions(name):
+    return _rows(name).order_by('name').values_list('version', flat=True)
+
+
+def _combine(versions):
+    if len(versions) <= 1:
+        return versions[0] if versions else None
+    return hashlib.md5(':'.join(versions).encode()).hexdigest()
+
+
+def get_cache_version(name):
+    """
+    Current version token of a response group, or None if it has none.
+    The token of a striped group is a digest of all its stripes, which
+    changes whenever one of them is replaced.
+    """
+    return _combine(list(_versions(name)))
+
+
+async def aget_cache_version(name):
+    return _combine([version async for version in _versions(name)])
+
+
+def bump_cache_version(name):
+    """
+    Invalidate every cached response of a group maintained from Python.
+
+    Must run after the change it accounts for, or inside the same
+    transaction, so that no response built from the old data can be stored
+    under the new token.
+    """
+    token = uuid.uuid4().hex
+    if not _rows(name).update(version=token):
+        CacheVersion.objects.update_or_create(name=name, defaults={'version': token})
+
+
+class ResponseCache:
+    """
+    Cache of endpoint payloads guarded by a CacheVersion token.
+
+    Entries are stored as ``(version, value)`` in the Django cache named by
+    ``RESPONSE_CACHE['ALIAS']``, so any backend works, including the
+    per-process local memory cache and the file cache shared by the workers
+    of a host. The version is read from the database on every request: an
+    entry stored under another version is deleted instead of served and
+    counted as an eviction. Hit, miss and eviction counters are kept per
+    process and exposed by the metrics endpoint.
+
+    Configured by the ``RESPONSE_CACHE`` setting, a dict with ``ALIAS`` and
+    ``TIMEOUT`` in seconds (0 disables caching). Without a version row,
+    e.g. on a database the triggers do not support, nothing is cached.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def config(self):
+        config = getattr(settings, 'RESPONSE_CACHE', {})
+        return config.get('ALIAS', 'default'), config.get('TIMEOUT', 300)
+
+    @property
+    def enabled(self):
+        return self.config[1] > 0
+
+    @property
+    def cache(self):
+        return caches[self.config[0]]
+
+    def key(self, request):
+        """
+        Cache key of a request: its host and path (links in the payload are
+        absolute) and its query parameters in a canonical order.
+        """
+        params = urlencode(sorted(request.GET.lists()), doseq=True)
+        url = f'{request.get_host()}{request.path}?{params}'
+        digest = hashlib.md5(url.encode()).hexdigest()
+        return f'response:{self.name}:{digest}'
+
+    def get(self, key, version):
+        return self._lookup(key, version, self.cache.get(key))
+
+    async def aget(self, key, version):
+        return await self._alookup(key, version, await self.cache.aget(key))
+
+    def set(self, key, version, value):
+        if version is not None:
+            self.cache.set(key, (version, value), self.config[1])
+
+    async def aset(self, key, version, value):
+        if version is not None:
+            await self.cache.aset(key, (version, value), self.config[1])
+
+    def _lookup(self, key, version, entry):
+        if self._check(version, entry):
+            return entry[1]
+        if entry is not None:
+            self.cache.delete(key)
+        return None
+
+    async def _alookup(self, key, version, entry):
+        if self._check(version, entry):
+            return entry[1]
+        if entry is not None:
+            await self.cache.adelete(key)
+        return None
+
+    def _check(self, version, entry):
+        with self._lock:
+            if entry is not None and version is not None and entry[0] == version:
+                self.hits += 1
+                return True
+            self.misses += 1
+            if entry is not None:
+                self.evictions += 1
+            return False
+
+    def clear_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        alias, timeout = self.config
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'backend': settings.CACHES[alias]['BACKEND'],
+                'timeout': timeout,
+            }
+
+
+listing_cache = ResponseCache(LISTING_VERSION)
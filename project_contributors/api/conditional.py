@@ -0,0 +1,66 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+
+def make_etag(*parts):
+    """
+    Weak ETag built from the parts of a validator.
+
+    Weak because the same data can be rendered differently (JSON or the
+    browsable API), which If-None-Match comparisons allow.
+    """
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def request_etag(request, *parts):
+    """
+    ETag of a response that depends on ``parts`` and on the query string
+    (filters, cursor, ordering) of ``request``.
+    """
+    return make_etag(request.path, request.META.get('QUERY_STRING', ''), *parts)
+
+
+def not_modified(request, etag):
+    """
+    The 304 response to send if ``request`` already holds ``etag``.
+
+    Returns:
+        An HttpResponseNotModified, or None when the full response is due.
+    """
+    if etag is None:
+        return None
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+    return response
+
+
+def set_validator(response, etag, private=False):
+    """
+    Attach ``etag`` to a full response and ask clients to revalidate it on
+    every use, so that polling turns into conditional requests.
+    """
+    if etag is not None:
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True, private=private)
+    return response
+
+
+INTERESTS_VALIDATOR = {'count': Count('id'), 'last_change': Max('updated_at')}
+
+
+def interests_etag(request, interests):
+    """
+    ETag of a page of interests: the number of matching interests and the
+    latest change among them, read with one aggregate query.
+    """
+    validator = interests.aggregate(**INTERESTS_VALIDATOR)
+    return request_etag(request, validator['count'], validator['last_change'])
+
+
+async def ainterests_etag(request, interests):
+    validator = await interests.aaggregate(**INTERESTS_VALIDATOR)
+    return request_etag(request, validator['count'], validator['last_change'])
@@ -0,0 +1,51 @@
+"""
+Per-connection SQLite tuning of the production database profile (see
+``PRODUCTION_DATABASES`` in settings.py).
+"""
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def _set_transaction_mode(execute, sql, params, many, context):
+    if sql == 'BEGIN':
+        sql = f"BEGIN {context['connection'].settings_dict['TRANSACTION_MODE']}"
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Apply the ``PRAGMAS`` and ``TRANSACTION_MODE`` of the connection's
+    ``DATABASES`` entry to a new SQLite connection.
+
+    ``PRAGMAS`` maps pragma names to values, set in order. With
+    ``TRANSACTION_MODE`` the ``BEGIN`` Django issues when entering
+    ``transaction.atomic()`` becomes ``BEGIN <mode>``. IMMEDIATE takes the
+    write lock upfront: a deferred transaction that reads and then writes
+    fails at once with "database is locked" when another connection is
+    writing, without waiting for the busy timeout. (Django 5.1 has this as
+    the ``transaction_mode`` option.)
+    """
+    if connection.vendor != 'sqlite':
+        return
+    settings_dict = connection.settings_dict
+    # On the DB-API connection, so that the pragmas do not count against the
+    # query budget of the request that opened the connection
+    for name, value in (settings_dict.get('PRAGMAS') or {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+    mode = settings_dict.get('TRANSACTION_MODE')
+    if mode:
+        if mode not in TRANSACTION_MODES:
+            raise ValueError(f'TRANSACTION_MODE must be one of {", ".join(TRANSACTION_MODES)}')
+        # Reconnections send connection_created again. At the front of the
+        # list, clear of execute_wrapper() blocks like the request metrics
+        # recorder (see api.middleware.instrument); whichever of the two
+        # connection_created receivers runs last ends up outermost. Nothing
+        # depends on that order: the recorder counts the BEGIN once whether
+        # it sees it before or after it becomes BEGIN IMMEDIATE.
+        if _set_transaction_mode not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, _set_transaction_mode)
@@ -0,0 +1,80 @@
+import json
+from datetime import timezone as dt_timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.models import OpenSourceProject, ExpressionOfInterest
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_RESOURCES = {
+    'projects': (OpenSourceProject, (
+        'id', 'project_name', 'description', 'maximum_collaborators',
+        'current_collaborators', 'creator_id', 'status', 'updated_at'), 'updated_at'),
+    'interests': (ExpressionOfInterest, (
+        'id', 'user_id', 'project_id', 'status', 'created_at', 'updated_at'), 'updated_at'),
+}
+
+
+def parse_since(value):
+    """
+    Parse the ``since`` marker of an incremental export.
+
+    Args:
+        value: A primary key (e.g. ``"1200"``) or an ISO 8601 timestamp
+            (e.g. ``"2024-03-09T15:08:55Z"``). Empty values mean "everything".
+
+    Returns:
+        None, an int or an aware datetime.
+
+    Raises:
+        ValueError: If the value is neither an id nor a timestamp.
+    """
+    if value in (None, ''):
+        return None
+    if value.isdigit():
+        return int(value)
+    since = parse_datetime(value)
+    if since is None:
+        raise ValueError(f'Invalid since value: {value}')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, dt_timezone.utc)
+    return since
+
+
+def export_rows(resource, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate over the rows of an export resource as plain dicts.
+
+    Rows are read with ``QuerySet.iterator()`` in primary key order, so
+    memory use depends on ``chunk_size`` only and not on the table size.
+
+    Args:
+        resource: One of the keys of ``EXPORT_RESOURCES``.
+        since: Result of ``parse_since``. An id exports the rows after that
+            id, a timestamp exports the rows created or changed after it.
+        chunk_size: Number of rows fetched from the database at a time.
+
+    Raises:
+        KeyError: If the resource is unknown.
+    """
+    model, fields, timestamp_field = EXPORT_RESOURCES[resource]
+    queryset = model.objects.order_by('id').values(*fields)
+
+    if isinstance(since, int):
+        queryset = queryset.filter(id__gt=since)
+    elif since is not None:
+        queryset = queryset.filter(**{f'{timestamp_field}__gt': since})
+
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def to_ndjson(rows):
+    """
+    Newline-delimited JSON serialization of ``export_rows``, one line per row.
+    """
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.db import close_old_connections
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _init_hashing_worker(settings_module):
+    """
+    Make sure Django is configured in a freshly spawned worker process.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+    import django
+    django.setup()
+
+
+def _settings_module():
+    return os.environ.get('DJANGO_SETTINGS_MODULE', 'project_contributors.settings')
+
+
+def _hashing_config():
+    config = getattr(settings, 'PASSWORD_HASHING_EXECUTOR', None) or {}
+    return config.get('KIND'), config.get('WORKERS') or os.cpu_count() or 1
+
+
+def get_hashing_executor():
+    """
+    Return the shared executor configured by ``PASSWORD_HASHING_EXECUTOR``.
+
+    The setting is a dict with a ``KIND`` of ``'thread'``, ``'process'`` or
+    None and a ``WORKERS`` count (defaults to the CPU count). A thread pool
+    is usually enough: ``hashlib.pbkdf2_hmac`` releases the GIL while it
+    runs, so the PBKDF2 hasher scales across threads. A process pool also
+    covers hashers implemented in pure Python.
+
+    Returns:
+        A ``concurrent.futures.Executor``, or None when hashing should run
+        inline.
+    """
+    kind, workers = _hashing_config()
+    if not kind:
+        return None
+
+    key = (kind, workers)
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            if kind == 'thread':
+                executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix='password-hashing')
+            elif kind == 'process':
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_hashing_worker,
+                    initargs=(_settings_module(),))
+            else:
+                raise ValueError(f'Unknown password hashing executor: {kind}')
+            _executors[key] = executor
+        return executor
+
+
+async def amake_password(password):
+    """
+    Async ``make_password`` that hashes on the configured executor, leaving
+    the event loop free to serve other requests in the meantime.
+    """
+    executor = get_hashing_executor()
+    if executor is None:
+        return make_password(password)
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, make_password, password)
+
+
+def _authenticate(request, credentials):
+    # Worker threads have database connections of their own, outside any
+    # request: drop those that are broken or past CONN_MAX_AGE, as
+    # Django does around every request
+    close_old_connections()
+    try:
+        return authenticate(request, **credentials)
+    finally:
+        close_old_connections()
+
+
+async def aauthenticate(request=None, **credentials):
+    """
+    Async ``django.contrib.auth.authenticate`` that runs on the configured
+    thread pool, so the ``AUTHENTICATION_BACKENDS`` check and upgrade the
+    password off the event loop.
+
+    The backends query the database, which a process pool cannot do. With
+    a process pool, or without an executor, the call runs like any other
+    ``sync_to_async`` call.
+    """
+    executor = get_hashing_executor()
+    if isinstance(executor, ThreadPoolExecutor):
+        return await sync_to_async(_authenticate, thread_sensitive=False, executor=executor)(
+            request, credentials)
+    return await sync_to_async(authenticate)(request, **credentials)
+
+
+def hash_passwords(passwords):
+    """
+    Hash a batch of raw passwords on the shared executor (see
+    ``get_hashing_executor``), the pool the async views hash on too.
+
+    Batches of a single password, or every batch when no executor is
+    configured, are hashed in the calling thread.
+
+    Args:
+        passwords: A list of raw passwords.
+
+    Returns:
+        The encoded passwords, in the same order.
+    """
+    executor = get_hashing_executor()
+    if executor is None or len(passwords) <= 1:
+        return [make_password(password) for password in passwords]
+
+    # Chunks only matter to a process pool, where each one is a round trip
+    chunksize = max(1, len(passwords) // (_hashing_config()[1] * 4))
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
@@ -0,0 +1,150 @@
+"""
+Logging pipeline of the production profile (see LOGGING in settings.py).
+
+Request threads only put records on a queue. A background thread formats
+them as JSON lines and writes them out. Messages use %-style arguments,
+which are only merged into the message on the writer thread, and only for
+records that passed the level and sampling checks.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.config import ConvertingList
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Attributes every LogRecord has, the others come from ``extra``
+RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+
+    Every object has ``time`` (UTC, ISO 8601), ``level``, ``logger`` and
+    ``message``, plus ``exception`` when the record carries a traceback and
+    any attribute passed through ``extra``. Values JSON cannot represent
+    are written with ``str()``.
+    """
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        if record.stack_info:
+            payload['stack'] = self.formatStack(record.stack_info)
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and key not in payload:
+                payload[key] = value
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Let through a ``rate`` fraction of the records below ``max_level``.
+
+    It thins out chatty, low level records (e.g. one INFO line per request)
+    while warnings and errors always pass. Rejected records are never
+    formatted. Attach it to a handler: a logger's filters only see the
+    records logged on that very logger, not on its children. With ``name``
+    only the records of that logger and its children are sampled, the
+    others all pass.
+    """
+
+    def __init__(self, rate=1.0, max_level='WARNING', seed=None, name=''):
+        super().__init__(name)
+        self.rate = float(rate)
+        self.max_level = (max_level if isinstance(max_level, int)
+                          else logging.getLevelName(max_level))
+        self._random = random.Random(seed)
+
+    def filter(self, record):
+        if record.levelno >= self.max_level or self.rate >= 1:
+            return True
+        if not super().filter(record):
+            return True
+        return self._random.random() < self.rate
+
+
+def _resolve_handlers(handlers):
+    # dictConfig converts 'cfg://handlers.<name>' references on access, to
+    # the handler objects it has already configured
+    if isinstance(handlers, ConvertingList):
+        return [handlers[index] for index in range(len(handlers))]
+    return list(handlers)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    QueueHandler draining into ``handlers`` on a background thread.
+
+    Records are put on a bounded queue without blocking: when the writer
+    falls behind by ``queue_size`` records, new records are dropped and
+    counted in ``dropped`` instead of stalling requests. The listener is
+    stopped, and the queue flushed, at interpreter exit.
+
+    Arguments of the messages are merged on the writer thread, so pass
+    plain values (strings, numbers, exceptions) rather than objects whose
+    ``__str__`` could query the database.
+
+    For use from dictConfig, referencing handlers whose names sort before
+    its own (dictConfig configures handlers in name order)::
+
+        'queue': {
+            '()': 'api.logs.QueueListenerHandler',
+            'handlers': ['cfg://handlers.file'],
+            'queue_size': 10000,
+        }
+    """
+
+    def __init__(self, handlers, queue_size=10000, respect_handler_level=True):
+        super().__init__(queue.Queue(queue_size))
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+        self.listener = QueueListener(
+            self.queue, *_resolve_handlers(handlers),
+            respect_handler_level=respect_handler_level)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+
+    def prepare(self, record):
+        # QueueHandler.prepare formats the message on the calling thread,
+        # which is the cost this handler exists to avoid. Records stay in
+        # this process, so they are passed on as they are.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+    def flush(self):
+        """
+        Wait until every queued record has been written.
+        """
+        if self._running:
+            self.queue.join()
+
+    def stop(self):
+        if self._running:
+            self._running = False
+            self.listener.stop()
+
+    def close(self):
+        self.stop()
+        super().close()
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import EXPORT_CHUNK_SIZE, EXPORT_RESOURCES, export_rows, parse_since, to_ndjson
+
+
+class Command(BaseCommand):
+    """
+    Write projects or expressions of interest as newline-delimited JSON.
+
+    Rows are streamed with ``QuerySet.iterator()``, so memory use stays
+    constant however large the tables are. Pass ``--since`` with the last
+    exported id, or the time of the last pull to also get the rows changed
+    since, for incremental pulls.
+    """
+    help = 'Export projects or interests as newline-delimited JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(EXPORT_RESOURCES))
+        parser.add_argument('--since', default=None,
+                            help='Only export rows after this id or timestamp')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Number of rows fetched from the database at a time')
+        parser.add_argument('--output', default=None,
+                            help='File to write to (defaults to stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since'])
+            rows = export_rows(options['resource'], since, options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.writelines(to_ndjson(rows))
+        else:
+            for line in to_ndjson(rows):
+                self.stdout.write(line, ending='')
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.analytics import refresh_user_analytics
+from api.models import User
+
+
+class Command(BaseCommand):
+    """
+    Backfill or repair the UserAnalytics summary table.
+
+    Users are walked in primary key order, ``--chunk-size`` at a time, and
+    each chunk is recomputed from the source tables in its own transaction.
+    """
+    help = 'Rebuild the precomputed user analytics summaries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Number of users rebuilt per transaction')
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild this user (can be repeated)')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        users = User.objects.order_by('pk')
+        if options['user_ids']:
+            users = users.filter(pk__in=options['user_ids'])
+
+        rebuilt = 0
+        last_id = 0
+        while True:
+            chunk = list(users.filter(pk__gt=last_id).values_list('pk', flat=True)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1]
+            with transaction.atomic():
+                refresh_user_analytics(chunk)
+            rebuilt += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt analytics of {rebuilt} users'))
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from api.models import OpenSourceProject
+
+
+class Command(BaseCommand):
+    """
+    Repair drift between OpenSourceProject.current_collaborators and the
+    collaborators many-to-many table.
+
+    Projects are walked in primary key order, ``--chunk-size`` at a time.
+    Each chunk costs two SELECTs plus one UPDATE per drifted project. The
+    UPDATE is conditional on the counter still holding the value that was
+    read, so a concurrent accept is never overwritten; such a project is
+    simply picked up again on the next run.
+    """
+    help = 'Repair current_collaborators counters that drifted from the collaborators table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Number of projects checked per batch')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted projects without repairing them')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+        through = OpenSourceProject.collaborators.through
+
+        checked = drifted = repaired = 0
+        last_id = 0
+        while True:
+            chunk = list(
+                OpenSourceProject.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'current_collaborators')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            checked += len(chunk)
+
+            actual = dict(
+                through.objects.filter(opensourceproject_id__in=[pk for pk, _ in chunk])
+                .values('opensourceproject_id')
+                .annotate(total=Count('id'))
+                .values_list('opensourceproject_id', 'total')
+            )
+
+            for project_id, stored in chunk:
+                expected = actual.get(project_id, 0)
+                if stored == expected:
+                    continue
+                drifted += 1
+                self.stdout.write(
+                    f'Project {project_id}: counter {stored}, collaborators {expected}')
+                if not dry_run:
+                    repaired += OpenSourceProject.objects.filter(
+                        pk=project_id, current_collaborators=stored
+                    ).update(current_collaborators=expected, updated_at=timezone.now())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} projects, {drifted} drifted, {repaired} repaired'))
@@ -0,0 +1,69 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.seeding import SCALES, SEED_PASSWORD, seed_database
+
+
+class Command(BaseCommand):
+    """
+    Fill the database with generated users, skills, projects, collaborators
+    and interests (see ``api.seeding.seed_database``).
+
+    ``--scale`` picks the row counts, which ``--users``, ``--skills``,
+    ``--projects`` and ``--interests`` override. The same ``--seed`` on the
+    same database generates the same rows. Everything is inserted in one
+    transaction, so an interrupted run leaves the database untouched. On
+    SQLite, inserting the rows and building the indexes and the search index
+    take most of the time.
+    """
+    help = 'Generate users, skills, projects and interests in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small',
+                            help='Row counts to start from: ' + ', '.join(
+                                f"{name} ({counts['users']} users, {counts['projects']} projects)"
+                                for name, counts in SCALES.items()))
+        for kind in ('users', 'skills', 'projects', 'interests'):
+            parser.add_argument(f'--{kind}', type=int, help=f'Number of {kind}, overriding --scale')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed of the random generator')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Rows per INSERT statement')
+        parser.add_argument('--chunk-size', type=int, default=100000,
+                            help='Users or projects generated at a time')
+
+    def handle(self, *args, **options):
+        counts = dict(SCALES[options['scale']])
+        for kind in counts:
+            if options[kind] is not None:
+                if options[kind] < 0:
+                    raise CommandError(f'--{kind} cannot be negative')
+                counts[kind] = options[kind]
+        if counts['projects'] and not counts['users']:
+            raise CommandError('Projects need at least one user to create them')
+
+        def progress(created):
+            if options['verbosity'] >= 2:
+                self.stdout.write(', '.join(f'{count} {kind}' for kind, count in created.items()))
+
+        # The development logging profile writes every statement, with its
+        # parameters, which would be every generated row
+        sql_logger = logging.getLogger('django.db.backends')
+        level = sql_logger.level
+        sql_logger.setLevel(max(level, logging.INFO))
+        start = time.perf_counter()
+        try:
+            created = seed_database(
+                seed=options['seed'], batch_size=options['batch_size'],
+                chunk_size=options['chunk_size'], progress=progress, **counts)
+        finally:
+            sql_logger.setLevel(level)
+        elapsed = time.perf_counter() - start
+
+        rows = sum(created.values())
+        self.stdout.write(', '.join(f'{count} {kind}' for kind, count in created.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {rows} rows in {elapsed:.1f} s ({rows / elapsed:.0f} rows/s). '
+            f'Generated users log in with the password "{SEED_PASSWORD}".'))
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.routers import sync_replica
+
+
+class Command(BaseCommand):
+    """
+    Copy the primary SQLite database into every replica of
+    ``DATABASE_REPLICAS``, once or every ``--interval`` seconds.
+
+    Meant for trying replica routing out locally: the replicas lag behind
+    the primary by up to the interval, as they would behind a replication
+    tool in production.
+    """
+    help = 'Copy the primary SQLite database into its read replicas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Keep syncing, waiting this many seconds between copies')
+
+    def handle(self, *args, **options):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            raise CommandError('No replicas configured, set DATABASE_REPLICAS')
+        while True:
+            for alias in replicas:
+                start = time.perf_counter()
+                try:
+                    sync_replica(alias)
+                except ValueError as e:
+                    raise CommandError(str(e))
+                self.stdout.write(f'Synced {alias} in {(time.perf_counter() - start) * 1000:.0f} ms')
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
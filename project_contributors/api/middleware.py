@@ -0,0 +1,221 @@
+"""
+Per-request database and timing metrics (see ``RequestMetricsMiddleware``).
+"""
+import contextvars
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the request being handled. Context variables follow the
+# request into the threads sync_to_async runs the ORM on.
+_current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    An endpoint ran more queries than its ``QUERY_BUDGETS`` entry allows.
+    """
+
+
+class RequestMetrics:
+    """
+    Query count and timings of one request, in seconds.
+
+    ``view`` runs from the view being called to it returning its response,
+    ``serialize`` is the rendering of DRF responses (JSON encoding), and
+    ``total`` covers the whole middleware chain below this middleware.
+    """
+
+    __slots__ = ('queries', 'db', 'view', 'serialize', 'total',
+                 '_view_started', '_render_started')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.view = None
+        self.serialize = None
+        self.total = None
+        self._view_started = None
+        self._render_started = None
+
+    def server_timing(self):
+        """
+        Value of the ``Server-Timing`` header, durations in milliseconds.
+        """
+        metrics = [f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"']
+        if self.view is not None:
+            metrics.append(f'view;dur={self.view * 1000:.2f}')
+        if self.serialize is not None:
+            metrics.append(f'serialize;dur={self.serialize * 1000:.2f}')
+        metrics.append(f'total;dur={self.total * 1000:.2f}')
+        return ', '.join(metrics)
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def instrument(connection, **kwargs):
+    """
+    Install the query recorder on ``connection``, once.
+
+    Connected to ``connection_created``. It only records queries run while
+    a request is handled, and costs a context variable lookup otherwise.
+    """
+    if _record_query not in connection.execute_wrappers:
+        # Outermost (wrappers run from the first one in), and out of the
+        # way of execute_wrapper() blocks, which pop the last wrapper when
+        # they exit: connections can be opened inside them
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+connection_created.connect(instrument)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure the queries, database time, view time and serialization time
+    of every request.
+
+    The metrics are sent back in a ``Server-Timing`` header (when
+    ``REQUEST_METRICS['HEADER']`` is true) and logged as one ``api.middleware``
+    INFO record per request whose ``extra`` fields (endpoint, status,
+    queries, db_ms, view_ms, serialize_ms, total_ms) the JSON formatter of
+    the production logging profile writes out as is.
+
+    ``QUERY_BUDGETS`` maps URL names to the most queries a request to them
+    may run. Going over logs a warning or, with ``QUERY_BUDGETS_STRICT``
+    (set by ``api.test_runner.QueryBudgetTestRunner``), raises
+    ``QueryBudgetExceeded`` so the test making the request fails.
+
+    Queries run while a streaming response is consumed happen after the
+    middleware returns and are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # Coroutine hooks, which the async handler calls without a
+            # thread switch
+            self.process_view = self._aprocess_view
+            self.process_template_response = self._aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections of this thread may predate the middleware
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.view_started()
+
+    def process_template_response(self, request, response):
+        return self.render_started(response)
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.view_started()
+
+    async def _aprocess_template_response(self, request, response):
+        return self.render_started(response)
+
+    @staticmethod
+    def view_started():
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics._view_started = time.perf_counter()
+
+    @staticmethod
+    def render_started(response):
+        # DRF responses are rendered right after process_template_response
+        metrics = _current_metrics.get()
+        if metrics is not None and metrics._view_started is not None:
+            metrics._render_started = time.perf_counter()
+            metrics.view = metrics._render_started - metrics._view_started
+
+            def rendered(response):
+                metrics.serialize = time.perf_counter() - metrics._render_started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics, start):
+        end = time.perf_counter()
+        metrics.total = end - start
+        if metrics.view is None and metrics._view_started is not None:
+            metrics.view = end - metrics._view_started
+
+        config = getattr(settings, 'REQUEST_METRICS', {})
+        if config.get('HEADER', True):
+            response['Server-Timing'] = metrics.server_timing()
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.view_name if match is not None else None
+        if config.get('LOG', True):
+            logger.info('%s %s %s: %s queries in %.2f ms, %.2f ms total',
+                        request.method, request.path, response.status_code,
+                        metrics.queries, metrics.db * 1000, metrics.total * 1000,
+                        extra=self.log_fields(endpoint, response, metrics))
+
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(endpoint)
+        if budget is not None and metrics.queries > budget:
+            if getattr(settings, 'QUERY_BUDGETS_STRICT', False):
+                raise QueryBudgetExceeded(
+                    f'{endpoint} ran {metrics.queries} queries, over its budget of {budget}')
+            logger.warning('%s ran %s queries, over its budget of %s',
+                           endpoint, metrics.queries, budget,
+                           extra={'endpoint': endpoint, 'queries': metrics.queries,
+                                  'budget': budget})
+        return response
+
+    @staticmethod
+    def log_fields(endpoint, response, metrics):
+        def ms(seconds):
+            return round(seconds * 1000, 3) if seconds is not None else None
+
+        return {
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': ms(metrics.db),
+            'view_ms': ms(metrics.view),
+            'serialize_ms': ms(metrics.serialize),
+            'total_ms': ms(metrics.total),
+        }
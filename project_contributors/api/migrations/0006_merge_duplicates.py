@@ -0,0 +1,66 @@
+# Generated by Django 5.0.3 on 2026-10-16 22:53
+
+from django.db import migrations, models
+
+
+# Removes the duplicates that the unique constraints of 0007_indexes reject.
+# This runs and commits in a migration of its own: on PostgreSQL the deletes
+# leave deferred foreign key checks pending until commit, and a table with
+# pending trigger events cannot be altered in the same transaction.
+
+
+def merge_duplicate_skills(apps, schema_editor):
+    """
+    Fold skills sharing a name into the oldest one before making names unique.
+    """
+    ProgrammingSkill = apps.get_model('api', 'ProgrammingSkill')
+    UserSkill = apps.get_model('api', 'User').programming_skills.through
+
+    duplicates = (
+        ProgrammingSkill.objects.values('name')
+        .annotate(total=models.Count('id'), keep=models.Min('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        extra_ids = list(ProgrammingSkill.objects.filter(
+            name=duplicate['name']).exclude(id=duplicate['keep']).values_list('id', flat=True))
+        holders = set(UserSkill.objects.filter(
+            programmingskill_id=duplicate['keep']).values_list('user_id', flat=True))
+        for link in UserSkill.objects.filter(programmingskill_id__in=extra_ids):
+            if link.user_id not in holders:
+                holders.add(link.user_id)
+                UserSkill.objects.create(
+                    user_id=link.user_id, programmingskill_id=duplicate['keep'])
+        ProgrammingSkill.objects.filter(id__in=extra_ids).delete()
+
+
+def remove_duplicate_interests(apps, schema_editor):
+    """
+    Keep one expression of interest per (project, user), preferring an
+    accepted one and otherwise the oldest.
+    """
+    ExpressionOfInterest = apps.get_model('api', 'ExpressionOfInterest')
+
+    duplicates = (
+        ExpressionOfInterest.objects.values('project_id', 'user_id')
+        .annotate(total=models.Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        interests = ExpressionOfInterest.objects.filter(
+            project_id=duplicate['project_id'], user_id=duplicate['user_id'])
+        keep = (interests.filter(status='accepted').order_by('id').first()
+                or interests.order_by('id').first())
+        interests.exclude(id=keep.id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_expressionofinterest'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_skills, migrations.RunPython.noop),
+        migrations.RunPython(remove_duplicate_interests, migrations.RunPython.noop),
+    ]
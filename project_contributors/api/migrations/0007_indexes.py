@@ -0,0 +1,43 @@
+# Generated by Django 5.0.3 on 2026-10-16 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_merge_duplicates'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='opensourceproject',
+            name='project_name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='programmingskill',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='expressionofinterest',
+            index=models.Index(fields=['user', 'status'], name='eoi_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expressionofinterest',
+            index=models.Index(fields=['project', 'created_at'], name='eoi_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expressionofinterest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['project', 'created_at'], name='eoi_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opensourceproject',
+            index=models.Index(condition=models.Q(('current_collaborators__lt', models.F('maximum_collaborators'))), fields=['id'], name='project_has_seats_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='expressionofinterest',
+            constraint=models.UniqueConstraint(fields=('project', 'user'), name='unique_interest_per_user'),
+        ),
+    ]
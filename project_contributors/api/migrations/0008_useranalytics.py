@@ -0,0 +1,30 @@
+# Generated by Django 5.0.3 on 2026-10-16 23:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAnalytics',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analytics', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('projects_as_creator', models.PositiveIntegerField(default=0)),
+                ('projects_name', models.JSONField(default=list)),
+                ('collaborations', models.PositiveIntegerField(default=0)),
+                ('collaborations_name', models.JSONField(default=list)),
+                ('interests', models.PositiveIntegerField(default=0)),
+                ('interests_project_name', models.JSONField(default=list)),
+                ('skills', models.PositiveIntegerField(default=0)),
+                ('skills_name', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
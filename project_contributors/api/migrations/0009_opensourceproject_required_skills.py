@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-16 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_useranalytics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opensourceproject',
+            name='required_skills',
+            field=models.ManyToManyField(blank=True, related_name='projects', to='api.programmingskill'),
+        ),
+    ]
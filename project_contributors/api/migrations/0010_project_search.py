@@ -0,0 +1,72 @@
+from django.db import migrations
+
+
+# External content FTS5 table over api_opensourceproject: the text lives in
+# the projects table only, the index is kept in sync by the triggers below.
+# The 2 and 3 character prefix indexes make short prefix queries cheap.
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE api_project_search USING fts5(
+        project_name, description,
+        content='api_opensourceproject', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER api_project_search_insert AFTER INSERT ON api_opensourceproject BEGIN
+        INSERT INTO api_project_search(rowid, project_name, description)
+        VALUES (new.id, new.project_name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_project_search_delete AFTER DELETE ON api_opensourceproject BEGIN
+        INSERT INTO api_project_search(api_project_search, rowid, project_name, description)
+        VALUES ('delete', old.id, old.project_name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_project_search_update
+    AFTER UPDATE OF project_name, description ON api_opensourceproject BEGIN
+        INSERT INTO api_project_search(api_project_search, rowid, project_name, description)
+        VALUES ('delete', old.id, old.project_name, old.description);
+        INSERT INTO api_project_search(rowid, project_name, description)
+        VALUES (new.id, new.project_name, new.description);
+    END
+    """,
+    "INSERT INTO api_project_search(api_project_search) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    'DROP TRIGGER IF EXISTS api_project_search_update',
+    'DROP TRIGGER IF EXISTS api_project_search_delete',
+    'DROP TRIGGER IF EXISTS api_project_search_insert',
+    'DROP TABLE IF EXISTS api_project_search',
+]
+
+
+def create_search_index(apps, schema_editor):
+    """
+    FTS5 is SQLite only; other databases get no search index.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_opensourceproject_required_skills'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
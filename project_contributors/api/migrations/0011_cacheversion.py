@@ -0,0 +1,111 @@
+# Generated by Django 5.0.3 on 2026-10-16 23:23
+
+import uuid
+
+from django.db import migrations, models
+
+
+# The available_projects listing depends on these columns of the projects
+# table and on the creators' usernames. Any write to them replaces the
+# listing version token in the same transaction, whatever issued it: views,
+# the admin, bulk_create(), queryset.update() or management commands.
+LISTING_COLUMNS = ('project_name, description, maximum_collaborators, '
+                   'current_collaborators, status, creator_id')
+
+SQLITE_BUMP = ("UPDATE api_cacheversion SET version = lower(hex(randomblob(16))) "
+               "WHERE name = 'available_projects';")
+
+CREATE_TRIGGERS = {
+    'sqlite': [
+        f"""
+        CREATE TRIGGER api_listing_version_insert AFTER INSERT ON api_opensourceproject
+        BEGIN {SQLITE_BUMP} END
+        """,
+        f"""
+        CREATE TRIGGER api_listing_version_delete AFTER DELETE ON api_opensourceproject
+        BEGIN {SQLITE_BUMP} END
+        """,
+        f"""
+        CREATE TRIGGER api_listing_version_update
+        AFTER UPDATE OF {LISTING_COLUMNS} ON api_opensourceproject
+        BEGIN {SQLITE_BUMP} END
+        """,
+        f"""
+        CREATE TRIGGER api_listing_version_username AFTER UPDATE OF username ON api_user
+        BEGIN {SQLITE_BUMP} END
+        """,
+    ],
+    'postgresql': [
+        """
+        CREATE OR REPLACE FUNCTION api_bump_listing_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE api_cacheversion SET version = md5(random()::text || clock_timestamp()::text)
+            WHERE name = 'available_projects';
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE TRIGGER api_listing_version_project
+        AFTER INSERT OR DELETE OR UPDATE OF {LISTING_COLUMNS} ON api_opensourceproject
+        FOR EACH STATEMENT EXECUTE FUNCTION api_bump_listing_version()
+        """,
+        """
+        CREATE TRIGGER api_listing_version_username AFTER UPDATE OF username ON api_user
+        FOR EACH STATEMENT EXECUTE FUNCTION api_bump_listing_version()
+        """,
+    ],
+}
+
+DROP_TRIGGERS = {
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS api_listing_version_insert',
+        'DROP TRIGGER IF EXISTS api_listing_version_delete',
+        'DROP TRIGGER IF EXISTS api_listing_version_update',
+        'DROP TRIGGER IF EXISTS api_listing_version_username',
+    ],
+    'postgresql': [
+        'DROP TRIGGER IF EXISTS api_listing_version_project ON api_opensourceproject',
+        'DROP TRIGGER IF EXISTS api_listing_version_username ON api_user',
+        'DROP FUNCTION IF EXISTS api_bump_listing_version()',
+    ],
+}
+
+
+def create_listing_version(apps, schema_editor):
+    """
+    Seed the version of the available_projects response cache and install
+    the triggers replacing it. Databases without triggers here get no
+    version row, which disables the cache (see api/cache.py).
+    """
+    statements = CREATE_TRIGGERS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    CacheVersion = apps.get_model('api', 'CacheVersion')
+    CacheVersion.objects.get_or_create(
+        name='available_projects', defaults={'version': uuid.uuid4().hex})
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_listing_triggers(apps, schema_editor):
+    for statement in DROP_TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_project_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.CharField(max_length=32)),
+            ],
+        ),
+        migrations.RunPython(create_listing_version, drop_listing_triggers),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-16 23:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+from api.migrations._triggers import recreate_project_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_cacheversion'),
+    ]
+
+    # Adding a column rebuilds api_opensourceproject on SQLite, which drops
+    # its triggers: reinstall them on the way up and on the way down.
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, recreate_project_triggers),
+        migrations.AddField(
+            model_name='opensourceproject',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='expressionofinterest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='expressionofinterest',
+            index=models.Index(fields=['project', 'updated_at'], name='eoi_project_updated_idx'),
+        ),
+        migrations.RunPython(recreate_project_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.0.3 on 2026-10-16 23:58
+
+import uuid
+
+from django.db import migrations
+
+
+# Processes keep the skill vocabulary in memory (api/skills.py). Renaming or
+# deleting a skill, whatever issues it, replaces the generation token they
+# compare against. Inserts need no bump: unknown names are looked up.
+SQLITE_BUMP = ("UPDATE api_cacheversion SET version = lower(hex(randomblob(16))) "
+               "WHERE name = 'programming_skills';")
+
+CREATE_TRIGGERS = {
+    'sqlite': [
+        f"""
+        CREATE TRIGGER api_skill_version_update AFTER UPDATE OF name ON api_programmingskill
+        BEGIN {SQLITE_BUMP} END
+        """,
+        f"""
+        CREATE TRIGGER api_skill_version_delete AFTER DELETE ON api_programmingskill
+        BEGIN {SQLITE_BUMP} END
+        """,
+    ],
+    'postgresql': [
+        """
+        CREATE OR REPLACE FUNCTION api_bump_skill_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE api_cacheversion SET version = md5(random()::text || clock_timestamp()::text)
+            WHERE name = 'programming_skills';
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER api_skill_version
+        AFTER DELETE OR UPDATE OF name ON api_programmingskill
+        FOR EACH STATEMENT EXECUTE FUNCTION api_bump_skill_version()
+        """,
+    ],
+}
+
+DROP_TRIGGERS = {
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS api_skill_version_update',
+        'DROP TRIGGER IF EXISTS api_skill_version_delete',
+    ],
+    'postgresql': [
+        'DROP TRIGGER IF EXISTS api_skill_version ON api_programmingskill',
+        'DROP FUNCTION IF EXISTS api_bump_skill_version()',
+    ],
+}
+
+
+def create_skill_version(apps, schema_editor):
+    """
+    Seed the generation of the skill vocabulary and install the triggers
+    replacing it. Without a version row the vocabulary is reloaded every
+    check interval instead (see api/skills.py).
+    """
+    statements = CREATE_TRIGGERS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    CacheVersion = apps.get_model('api', 'CacheVersion')
+    CacheVersion.objects.get_or_create(
+        name='programming_skills', defaults={'version': uuid.uuid4().hex})
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_skill_triggers(apps, schema_editor):
+    for statement in DROP_TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+    CacheVersion = apps.get_model('api', 'CacheVersion')
+    CacheVersion.objects.filter(name='programming_skills').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_skill_version, drop_skill_triggers),
+    ]
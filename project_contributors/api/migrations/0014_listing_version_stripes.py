@@ -0,0 +1,61 @@
+# Generated by Django 5.0.3 on 2026-10-17 01:30
+
+import uuid
+from importlib import import_module
+
+from django.db import migrations
+
+
+# On PostgreSQL the single available_projects row of 0011 was a hot spot:
+# every transaction writing the listing columns held its row lock until
+# commit, so those writers ran one at a time. The token is now spread over
+# stripe rows, 'available_projects:<n>', and each transaction bumps the
+# stripe picked by its transaction id. A transaction holds a single stripe
+# whatever it writes (no lock ordering, no deadlocks), and concurrent
+# writers rarely share one. Readers combine all the stripes (see
+# api/cache.py). SQLite serializes writers on the database lock anyway and
+# keeps the single row.
+STRIPES = 32
+
+BUMP_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION api_bump_listing_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE api_cacheversion SET version = md5(random()::text || clock_timestamp()::text)
+    WHERE name = 'available_projects:' || mod(txid_current(), {STRIPES});
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def stripe_listing_version(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    CacheVersion = apps.get_model('api', 'CacheVersion')
+    CacheVersion.objects.filter(name='available_projects').delete()
+    CacheVersion.objects.bulk_create(
+        CacheVersion(name=f'available_projects:{stripe}', version=uuid.uuid4().hex)
+        for stripe in range(STRIPES))
+    # The triggers of 0011 call the function by name
+    schema_editor.execute(BUMP_FUNCTION)
+
+
+def unstripe_listing_version(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    listing = import_module('api.migrations.0011_cacheversion')
+    CacheVersion = apps.get_model('api', 'CacheVersion')
+    CacheVersion.objects.filter(name__startswith='available_projects:').delete()
+    CacheVersion.objects.create(name='available_projects', version=uuid.uuid4().hex)
+    schema_editor.execute(listing.CREATE_TRIGGERS['postgresql'][0])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_skill_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(stripe_listing_version, unstripe_listing_version),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-17 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_listing_version_stripes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSearch',
+            fields=[
+                ('project', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='api.opensourceproject')),
+                ('project_name', models.TextField()),
+                ('description', models.TextField()),
+                ('search', models.TextField(db_column='api_project_search')),
+            ],
+            options={
+                'db_table': 'api_project_search',
+                'managed': False,
+                'required_db_vendor': 'sqlite',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+"""
+Helpers for migrations that touch tables carrying raw SQL triggers.
+
+On SQLite, Django applies most field changes by rebuilding the table
+(create a copy, move the rows, drop the original), which silently drops the
+triggers defined on it. Migrations altering api_opensourceproject must
+therefore reinstall them afterwards with ``recreate_project_triggers``
+(and before reversing, see 0012_updated_at).
+"""
+from importlib import import_module
+
+
+def project_trigger_statements():
+    """
+    CREATE TRIGGER statements of api_opensourceproject on SQLite: the
+    search index triggers (0010) and the listing version triggers (0011).
+    """
+    search = import_module('api.migrations.0010_project_search')
+    listing = import_module('api.migrations.0011_cacheversion')
+    statements = [statement for statement in search.CREATE_SEARCH_INDEX
+                  if 'CREATE TRIGGER' in statement]
+    statements += [statement for statement in listing.CREATE_TRIGGERS['sqlite']
+                   if 'ON api_opensourceproject' in statement]
+    return statements
+
+
+def recreate_project_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_opensourceproject'")
+        existing = {name for name, in cursor.fetchall()}
+    for statement in project_trigger_statements():
+        name = statement.split('CREATE TRIGGER', 1)[1].split()[0]
+        if name not in existing:
+            schema_editor.execute(statement)
@@ -36,8 +36,10 @@ class ProgrammingSkill(models.Model):
 
     Methods:
         - __str__: Returns the name of the programming skill.
+
+    Skill names are unique, so a skill can be looked up or created by name.
     """
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)
 
     def __str__(self):
         return self.name
@@ -54,7 +56,9 @@ class OpenSourceProject(models.Model):
         - current_collaborators: PositiveIntegerField indicating the current number of collaborators for the project.
         - creator: ForeignKey linking to the User model, representing the creator of the project.
         - collaborators: ManyToManyField linking to the User model, representing the collaborators of the project.
+        - required_skills: ManyToManyField linking to the ProgrammingSkill model, representing the skills the project needs.
         - status: CharField representing the status of the project (draft, active, closed).
+        - updated_at: DateTimeField indicating when the project was last changed.
 
     Methods:
         - __str__: Returns the name of the project.
@@ -65,7 +69,7 @@ class OpenSourceProject(models.Model):
         ('closed', 'Closed'),
     )
 
-    project_name = models.CharField(max_length=100)
+    project_name = models.CharField(max_length=100, db_index=True)
     description = models.TextField()
     maximum_collaborators = models.PositiveIntegerField()
     # This field will be updated when a user joins or leaves a project
@@ -74,9 +78,21 @@ class OpenSourceProject(models.Model):
         User, on_delete=models.CASCADE, related_name='created_projects')
     collaborators = models.ManyToManyField(
         User, related_name='projects_contributed', blank=True)
+    required_skills = models.ManyToManyField(
+        ProgrammingSkill, related_name='projects', blank=True)
 
     status = models.CharField(
         max_length=10, choices=STATUS_CHOICES, default='draft')
+    # Not maintained by queryset.update(): pass updated_at explicitly
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Keyset scan of the available projects listing
+            models.Index(
+                fields=['id'], name='project_has_seats_idx',
+                condition=models.Q(current_collaborators__lt=models.F('maximum_collaborators'))),
+        ]
 
     def __str__(self):
         return self.project_name
@@ -91,6 +107,8 @@ class ExpressionOfInterest(models.Model):
         - project: ForeignKey linking to the OpenSourceProject model, representing the project of interest.
         - status: CharField representing the status of the expression of interest (pending, accepted, rejected).
         - created_at: DateTimeField indicating the date and time when the expression of interest was created.
+        - updated_at: DateTimeField indicating when the expression of interest, or the
+          applicant details shown with it, last changed.
 
     Methods:
         - __str__: Returns a string representation of the expression of interest.
@@ -109,6 +127,117 @@ class ExpressionOfInterest(models.Model):
     project = models.ForeignKey(OpenSourceProject, on_delete=models.CASCADE)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
     created_at = models.DateTimeField(default=timezone.now)
+    # Not maintained by queryset.update(): pass updated_at explicitly
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'user'], name='unique_interest_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'status'], name='eoi_user_status_idx'),
+            models.Index(fields=['project', 'created_at'],
+                         name='eoi_project_created_idx'),
+            # Validator of a project's interests (count and latest change)
+            models.Index(fields=['project', 'updated_at'],
+                         name='eoi_project_updated_idx'),
+            # Applicants still waiting for a decision
+            models.Index(
+                fields=['project', 'created_at'], name='eoi_pending_idx',
+                condition=models.Q(status='pending')),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.project.project_name} - {self.status}"
+
+
+class ProjectSearch(models.Model):
+    """
+    Entry of the FTS5 index of project names and descriptions (SQLite only).
+
+    The virtual table and the triggers keeping it in sync are created by
+    migration 0010, not by Django, and the index is only queried through
+    api/search.py. Joining it from the projects table lets the search
+    filter and rank with the ORM.
+
+    Fields:
+        - project: OneToOneField to the indexed project, stored as the FTS5 rowid.
+        - project_name: Indexed name of the project.
+        - description: Indexed description of the project.
+        - search: The hidden column FTS5 names after the table. It is the
+          left-hand side of MATCH and the first argument of bm25().
+    """
+    project = models.OneToOneField(
+        OpenSourceProject, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', related_name='search_entry')
+    project_name = models.TextField()
+    description = models.TextField()
+    search = models.TextField(db_column='api_project_search')
+
+    class Meta:
+        managed = False
+        db_table = 'api_project_search'
+        required_db_vendor = 'sqlite'
+
+    def __str__(self):
+        return f"Search entry of {self.project_id}"
+
+
+class UserAnalytics(models.Model):
+    """
+    Precomputed analytics of a user, served by the get_user_analytics endpoint.
+
+    The row is kept up to date by the signal handlers in api/signals.py
+    whenever the user's projects, collaborations, interests or skills change,
+    and can be rebuilt with the rebuild_user_analytics management command.
+
+    Fields:
+        - user: OneToOneField to the User model, also the primary key.
+        - projects_as_creator: Number of projects created by the user.
+        - projects_name: Names of the projects created by the user.
+        - collaborations: Number of projects the user collaborates on.
+        - collaborations_name: Names of the projects the user collaborates on.
+        - interests: Number of expressions of interest of the user.
+        - interests_project_name: Names of the projects the user expressed interest in.
+        - skills: Number of programming skills of the user.
+        - skills_name: Names of the programming skills of the user.
+        - updated_at: DateTimeField indicating when the row was last refreshed.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='analytics')
+    projects_as_creator = models.PositiveIntegerField(default=0)
+    projects_name = models.JSONField(default=list)
+    collaborations = models.PositiveIntegerField(default=0)
+    collaborations_name = models.JSONField(default=list)
+    interests = models.PositiveIntegerField(default=0)
+    interests_project_name = models.JSONField(default=list)
+    skills = models.PositiveIntegerField(default=0)
+    skills_name = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Analytics of {self.user_id}"
+
+
+class CacheVersion(models.Model):
+    """
+    Version token of a group of cached responses, shared by all processes.
+
+    Every change to the data behind the group replaces the token, in the
+    same transaction as the change, so that cache entries stored under an
+    older token are never served again. For the available_projects listing
+    this is done by database triggers (see migration 0011). Tokens are
+    random rather than incremented: concurrent bumps cannot collapse into
+    one and a rolled back bump cannot resurrect a token that cached entries
+    still carry. See api/cache.py.
+
+    Fields:
+        - name: CharField naming the group, also the primary key.
+        - version: CharField holding the current token.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.CharField(max_length=32)
 
     def __str__(self):
-        return f"{self.user.username} - {self.project.project_name} - {self.status}"
\ No newline at end of file
+        return f"{self.name} @ {self.version}"
@@ -0,0 +1,210 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination, _reverse_ordering
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class LinkHeaderMixin:
+    """
+    Return the page as a plain list and advertise the neighbouring pages
+    through an RFC 8288 ``Link`` header (``rel="next"`` / ``rel="prev"``).
+    """
+
+    def get_link_header(self):
+        links = []
+        next_link = self.get_next_link()
+        previous_link = self.get_previous_link()
+        if next_link:
+            links.append(f'<{next_link}>; rel="next"')
+        if previous_link:
+            links.append(f'<{previous_link}>; rel="prev"')
+        return ', '.join(links) or None
+
+    def get_paginated_response(self, data):
+        response = Response(data)
+        link_header = self.get_link_header()
+        if link_header:
+            response['Link'] = link_header
+        return response
+
+
+class LinkHeaderCursorPagination(LinkHeaderMixin, CursorPagination):
+    """
+    Keyset (cursor) pagination that keeps the response body a plain list.
+
+    The page itself is returned as the body, exactly like the unpaginated
+    endpoints did, and the cursors for the neighbouring pages are advertised
+    through an RFC 8288 ``Link`` header (``rel="next"`` / ``rel="prev"``).
+    Existing clients keep working and only need to follow the header to
+    walk the rest of the collection.
+
+    Subclasses set ``page_size_setting`` to the name of the Django setting
+    holding their default page size, so it can be tuned per deployment.
+
+    ``apaginate_queryset`` is the async counterpart of ``paginate_queryset``
+    for async views: the page is read with ``aiterator()`` and the cursor
+    bookkeeping is shared with the sync path.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_setting = None
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_page_size(self, request):
+        if self.page_size_setting:
+            self.page_size = getattr(
+                settings, self.page_size_setting, self.page_size)
+        self.max_page_size = getattr(
+            settings, 'API_MAX_PAGE_SIZE', self.max_page_size)
+        return super().get_page_size(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        # A chunk size is required to combine aiterator() with prefetching
+        return self._set_page([
+            obj async for obj in queryset.aiterator(chunk_size=self.page_size + 1)])
+
+    # CursorPagination.paginate_queryset split around the database read:
+    # _page_queryset builds the query for the requested page and _set_page
+    # computes the neighbouring cursors from its rows.
+
+    def _page_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith('-')
+            order_attr = order.lstrip('-')
+
+            # Test for: (cursor reversed) XOR (queryset reversed)
+            if self.cursor.reverse != is_reversed:
+                kwargs = {order_attr + '__lt': current_position}
+            else:
+                kwargs = {order_attr + '__gt': current_position}
+
+            queryset = queryset.filter(**kwargs)
+
+        # One extra row tells whether a following page exists
+        self._page_state = (offset, reverse, current_position)
+        return queryset[offset:offset + self.page_size + 1]
+
+    def _set_page(self, results):
+        offset, reverse, current_position = self._page_state
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class AvailableProjectsPagination(LinkHeaderCursorPagination):
+    """
+    Cursor pagination for the available projects listing, ordered by id.
+    """
+    ordering = 'id'
+    page_size_setting = 'AVAILABLE_PROJECTS_PAGE_SIZE'
+
+
+class ProjectInterestsPagination(LinkHeaderCursorPagination):
+    """
+    Cursor pagination for the interests of a project.
+
+    Ordered by ``created_at`` (oldest first) or, with ``?ordering=-created_at``,
+    newest first. The id breaks ties between interests created at the same
+    time.
+    """
+    ordering = ('created_at', 'id')
+    page_size_setting = 'PROJECT_INTERESTS_PAGE_SIZE'
+    ordering_param = 'ordering'
+    orderings = {
+        'created_at': ('created_at', 'id'),
+        '-created_at': ('-created_at', '-id'),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        return self.orderings.get(
+            request.query_params.get(self.ordering_param), self.ordering)
+
+
+class ProjectSearchPagination(LinkHeaderMixin, LimitOffsetPagination):
+    """
+    Limit/offset pagination for search results.
+
+    Results are ordered by relevance, which has no stable key to build a
+    cursor from. The page is fetched with one extra row to know whether a
+    next page exists, instead of counting every match.
+    """
+    default_limit = 20
+    max_limit = 500
+
+    def get_limit(self, request):
+        self.default_limit = getattr(
+            settings, 'PROJECT_SEARCH_PAGE_SIZE', self.default_limit)
+        self.max_limit = getattr(settings, 'API_MAX_PAGE_SIZE', self.max_limit)
+        return super().get_limit(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit)
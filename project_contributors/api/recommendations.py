@@ -0,0 +1,208 @@
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F
+
+from api.models import OpenSourceProject
+
+
+def _iter_bits(mask):
+    """
+    Yield the positions of the set bits of ``mask``, lowest first.
+
+    Works on 64-bit words so that sparse masks over many projects do not
+    cost a big-int operation per set bit.
+    """
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+    for offset in range(0, len(data), 8):
+        word = int.from_bytes(data[offset:offset + 8], 'little')
+        while word:
+            low = word & -word
+            yield offset * 8 + low.bit_length() - 1
+            word ^= low
+
+
+class ProjectSkillIndex:
+    """
+    In-memory inverted index from ProgrammingSkill ids to projects.
+
+    Every project gets a slot (slots follow project ids) and every skill a
+    bitset, stored as a Python int, with one bit per project requiring it.
+    A second bitset marks the projects that can take collaborators: not
+    closed and with free seats. Ranking a user's (at most three) skills is
+    then a handful of big-int ANDs/ORs over the whole table instead of a
+    join per request.
+
+    The index is per process. It is built lazily, kept in sync with local
+    changes by ``update_project``/``remove_project`` (see api/signals.py and
+    the views updating seat counters) and rebuilt every
+    ``RECOMMENDATIONS_INDEX_TTL`` seconds to pick up changes made by other
+    processes. Until then those changes are missing: a project another
+    process created, reopened or freed a seat in is not recommended, and a
+    project whose required skills changed there is matched against its old
+    ones. Callers re-check candidates against the database, which only
+    drops projects that were closed or filled up meanwhile.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._reset()
+
+    def _reset(self):
+        self._slots = {}
+        self._project_ids = []
+        self._skill_masks = defaultdict(int)
+        self._project_skills = {}
+        self._available = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'RECOMMENDATIONS_INDEX_TTL', 30)
+
+    def _slot(self, project_id):
+        slot = self._slots.get(project_id)
+        if slot is None:
+            slot = len(self._project_ids)
+            self._slots[project_id] = slot
+            self._project_ids.append(project_id)
+        return slot
+
+    def _set_project(self, project_id, available, skill_ids):
+        bit = 1 << self._slot(project_id)
+        for skill_id in self._project_skills.get(project_id, ()):
+            self._skill_masks[skill_id] &= ~bit
+        for skill_id in skill_ids:
+            self._skill_masks[skill_id] |= bit
+        self._project_skills[project_id] = frozenset(skill_ids)
+        if available:
+            self._available |= bit
+        else:
+            self._available &= ~bit
+
+    def rebuild(self):
+        """
+        Load the whole index from the database (two queries).
+        """
+        through = OpenSourceProject.required_skills.through
+        projects = OpenSourceProject.objects.order_by('id').values_list(
+            'id', 'status', 'current_collaborators', 'maximum_collaborators')
+        skills = defaultdict(list)
+        for project_id, skill_id in through.objects.values_list(
+                'opensourceproject_id', 'programmingskill_id').iterator(chunk_size=10000):
+            skills[project_id].append(skill_id)
+
+        with self._lock:
+            self._reset()
+            for project_id, status, current, maximum in projects.iterator(chunk_size=10000):
+                self._set_project(
+                    project_id, status != 'closed' and current < maximum, skills.get(project_id, ()))
+            self._built_at = time.monotonic()
+
+    def _ensure_built(self):
+        with self._lock:
+            if self._built_at is None or time.monotonic() - self._built_at > self.ttl:
+                self.rebuild()
+
+    def update_project(self, project_id):
+        """
+        Re-read one project from the database, if the index is loaded.
+        """
+        with self._lock:
+            if self._built_at is None:
+                return
+        row = OpenSourceProject.objects.filter(pk=project_id).values_list(
+            'status', 'current_collaborators', 'maximum_collaborators').first()
+        if row is None:
+            self.remove_project(project_id)
+            return
+        status, current, maximum = row
+        skill_ids = OpenSourceProject.required_skills.through.objects.filter(
+            opensourceproject_id=project_id).values_list('programmingskill_id', flat=True)
+        with self._lock:
+            self._set_project(project_id, status != 'closed' and current < maximum, list(skill_ids))
+
+    def remove_project(self, project_id):
+        with self._lock:
+            if project_id in self._slots:
+                self._set_project(project_id, False, ())
+                del self._project_skills[project_id]
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._built_at = None
+
+    def rank(self, skill_ids):
+        """
+        Yield ``(project_id, matched_skills)`` for every available project
+        requiring at least one of ``skill_ids``, best matches first and by
+        project id within the same score.
+        """
+        self._ensure_built()
+        with self._lock:
+            masks = [self._skill_masks.get(skill_id, 0) & self._available
+                     for skill_id in set(skill_ids)]
+            project_ids = self._project_ids
+
+        # Bit-sliced counters: counters[k] holds bit k of the number of
+        # matched skills of every project
+        counters = []
+        for mask in masks:
+            carry = mask
+            for k, counter in enumerate(counters):
+                counters[k], carry = counter ^ carry, counter & carry
+                if not carry:
+                    break
+            if carry:
+                counters.append(carry)
+
+        for score in range(len(masks), 0, -1):
+            if score >> len(counters):
+                # More matches than any project has
+                continue
+            level = -1
+            for k, counter in enumerate(counters):
+                level &= counter if score >> k & 1 else ~counter
+            for slot in _iter_bits(level):
+                yield project_ids[slot], score
+
+
+project_index = ProjectSkillIndex()
+
+
+def recommend_projects(user, limit):
+    """
+    Open projects with free seats ranked by how many of ``user``'s skills
+    they require.
+
+    Candidates come from ``project_index`` and are confirmed against the
+    database in batches, skipping projects the user created or already
+    collaborates on.
+
+    Returns:
+        A list of ``(project, matched_skills)`` pairs, at most ``limit`` long.
+    """
+    skill_ids = list(user.programming_skills.values_list('id', flat=True))
+    if not skill_ids or limit <= 0:
+        return []
+
+    ranked = project_index.rank(skill_ids)
+    recommendations = []
+    while len(recommendations) < limit:
+        batch = []
+        for project_id, score in ranked:
+            batch.append((project_id, score))
+            if len(batch) >= 2 * limit:
+                break
+        if not batch:
+            break
+        projects = OpenSourceProject.objects.select_related('creator').filter(
+            id__in=[project_id for project_id, _ in batch],
+            current_collaborators__lt=F('maximum_collaborators')
+        ).exclude(status='closed').exclude(creator=user).exclude(collaborators=user).in_bulk()
+        recommendations.extend(
+            (projects[project_id], score) for project_id, score in batch if project_id in projects)
+    return recommendations[:limit]
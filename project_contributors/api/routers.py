@@ -0,0 +1,118 @@
+"""
+Routing of reads to the read replicas of the default database (see
+``DATABASE_REPLICAS`` in settings.py).
+"""
+import contextvars
+import random
+import sqlite3
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Replica the reads of the request being handled go to, None for the
+# primary. Context variables follow the request into the threads
+# sync_to_async runs the ORM on.
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+# Requests whose reads may go to a replica
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def pin_to_primary():
+    """
+    Send the remaining reads of the current request to the primary.
+    """
+    _read_alias.set(None)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send writes to the primary, and the reads of GET, HEAD and OPTIONS
+    requests to one of ``DATABASE_REPLICAS`` (picked per request by
+    ``ReplicaRoutingMiddleware``).
+
+    Reads stay on the primary outside requests, inside transactions (a
+    replica cannot see their uncommitted rows), and for the rest of a
+    request once it writes, so a request always reads its own writes.
+    Replicas may lag behind the primary: the next request of a client that
+    just wrote can still read the old rows.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pick the replica the reads of a GET, HEAD or OPTIONS request go to.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_alias.set(self.read_alias(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+    async def __acall__(self, request):
+        token = _read_alias.set(self.read_alias(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+    @staticmethod
+    def read_alias(request):
+        replicas = settings.DATABASE_REPLICAS
+        if request.method not in SAFE_METHODS or not replicas:
+            return None
+        return random.choice(replicas)
+
+
+def sync_replica(alias):
+    """
+    Copy the primary SQLite database into the file of replica ``alias``
+    with SQLite's online backup API, which leaves the primary usable
+    during the copy.
+
+    Stands in for a replication tool when trying replicas out locally.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    replica = connections[alias]
+    if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+        raise ValueError('Only SQLite databases can be synced, use replication otherwise')
+    primary.ensure_connection()
+    # A connection of its own, so that open replica connections keep
+    # their state and wait on the busy timeout while the copy is written
+    target = sqlite3.connect(replica.settings_dict['NAME'],
+                             timeout=replica.settings_dict['OPTIONS'].get('timeout', 5))
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
@@ -0,0 +1,75 @@
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Func, Lookup, Value
+
+from api.models import OpenSourceProject, ProjectSearch
+
+
+SEARCH_TABLE = ProjectSearch._meta.db_table
+
+# bm25 weights of the (project_name, description) columns: a hit in the
+# name counts for more than the same hit in the description
+SEARCH_WEIGHTS = (10.0, 1.0)
+
+_TERM = re.compile(r'(\w+)(\*?)')
+
+
+class Match(Lookup):
+    """
+    ``search__match``: FTS5 full-text match of the hidden table column.
+    """
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+ProjectSearch._meta.get_field('search').register_lookup(Match)
+
+
+def search_available():
+    """
+    Whether the database has the FTS5 search index (SQLite only).
+    """
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Turn free text typed by a user into an FTS5 MATCH expression.
+
+    Every word becomes a quoted term, so FTS5 operators and punctuation in
+    the input are never interpreted, and all terms must match. A trailing
+    ``*`` turns a word into a prefix query (``pyth*`` matches ``python``).
+
+    Returns:
+        The MATCH expression, or None if the text has no searchable word.
+    """
+    terms = [f'"{word}"{star}' for word, star in _TERM.findall(text or '')]
+    return ' '.join(terms) or None
+
+
+def ranked_projects(match_query, queryset=None):
+    """
+    Projects matching an FTS5 expression, best matches (lowest bm25) first.
+
+    Args:
+        match_query: Expression returned by ``build_match_query``.
+        queryset: OpenSourceProject queryset to search in, so that the
+            search can be combined with other filters. Defaults to all
+            projects.
+
+    Returns:
+        The queryset, annotated with ``rank`` and ordered by it, then by id.
+    """
+    if queryset is None:
+        queryset = OpenSourceProject.objects.all()
+    # The filter joins the index to the projects on its rowid, which bm25()
+    # needs: it ranks the rows of the MATCH of the same query
+    rank = Func(F('search_entry__search'), *(Value(weight) for weight in SEARCH_WEIGHTS),
+                function='bm25', output_field=FloatField())
+    return queryset.filter(search_entry__search__match=match_query).annotate(
+        rank=rank).order_by('rank', 'id')
@@ -0,0 +1,474 @@
+"""
+Generation of synthetic users, skills, projects and interests, for
+benchmarks and for reproducing production-sized tables locally (see the
+``seed`` management command).
+
+Random values are drawn a column at a time with ``random.choices``, and
+rows are zipped from the columns and written with ``executemany``, with
+primary keys assigned here, so no model instance is built and no id is
+read back. Most of the time goes to SQLite, inserting the rows and
+building the indexes.
+Popularity follows heavy-tailed distributions: a few skills are listed by
+most users and projects, a few users create and apply to many projects, and
+a few projects draw most of the interests.
+"""
+import operator
+import random
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from itertools import accumulate, chain, compress, islice, repeat
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.cache import LISTING_VERSION, bump_cache_version
+from api.models import ExpressionOfInterest, OpenSourceProject, User
+from api.search import SEARCH_TABLE
+from api.utils import get_or_create_skills
+
+
+# Row counts of the named scale factors
+SCALES = {
+    'small': {'users': 1000, 'skills': 50, 'projects': 2000, 'interests': 5000},
+    'medium': {'users': 10000, 'skills': 200, 'projects': 20000, 'interests': 50000},
+    'large': {'users': 100000, 'skills': 500, 'projects': 200000, 'interests': 500000},
+    'huge': {'users': 1000000, 'skills': 1000, 'projects': 1000000, 'interests': 5000000},
+}
+
+# Password of every generated user
+SEED_PASSWORD = 'password'
+
+USERNAME = 'seed_user_{}'
+EMAIL = 'seed{}@example.com'
+PROJECT_NAME = 'Seed project {}'
+
+# Names of the most popular skills, the others are numbered
+SKILL_NAMES = ('Python', 'JavaScript', 'TypeScript', 'Java', 'Go', 'Rust', 'C', 'C++',
+               'C#', 'Ruby', 'PHP', 'Kotlin', 'Swift', 'Scala', 'Haskell', 'Elixir',
+               'SQL', 'Bash', 'R', 'Julia')
+
+WORDS = ('api', 'async', 'cache', 'cli', 'compiler', 'data', 'database', 'docs',
+         'framework', 'graph', 'library', 'machine', 'learning', 'mobile', 'network',
+         'parser', 'plugin', 'python', 'queue', 'search', 'security', 'server',
+         'storage', 'testing', 'tooling', 'web')
+
+# Shape of the popularity distributions of users and projects, lower is
+# more skewed. Skill popularity follows Zipf's law.
+PARETO_ALPHA = 1.2
+# Cumulative weights of users having 0, 1, 2 and 3 skills (15/35/30/20%)
+SKILL_COUNT_WEIGHTS = (15, 50, 80, 100)
+AGES = range(16, 71)
+CAPACITIES = range(1, 11)
+# Chance of an applicant being accepted while the project has seats
+ACCEPT_RATE = 0.3
+# Statuses of interests and their cumulative weights: a third of the
+# applicants not accepted are rejected. Applicants accepted past the seats
+# of a project are rejected.
+INTEREST_STATUSES = (ExpressionOfInterest.ACCEPTED, ExpressionOfInterest.REJECTED,
+                     ExpressionOfInterest.PENDING)
+INTEREST_STATUS_WEIGHTS = (ACCEPT_RATE, ACCEPT_RATE + (1 - ACCEPT_RATE) / 3, 1)
+FULL_PROJECT_STATUSES = {
+    ExpressionOfInterest.ACCEPTED: ExpressionOfInterest.REJECTED,
+    ExpressionOfInterest.REJECTED: ExpressionOfInterest.REJECTED,
+    ExpressionOfInterest.PENDING: ExpressionOfInterest.PENDING,
+}
+# Share of closed projects
+CLOSED_RATE = 0.1
+# Distinct timestamps and descriptions the generated rows draw from
+TIMESTAMPS = 10000
+DESCRIPTIONS = 1000
+# SQLite settings of the connection while it seeds (see _bulk_pragmas).
+# The journal stays in memory, so a failed run still rolls back, but a
+# crash in the middle of the commit can corrupt the database. Foreign keys
+# are not checked: generated rows only reference ids assigned here.
+BULK_LOAD_PRAGMAS = {
+    'synchronous': 'OFF',
+    'journal_mode': 'MEMORY',
+    'cache_size': -256 * 1024,  # negative: KiB rather than pages
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'OFF',
+}
+
+
+def seed_database(users, skills, projects, interests, seed=0, batch_size=10000,
+                  chunk_size=100000, progress=None):
+    """
+    Add generated rows to the database, in one transaction.
+
+    Users have up to MAX_PROGRAMMING_SKILLS skills and share one password
+    (``SEED_PASSWORD``), hashed once. Projects require up to three skills
+    and have a creator, a capacity of 1 to 10 and a status, with
+    ``current_collaborators`` matching their collaborators. Interests go to
+    distinct (project, user) pairs: collaborators hold accepted interests,
+    the others are pending or rejected.
+
+    Skills are looked up by name and only the missing ones created, so
+    seeding twice adds users and projects but no skills. Other rows are
+    numbered after the existing ones. The same arguments on the same
+    database produce the same rows.
+
+    Rows are generated ``chunk_size`` users or projects at a time and
+    inserted ``batch_size`` per statement. On SQLite, the connection skips
+    fsyncs, keeps its journal in memory and does not check foreign keys
+    during the load (see ``_bulk_pragmas``), and when the rows outnumber
+    those already in a table, its secondary indexes are built once the rows
+    are in, and the project search index is rebuilt and the listing version
+    bumped once rather than by per-row triggers (see ``_bulk_load``). No
+    signals are sent: user analytics summaries are built on first access
+    and the in-process caches start empty.
+
+    Args:
+        users: Number of users.
+        skills: Number of programming skills.
+        projects: Number of projects.
+        interests: Number of expressions of interest. Projects never get
+            more interests than there are users, so very small user counts
+            can end up with fewer.
+        seed: Seed of the random generator.
+        batch_size: Rows per INSERT statement.
+        chunk_size: Users or projects generated at a time.
+        progress: Optional callable receiving the dict of rows created so
+            far after every chunk.
+
+    Returns:
+        A dict with the number of rows created per kind, including
+        ``collaborators`` and the skill links.
+    """
+    from api.views import MAX_PROGRAMMING_SKILLS
+
+    if projects and not users:
+        raise ValueError('Projects need at least one user to create them')
+    rng = random.Random(seed)
+    created = dict.fromkeys(
+        ['users', 'skills', 'user_skills', 'projects', 'required_skills',
+         'collaborators', 'interests'], 0)
+
+    def report():
+        if progress is not None:
+            progress(dict(created))
+
+    user_skills = User.programming_skills.through
+    required_skills = OpenSourceProject.required_skills.through
+    collaborators = OpenSourceProject.collaborators.through
+
+    with _bulk_pragmas(), transaction.atomic(), ExitStack() as stack:
+        for model, rows in [(User, users), (user_skills, users), (OpenSourceProject, projects),
+                            (required_skills, projects), (collaborators, interests),
+                            (ExpressionOfInterest, interests)]:
+            stack.enter_context(_bulk_load(model, rows))
+
+        names = [SKILL_NAMES[i] if i < len(SKILL_NAMES) else f'Skill {i}'
+                 for i in range(skills)]
+        skills_by_name = get_or_create_skills(names)
+        skill_ids = [skills_by_name[name].id for name in names]
+        created['skills'] = len(skill_ids)
+        # Skills listed first are the most popular
+        skill_weights = list(accumulate(1 / rank for rank in range(1, skills + 1)))
+        max_skills = min(MAX_PROGRAMMING_SKILLS, len(skill_ids))
+        report()
+
+        first_user = _next_id(User)
+        user_ids = range(first_user, first_user + users)
+        user_weights = _cumulative_weights(rng, users)
+        password = make_password(SEED_PASSWORD)
+        joined = _timestamps()
+
+        for start in range(0, users, chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            skill_counts = list(map(min, rng.choices(
+                range(4), cum_weights=SKILL_COUNT_WEIGHTS, k=len(chunk)), repeat(max_skills)))
+            user_rows = zip(
+                chunk, map(USERNAME.format, chunk), map(EMAIL.format, chunk), repeat(password),
+                repeat(False), repeat(False), repeat(True), repeat(''), repeat(''),
+                _spread(joined, start, start + len(chunk), users),
+                rng.choices(AGES, k=len(chunk)))
+            created['users'] += _insert(
+                User, ['id', 'username', 'email', 'password', 'is_superuser', 'is_staff',
+                       'is_active', 'first_name', 'last_name', 'date_joined', 'age'],
+                user_rows, batch_size)
+            created['user_skills'] += _insert(
+                user_skills, ['user_id', 'programmingskill_id'],
+                _pairs(chunk, skill_counts,
+                       _draw(rng, skill_ids, skill_weights, sum(skill_counts))),
+                batch_size)
+            report()
+
+        counts = _interest_counts(rng, projects, interests, users)
+        first_project = _next_id(OpenSourceProject)
+        first_interest = _next_id(ExpressionOfInterest)
+        changed = _timestamps()
+        descriptions = [' '.join(rng.choices(WORDS, k=12)) for _ in range(DESCRIPTIONS)]
+        interest_index = 0
+
+        for start in range(0, projects, chunk_size):
+            size = min(chunk_size, projects - start)
+            project_ids = range(first_project + start, first_project + start + size)
+            capacities = rng.choices(CAPACITIES, k=size)
+            creators = rng.choices(user_ids, cum_weights=user_weights, k=size)
+            required_counts = list(map(min, rng.choices(range(4), k=size), repeat(max_skills)))
+            closed = rng.choices((True, False), cum_weights=(CLOSED_RATE, 1), k=size)
+            group_sizes = counts[start:start + size]
+            # Sorted applicants give rows in the order of the unique
+            # (project, user) indexes, see _bulk_load
+            applicant_groups = [sorted(group) for group in _pick_groups(
+                rng, user_ids, user_weights, group_sizes)]
+            applicants = list(chain.from_iterable(applicant_groups))
+            applied_to = list(_owners(project_ids, group_sizes))
+            statuses = rng.choices(INTEREST_STATUSES, cum_weights=INTEREST_STATUS_WEIGHTS,
+                                   k=len(applicants))
+
+            seats = []
+            project_statuses = []
+            position = 0
+            for capacity, group_size, is_closed in zip(capacities, group_sizes, closed):
+                end = position + group_size
+                accepted = statuses[position:end].count(ExpressionOfInterest.ACCEPTED)
+                if accepted > capacity:
+                    # Full: the applicants accepted past the last seat are rejected
+                    cut = position
+                    for _ in range(capacity):
+                        cut = statuses.index(ExpressionOfInterest.ACCEPTED, cut, end) + 1
+                    statuses[cut:end] = map(FULL_PROJECT_STATUSES.get, statuses[cut:end])
+                    accepted = capacity
+                seats.append(accepted)
+                if is_closed:
+                    project_statuses.append('closed')
+                else:
+                    project_statuses.append('active' if accepted else 'draft')
+                position = end
+
+            project_rows = zip(
+                project_ids, map(PROJECT_NAME.format, project_ids),
+                rng.choices(descriptions, k=size), capacities, seats, creators,
+                project_statuses, _spread(changed, start, start + size, projects))
+            created['projects'] += _insert(
+                OpenSourceProject, ['id', 'project_name', 'description', 'maximum_collaborators',
+                                    'current_collaborators', 'creator_id', 'status',
+                                    'updated_at'],
+                project_rows, batch_size)
+            created['required_skills'] += _insert(
+                required_skills, ['opensourceproject_id', 'programmingskill_id'],
+                _pairs(project_ids, required_counts,
+                       _draw(rng, skill_ids, skill_weights, sum(required_counts))),
+                batch_size)
+            created['collaborators'] += _insert(
+                collaborators, ['opensourceproject_id', 'user_id'],
+                compress(zip(applied_to, applicants),
+                         map(operator.eq, statuses, repeat(ExpressionOfInterest.ACCEPTED))),
+                batch_size)
+            stop = interest_index + len(applicants)
+            when = list(_spread(changed, interest_index, stop, interests))
+            created['interests'] += _insert(
+                ExpressionOfInterest, ['id', 'user_id', 'project_id', 'status', 'created_at',
+                                       'updated_at'],
+                zip(range(first_interest + interest_index, first_interest + stop),
+                    applicants, applied_to, statuses, when, when),
+                batch_size)
+            interest_index = stop
+            report()
+
+        if connection.vendor != 'sqlite':
+            # Move the sequences past the ids assigned here
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                        no_style(), [User, OpenSourceProject, ExpressionOfInterest]):
+                    cursor.execute(sql)
+    return created
+
+
+@contextmanager
+def _bulk_pragmas():
+    """
+    On SQLite, apply ``BULK_LOAD_PRAGMAS`` to the connection for the block,
+    and restore the previous values afterwards.
+
+    The journal mode and foreign key enforcement cannot change inside a
+    transaction, so nothing is changed when the block runs in one. A
+    database in WAL mode stays in it: leaving WAL needs exclusive access,
+    and without fsyncs WAL commits are as cheap.
+    """
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        saved = {}
+        for name, value in BULK_LOAD_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}')
+            current = cursor.fetchone()[0]
+            if name == 'journal_mode' and current.lower() == 'wal':
+                continue
+            saved[name] = current
+            cursor.execute(f'PRAGMA {name} = {value}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in reversed(saved.items()):
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def _bulk_load(model, rows):
+    """
+    On SQLite, drop the secondary indexes and INSERT triggers of ``model``'s
+    table for the block when ``rows`` outnumber its current rows, and
+    restore them afterwards.
+
+    Building an index over sorted rows is much cheaper than updating it row
+    by row. The triggers of api_opensourceproject (search index and listing
+    version, see migrations 0010 and 0011) are replaced by one statement
+    each: the search index is rebuilt from the table. Must run inside a
+    transaction: SQLite DDL is transactional, so other connections never
+    see the table without its indexes and a failure rolls everything back.
+
+    The index of a unique constraint declared in CREATE TABLE, like the
+    (project, user) one of interests, cannot be dropped; callers insert
+    rows in its order, so it only grows at its end.
+    """
+    if connection.vendor != 'sqlite' or not rows or rows <= model.objects.count():
+        yield
+        return
+
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = %s AND sql IS NOT NULL "
+            "AND (type = 'index' OR (type = 'trigger' AND sql LIKE %s))",
+            [table, '%AFTER INSERT%'])
+        schema = cursor.fetchall()
+        for kind, name, _ in schema:
+            cursor.execute(f'DROP {kind.upper()} {connection.ops.quote_name(name)}')
+
+    yield
+
+    with connection.cursor() as cursor:
+        for _, _, sql in schema:
+            cursor.execute(sql)
+        triggers = {name for kind, name, _ in schema if kind == 'trigger'}
+        if 'api_project_search_insert' in triggers:
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+    if 'api_listing_version_insert' in triggers:
+        bump_cache_version(LISTING_VERSION)
+
+
+def _next_id(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return (last or 0) + 1
+
+
+def _cumulative_weights(rng, count):
+    """
+    Cumulative Pareto weights of ``count`` items, for ``random.choices``.
+    """
+    return list(accumulate(rng.paretovariate(PARETO_ALPHA) for _ in range(count)))
+
+
+def _draw(rng, population, cum_weights, count):
+    # random.choices needs weights even for no draws
+    return rng.choices(population, cum_weights=cum_weights, k=count) if count else []
+
+
+def _pick_groups(rng, population, cum_weights, counts):
+    """
+    Groups of distinct items of ``population`` drawn by weight, one group
+    of each of the ``counts`` sizes (capped to the population).
+
+    All the items are drawn in one call, groups that drew the same item
+    twice draw again.
+    """
+    counts = [min(count, len(population)) for count in counts]
+    sparse = sum(count for count in counts if count * 2 <= len(population))
+    draws = iter(_draw(rng, population, cum_weights, sparse))
+    groups = []
+    for count in counts:
+        if count * 2 > len(population):
+            # Dense picks: weighted draws would mostly hit items already taken
+            groups.append(rng.sample(population, count))
+            continue
+        group = dict.fromkeys(islice(draws, count))
+        while len(group) < count:
+            group.update(dict.fromkeys(
+                rng.choices(population, cum_weights=cum_weights, k=count - len(group))))
+        groups.append(group)
+    return groups
+
+
+def _owners(ids, counts):
+    """
+    Each of ``ids`` repeated as many times as its count in ``counts``.
+    """
+    return chain.from_iterable(map(repeat, ids, counts))
+
+
+def _pairs(ids, counts, items):
+    """
+    Distinct (id, item) rows pairing ``counts`` consecutive ``items`` with
+    each of ``ids``. An id that drew an item twice gets one row for it.
+    """
+    return dict.fromkeys(zip(_owners(ids, counts), items))
+
+
+def _interest_counts(rng, projects, interests, users):
+    """
+    Number of interests of every project, ``interests`` in total (less when
+    projects would need more interests than there are users).
+    """
+    if not projects:
+        return []
+    weights = [rng.paretovariate(PARETO_ALPHA) for _ in range(projects)]
+    total = sum(weights)
+    counts = [min(int(interests * weight / total), users) for weight in weights]
+    remainder = interests - sum(counts)
+    open_projects = [index for index, count in enumerate(counts) if count < users]
+    while remainder > 0 and open_projects:
+        # Drawn in one call, projects filled up on the way skip their draws
+        for index in rng.choices(open_projects, k=remainder):
+            if counts[index] < users:
+                counts[index] += 1
+                remainder -= 1
+        open_projects = [index for index, count in enumerate(counts) if count < users]
+    return counts
+
+
+def _timestamps():
+    """
+    ``TIMESTAMPS`` increasing datetimes over the past year, in the form the
+    database driver takes them.
+    """
+    now = timezone.now()
+    step = timedelta(days=365) / TIMESTAMPS
+    # Bound once: every access to connection goes through a thread-local lookup
+    adapt = connection.ops.adapt_datetimefield_value
+    return [adapt(now - step * (TIMESTAMPS - i)) for i in range(TIMESTAMPS)]
+
+
+def _spread(timestamps, start, stop, total):
+    """
+    Timestamps of rows ``start`` to ``stop`` of ``total``, spreading the
+    rows evenly over ``timestamps`` in order.
+    """
+    positions = map(operator.floordiv, map(operator.mul, range(start, stop),
+                                           repeat(len(timestamps))), repeat(total))
+    return map(timestamps.__getitem__, positions)
+
+
+def _insert(model, fields, rows, batch_size):
+    """
+    Insert the tuples of the iterable ``rows``, ``batch_size`` per
+    statement, and return their number.
+    """
+    opts = model._meta
+    columns = ', '.join(connection.ops.quote_name(opts.get_field(field).column)
+                        for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    sql = f'INSERT INTO {connection.ops.quote_name(opts.db_table)} ({columns}) VALUES ({placeholders})'
+    rows = iter(rows)
+    count = 0
+    with connection.cursor() as cursor:
+        for batch in iter(lambda: list(islice(rows, batch_size)), []):
+            cursor.executemany(sql, batch)
+            count += len(batch)
+    return count
@@ -1,5 +1,32 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from api.models import OpenSourceProject, ExpressionOfInterest, User, ProgrammingSkill
+from api.skills import skill_vocabulary
+
+
+class SkillNameField(serializers.RelatedField):
+    """
+    A programming skill written and read by name.
+
+    Like ``SlugRelatedField(slug_field='name')``, but names are resolved to
+    ids through ``skill_vocabulary`` instead of one query per name. The
+    validated value is the skill id, which related managers accept as is.
+    """
+    default_error_messages = {
+        'does_not_exist': _('Object with name={value} does not exist.'),
+        'invalid': _('Invalid value.'),
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        skill_id = skill_vocabulary.ids([data]).get(data)
+        if skill_id is None:
+            self.fail('does_not_exist', value=data)
+        return skill_id
+
+    def to_representation(self, value):
+        return value.name
 
 
 class OpenSourceProjectSerializer(serializers.ModelSerializer):
@@ -10,10 +37,13 @@ class OpenSourceProjectSerializer(serializers.ModelSerializer):
     into JSON representations.
     """
 
+    required_skills = SkillNameField(
+        many=True, required=False, queryset=ProgrammingSkill.objects.all())
+
     class Meta:
         model = OpenSourceProject
         fields = ['project_name', 'description',
-                  'maximum_collaborators', 'collaborators']
+                  'maximum_collaborators', 'collaborators', 'required_skills']
 
 
 class UserDetailSerializer(serializers.ModelSerializer):
@@ -30,7 +60,11 @@ class UserDetailSerializer(serializers.ModelSerializer):
         fields = ['username', 'email', 'programming_skills']
 
     def get_programming_skills(self, obj):
-        return list(obj.programming_skills.values_list('name', flat=True))
+        # Views listing many users pass the names from api.skills.user_skill_names
+        skill_names = self.context.get('skill_names')
+        if skill_names is not None:
+            return skill_names.get(obj.pk, [])
+        return [skill.name for skill in obj.programming_skills.all()]
 
 
 class ExpressionOfInterestSerializer(serializers.ModelSerializer):
@@ -39,7 +73,8 @@ class ExpressionOfInterestSerializer(serializers.ModelSerializer):
 
     This serializer is used to represent an ExpressionOfInterest instance,
     including details about the user expressing interest, such as username,
-    email, and programming skills.
+    email, and programming skills. Pass ``skill_names`` in the context (see
+    ``api.skills.user_skill_names``) to avoid loading skills per user.
     """
     user_details = UserDetailSerializer(source='user', read_only=True)
 
@@ -0,0 +1,173 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api.analytics import project_user_ids, schedule_analytics_refresh
+from api.authentication import token_cache
+from api.recommendations import project_index
+from api.skills import skill_vocabulary
+from api.models import ExpressionOfInterest, OpenSourceProject, ProgrammingSkill
+
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    # Also covers regeneration, which deletes the old token first
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=Token)
+def invalidate_saved_token(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    # Deactivation and password changes both go through a save
+    token_cache.invalidate_user(instance.pk)
+
+
+# User analytics summaries (api.models.UserAnalytics)
+
+@receiver(post_save, sender=OpenSourceProject)
+def project_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        schedule_analytics_refresh([instance.creator_id])
+    elif not update_fields or 'project_name' in update_fields:
+        # The name may have changed, which shows up for every related user
+        schedule_analytics_refresh(project_user_ids(instance))
+
+
+@receiver(pre_delete, sender=OpenSourceProject)
+def project_deleting(sender, instance, **kwargs):
+    # Covers the interests and collaborator rows deleted along with the
+    # project (see interest_deleted)
+    schedule_analytics_refresh(project_user_ids(instance))
+
+
+@receiver(post_save, sender=ExpressionOfInterest)
+def interest_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'project', 'user'} & set(update_fields):
+        # e.g. a status change, which the summary does not depend on
+        return
+    schedule_analytics_refresh([instance.user_id])
+
+
+@receiver(post_delete, sender=ExpressionOfInterest)
+def interest_deleted(sender, instance, origin=None, **kwargs):
+    # Interests deleted along with their project were scheduled by
+    # project_deleting, in one query for the whole project
+    if isinstance(origin, OpenSourceProject) or getattr(origin, 'model', None) is OpenSourceProject:
+        return
+    schedule_analytics_refresh([instance.user_id])
+
+
+@receiver(post_save, sender=ProgrammingSkill)
+def skill_saved(sender, instance, created, **kwargs):
+    if not created:
+        user_ids = list(instance.users.values_list('pk', flat=True))
+        schedule_analytics_refresh(user_ids)
+        touch_interests(user_ids)
+
+
+def _m2m_changed_user_ids(sender, instance, action, pk_set, instance_is_user, instance_lookup):
+    """
+    Users affected by an m2m_changed signal on a many-to-many relation with
+    User, or None for the ``pre_*`` actions that need no refresh.
+
+    ``clear()`` sends no ``pk_set``, so the affected users are read from the
+    through table in ``pre_clear`` and remembered on the instance.
+    """
+    if instance_is_user:
+        return {instance.pk} if action.startswith('post_') else None
+    if action == 'pre_clear':
+        instance._analytics_cleared_ids = set(sender.objects.filter(
+            **{instance_lookup: instance.pk}).values_list('user_id', flat=True))
+        return None
+    if action == 'post_clear':
+        return getattr(instance, '_analytics_cleared_ids', set())
+    if action.startswith('post_'):
+        return pk_set or set()
+    return None
+
+
+@receiver(m2m_changed, sender=OpenSourceProject.collaborators.through)
+def collaborators_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # project.collaborators is the forward side, user.projects_contributed the reverse
+    user_ids = _m2m_changed_user_ids(
+        sender, instance, action, pk_set, reverse, 'opensourceproject_id')
+    if user_ids is not None:
+        schedule_analytics_refresh(user_ids)
+
+
+@receiver(m2m_changed, sender=User.programming_skills.through)
+def programming_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # user.programming_skills is the forward side, skill.users the reverse
+    user_ids = _m2m_changed_user_ids(
+        sender, instance, action, pk_set, not reverse, 'programmingskill_id')
+    if user_ids is not None:
+        schedule_analytics_refresh(user_ids)
+        touch_interests(user_ids)
+
+
+# Validators of the project_interests pages (ExpressionOfInterest.updated_at)
+
+def touch_interests(user_ids):
+    """
+    Mark the interests of the given users as changed. The applicant's
+    username, email and skills are shown with every interest.
+    """
+    ExpressionOfInterest.objects.filter(user_id__in=list(user_ids)).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=User)
+def applicant_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not {'username', 'email'} & set(update_fields)):
+        return
+    touch_interests([instance.pk])
+
+
+# Project recommendation index (api.recommendations.project_index)
+
+@receiver(post_save, sender=OpenSourceProject)
+def index_saved_project(sender, instance, **kwargs):
+    project_index.update_project(instance.pk)
+
+
+@receiver(post_delete, sender=OpenSourceProject)
+def index_deleted_project(sender, instance, **kwargs):
+    project_index.remove_project(instance.pk)
+
+
+@receiver(m2m_changed, sender=OpenSourceProject.required_skills.through)
+def required_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # instance is a skill, pk_set holds projects (None for clear())
+        if pk_set is None:
+            project_index.clear()
+        for project_id in pk_set or ():
+            project_index.update_project(project_id)
+    else:
+        project_index.update_project(instance.pk)
+
+
+# Skill name interning (api.skills.skill_vocabulary)
+
+@receiver(post_save, sender=ProgrammingSkill)
+def intern_saved_skill(sender, instance, created, **kwargs):
+    if not created:
+        # The old name must stop resolving right away
+        skill_vocabulary.forget(instance.pk)
+    skill_vocabulary.remember({instance.name: instance.pk})
+
+
+@receiver(post_delete, sender=ProgrammingSkill)
+def intern_deleted_skill(sender, instance, **kwargs):
+    skill_vocabulary.forget(instance.pk)
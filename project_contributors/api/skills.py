@@ -0,0 +1,195 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from api.cache import get_cache_version
+from api.models import ProgrammingSkill, User
+from api.utils import get_or_create_skills
+
+
+# Name of the CacheVersion row guarding the skill vocabulary. Database
+# triggers replace it whenever a skill is renamed or deleted (migration
+# 0013). New skills need no bump: unknown names and ids are looked up.
+SKILL_VERSION = 'programming_skills'
+
+
+class SkillVocabulary:
+    """
+    In-memory, bidirectional intern table of ProgrammingSkill names and ids.
+
+    Skills are a small vocabulary that almost only grows, so every process
+    keeps the whole table and resolves names to ids (and back) without a
+    query. The table is loaded lazily and reloaded when the ``SKILL_VERSION``
+    generation changes, which is checked at most every
+    ``SKILL_VOCABULARY_CHECK_INTERVAL`` seconds (0 checks on every access).
+    Renames and deletions made by other processes are therefore picked up
+    within that interval. Changes made by this process are applied at once
+    by the signal handlers in api/signals.py.
+
+    Names and ids missing from the table are read from the database and
+    remembered. Inside a transaction nothing is reloaded and entries are
+    only remembered once it commits, so a rolled back insert can never leave
+    an id behind.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._names = {}
+        self._version = None
+        self._checked_at = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def check_interval(self):
+        return getattr(settings, 'SKILL_VOCABULARY_CHECK_INTERVAL', 5)
+
+    def _ensure_fresh(self):
+        if connection.in_atomic_block:
+            # Rows read here may not be committed yet: keep the current
+            # table and look up what it is missing
+            return
+        with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return
+        # The version is read before the rows: a change in between leaves
+        # the old version in place and triggers another reload
+        version = get_cache_version(SKILL_VERSION)
+        with self._lock:
+            if version is not None and version == self._version:
+                self._checked_at = time.monotonic()
+                return
+        skills = dict(ProgrammingSkill.objects.values_list('name', 'id'))
+        with self._lock:
+            self._ids = skills
+            self._names = {skill_id: name for name, skill_id in skills.items()}
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def remember(self, skills):
+        """
+        Add ``{name: id}`` pairs read from the database, once committed.
+        """
+        if skills:
+            transaction.on_commit(lambda: self.learn(skills))
+
+    def learn(self, skills):
+        with self._lock:
+            for name, skill_id in skills.items():
+                old_name = self._names.get(skill_id)
+                if old_name is not None and old_name != name:
+                    self._ids.pop(old_name, None)
+                self._ids[name] = skill_id
+                self._names[skill_id] = name
+
+    def forget(self, skill_id):
+        with self._lock:
+            name = self._names.pop(skill_id, None)
+            if name is not None and self._ids.get(name) == skill_id:
+                del self._ids[name]
+
+    def clear(self):
+        with self._lock:
+            self._ids = {}
+            self._names = {}
+            self._version = None
+            self._checked_at = None
+            self.hits = 0
+            self.misses = 0
+
+    def _known(self, keys, table):
+        with self._lock:
+            found = {key: table[key] for key in keys if key in table}
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            return found
+
+    def ids(self, names):
+        """
+        Ids of the existing skills among ``names``.
+
+        Returns:
+            A dict mapping each known name to its skill id. Names of skills
+            that do not exist are left out.
+        """
+        names = list(dict.fromkeys(names))
+        self._ensure_fresh()
+        found = self._known(names, self._ids)
+        missing = [name for name in names if name not in found]
+        if missing:
+            fetched = dict(ProgrammingSkill.objects.filter(
+                name__in=missing).values_list('name', 'id'))
+            self.remember(fetched)
+            found.update(fetched)
+        return found
+
+    def names(self, skill_ids):
+        """
+        Names of the existing skills among ``skill_ids``.
+
+        Returns:
+            A dict mapping each known skill id to its name.
+        """
+        skill_ids = list(dict.fromkeys(skill_ids))
+        self._ensure_fresh()
+        found = self._known(skill_ids, self._names)
+        missing = [skill_id for skill_id in skill_ids if skill_id not in found]
+        if missing:
+            fetched = dict(ProgrammingSkill.objects.filter(
+                pk__in=missing).values_list('name', 'id'))
+            self.remember(fetched)
+            found.update({skill_id: name for name, skill_id in fetched.items()})
+        return found
+
+    def get_or_create(self, names):
+        """
+        Ids of the skills with the given names, creating the missing ones
+        (see ``api.utils.get_or_create_skills``).
+
+        Returns:
+            A dict mapping each name to its skill id.
+        """
+        found = self.ids(names)
+        missing = [name for name in dict.fromkeys(names) if name not in found]
+        if missing:
+            created = {name: skill.id for name, skill in get_or_create_skills(missing).items()}
+            self.remember(created)
+            found.update(created)
+        return found
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._ids),
+                'check_interval': self.check_interval,
+            }
+
+
+skill_vocabulary = SkillVocabulary()
+
+
+def user_skill_names(user_ids):
+    """
+    Skill names of each of ``user_ids``, in the order they were added.
+
+    Only the user/skill join table is read; the names come from
+    ``skill_vocabulary``.
+
+    Returns:
+        A dict mapping each user id with skills to the list of their names.
+    """
+    rows = list(User.programming_skills.through.objects.filter(
+        user_id__in=list(user_ids)).order_by('id').values_list('user_id', 'programmingskill_id'))
+    if not rows:
+        return {}
+    names = skill_vocabulary.names(skill_id for _, skill_id in rows)
+    skills = {}
+    for user_id, skill_id in rows:
+        if skill_id in names:
+            skills.setdefault(user_id, []).append(names[skill_id])
+    return skills
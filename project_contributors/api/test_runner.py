@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    Test runner failing every request that goes over its ``QUERY_BUDGETS``
+    entry (see ``api.middleware.RequestMetricsMiddleware``), instead of
+    only logging a warning as in production.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._query_budgets_strict = getattr(settings, 'QUERY_BUDGETS_STRICT', False)
+        settings.QUERY_BUDGETS_STRICT = True
+
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_BUDGETS_STRICT = self._query_budgets_strict
+        super().teardown_test_environment(**kwargs)
@@ -1,12 +1,84 @@
-from django.test import TestCase
+import copy
+import json
+import logging
+import logging.config
+import math
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+from datetime import timedelta
+from io import StringIO
+from urllib.parse import quote
+
+import django
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.management import call_command
+from django.contrib.auth.hashers import MD5PasswordHasher, check_password
+from django.core.management.base import CommandError
+from django.db import connection, router, transaction
+from django.db.utils import ConnectionHandler
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from api.models import User
 from rest_framework.test import APITestCase
 from api.models import ProgrammingSkill
-from api.models import OpenSourceProject, ExpressionOfInterest
+from api.models import CacheVersion, OpenSourceProject, ExpressionOfInterest, UserAnalytics
 from api.serializers import ExpressionOfInterestSerializer
+from api import analytics
+from api.authentication import token_cache
+from api.cache import LISTING_VERSION, bump_cache_version, get_cache_version, listing_cache
+from api.recommendations import project_index
+from api.skills import SKILL_VERSION, skill_vocabulary
+from api.hashing import get_hashing_executor, hash_passwords
+from api.logs import JsonFormatter, QueueListenerHandler, SamplingFilter
+from api.database import _set_transaction_mode
+from api.middleware import QueryBudgetExceeded, _record_query, instrument
+from api.routers import ReplicaRoutingMiddleware
+from api.search import SEARCH_TABLE, search_available
+from api.seeding import SEED_PASSWORD, seed_database
+from rest_framework.authtoken.models import Token
+
+
+class QueryPlanAssertionsMixin:
+    """
+    Assertions on SQLite's EXPLAIN QUERY PLAN output.
+
+    A plan step of the form ``SCAN <table>`` (without ``USING ... INDEX``)
+    means SQLite reads the whole table, which is what the hot paths must
+    avoid.
+    """
+    TABLE_SCAN = re.compile(r'^SCAN (\S+)$')
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertUsesIndex(self, queryset, index_name=None):
+        if connection.vendor != 'sqlite':
+            raise unittest.SkipTest('EXPLAIN QUERY PLAN is SQLite specific')
+        plan = self.query_plan(queryset)
+        scans = [step for step in plan if self.TABLE_SCAN.match(step)]
+        self.assertFalse(
+            scans, f'Query scans a whole table: {plan}\n{queryset.query}')
+        if index_name:
+            self.assertTrue(
+                any(index_name in step for step in plan),
+                f'Query does not use index {index_name}: {plan}')
 
 
 class CreateUserTestCase(TestCase):
@@ -27,6 +99,123 @@ class CreateUserTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
 
+class BulkCreateUsersTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='admin', password='password', email='admin@example.com', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_bulk_create_users(self):
+        data = [
+            {'username': 'user1', 'password': 'password1', 'email': 'user1@example.com', 'country': 'Greece'},
+            {'username': 'user2', 'password': 'password2', 'email': 'user2@example.com'},
+        ]
+        with override_settings(PASSWORD_HASHING_EXECUTOR={'KIND': 'thread', 'WORKERS': 2}):
+            response = self.client.post('/api/bulk_create_users/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([result['status'] for result in response.data['results']],
+                         ['created', 'created'])
+        user1 = User.objects.get(username='user1')
+        self.assertTrue(user1.check_password('password1'))
+        self.assertEqual(user1.country, 'Greece')
+        self.assertTrue(User.objects.get(username='user2').check_password('password2'))
+
+    @override_settings(PASSWORD_HASHING_EXECUTOR={'KIND': None})
+    def test_bulk_create_users_reports_each_row(self):
+        data = [
+            {'username': 'admin', 'password': 'password', 'email': 'other@example.com'},
+            {'username': 'user1', 'password': 'password1', 'email': 'admin@example.com'},
+            {'username': 'user2', 'password': 'password2', 'email': 'user2@example.com'},
+            {'username': 'user2', 'password': 'password2', 'email': 'user2b@example.com'},
+            {'username': 'user3', 'email': 'user3@example.com'},
+        ]
+        response = self.client.post('/api/bulk_create_users/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(
+            [(result['status'], result.get('error')) for result in response.data['results']],
+            [('error', 'Username already exists'),
+             ('error', 'Email already exists'),
+             ('created', None),
+             ('error', 'Username already exists'),
+             ('error', 'Please provide username, password, and email')])
+        self.assertEqual(User.objects.count(), 2)
+
+    @override_settings(PASSWORD_HASHING_EXECUTOR={'KIND': None})
+    def test_bulk_create_users_rejects_non_string_fields(self):
+        data = [
+            {'username': 'user1', 'password': 123, 'email': 'user1@example.com'},
+            {'username': 'user2', 'password': 'password2', 'email': ['user2@example.com']},
+            {'username': 5, 'password': 'password5', 'email': 'user5@example.com'},
+            {'username': 'user3', 'password': 'password3', 'email': 'user3@example.com'},
+        ]
+        response = self.client.post('/api/bulk_create_users/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(
+            [(result['status'], result.get('error')) for result in response.data['results']],
+            [('error', 'Username, password and email must be strings')] * 3 + [('created', None)])
+        self.assertFalse(User.objects.filter(email__in=[
+            'user1@example.com', 'user2@example.com', 'user5@example.com']).exists())
+
+    @override_settings(PASSWORD_HASHING_EXECUTOR={'KIND': None})
+    def test_bulk_create_users_rejects_invalid_profile_fields(self):
+        data = [
+            {'username': 'user1', 'password': 'password1', 'email': 'user1@example.com', 'age': '30'},
+            {'username': 'user2', 'password': 'password2', 'email': 'user2@example.com', 'age': 'abc'},
+            {'username': 'user3', 'password': 'password3', 'email': 'user3@example.com',
+             'country': 'x' * 101},
+            {'username': 'user4', 'password': 'password4', 'email': 'user4@example.com',
+             'residence': 4},
+        ]
+        response = self.client.post('/api/bulk_create_users/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(
+            [(result['status'], result.get('error')) for result in response.data['results']],
+            [('created', None),
+             ('error', 'Age must be a whole number'),
+             ('error', 'Country is at most 100 characters long'),
+             ('error', 'Residence must be a string')])
+        self.assertEqual(User.objects.get(username='user1').age, 30)
+        self.assertFalse(User.objects.filter(username__in=['user2', 'user3', 'user4']).exists())
+
+    @override_settings(PASSWORD_HASHING_EXECUTOR={'KIND': None}, BULK_USER_BATCH_SIZE=2)
+    def test_bulk_create_users_ndjson(self):
+        body = '\n'.join(json.dumps(
+            {'username': f'user{i}', 'password': 'password', 'email': f'user{i}@example.com'})
+            for i in range(5)) + '\n'
+        response = self.client.post('/api/bulk_create_users/', body,
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual(User.objects.filter(username__startswith='user').count(), 5)
+
+    @override_settings(PASSWORD_HASHING_EXECUTOR={'KIND': 'thread', 'WORKERS': 2})
+    def test_passwords_are_hashed_on_the_shared_executor(self):
+        passwords = ['password1', 'password2', 'password3']
+        for password, encoded in zip(passwords, hash_passwords(passwords)):
+            self.assertTrue(check_password(password, encoded))
+        workers = [thread for thread in threading.enumerate()
+                   if thread.name.startswith('password-hashing')]
+        self.assertTrue(workers)
+        # No new pool per batch
+        hash_passwords(passwords)
+        self.assertEqual(workers, [thread for thread in threading.enumerate()
+                                   if thread.name.startswith('password-hashing')])
+
+    def test_bulk_create_users_requires_admin(self):
+        user = User.objects.create_user(username='user', password='password')
+        self.client.force_authenticate(user=user)
+        response = self.client.post('/api/bulk_create_users/', [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 class ResetPasswordTestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -49,6 +238,101 @@ class ResetPasswordTestCase(TestCase):
             username='test_user').check_password('new_password'))
 
 
+class AsyncPasswordViewsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_user', password='test_password', email='test@example.com')
+
+    async def test_create_user_async(self):
+        data = {
+            'username': 'new_user',
+            'password': 'new_password',
+            'email': 'new@example.com',
+            'country': 'Greece'
+        }
+        response = await self.async_client.post(
+            '/api/async/create_user/', data, content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = await User.objects.aget(username='new_user')
+        self.assertTrue(user.check_password('new_password'))
+        self.assertEqual(user.country, 'Greece')
+
+    async def test_create_user_async_duplicate(self):
+        data = {'username': 'test_user', 'password': 'password', 'email': 'other@example.com'}
+        response = await self.async_client.post(
+            '/api/async/create_user/', data, content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['error'], 'Username already exists')
+
+    async def test_reset_password_async(self):
+        data = {'username': 'test_user', 'password': 'new_password'}
+        response = await self.async_client.post(
+            '/api/async/reset_password/', data, content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = await User.objects.aget(username='test_user')
+        self.assertTrue(user.check_password('new_password'))
+
+    @override_settings(PASSWORD_HASHING_EXECUTOR={'KIND': None})
+    async def test_hashing_inline_without_executor(self):
+        self.assertIsNone(get_hashing_executor())
+        response = await self.async_client.post(
+            '/api/async/token/', {'username': 'test_user', 'password': 'test_password'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AsyncObtainTokenTestCase(TransactionTestCase):
+    """
+    The async token view authenticates on the password hashing executor,
+    whose threads have database connections of their own: the user must be
+    committed for them to see it.
+    """
+    # Keeps the rows created by migrations for later tests
+    serialized_rollback = True
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_user', password='test_password', email='test@example.com')
+
+    async def test_obtain_token_async(self):
+        response = await self.async_client.post(
+            '/api/async/token/', {'username': 'test_user', 'password': 'test_password'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = await Token.objects.aget(user_id=self.user.id)
+        self.assertEqual(response.json()['token'], token.key)
+
+    async def test_obtain_token_async_wrong_password(self):
+        for username in ('test_user', 'unknown_user'):
+            response = await self.async_client.post(
+                '/api/async/token/', {'username': username, 'password': 'wrong'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(await Token.objects.filter(user_id=self.user.id).aexists())
+
+    async def test_obtain_token_async_inactive_user(self):
+        self.user.is_active = False
+        await self.user.asave(update_fields=['is_active'])
+        response = await self.async_client.post(
+            '/api/async/token/', {'username': 'test_user', 'password': 'test_password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    async def test_obtain_token_async_upgrades_the_hash(self):
+        self.user.password = MD5PasswordHasher().encode('test_password', 'salt')
+        await self.user.asave(update_fields=['password'])
+        response = await self.async_client.post(
+            '/api/async/token/', {'username': 'test_user', 'password': 'test_password'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        await self.user.arefresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+
 class AddSkillTestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -150,6 +434,268 @@ class RemoveSkillTestCase(APITestCase):
         self.assertEqual(self.user.programming_skills.count(), 2)
 
 
+class ReplaceSkillsTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='test_user', password='test_password')
+        self.python = ProgrammingSkill.objects.create(name='Python')
+        self.java = ProgrammingSkill.objects.create(name='Java')
+        self.user.programming_skills.add(self.python, self.java)
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        # Committed skills are remembered past the test's rollback
+        skill_vocabulary.clear()
+
+    def put(self, skills):
+        return self.client.put('/api/skills/', {'skills': skills}, format='json')
+
+    def skill_names(self):
+        return set(self.user.programming_skills.values_list('name', flat=True))
+
+    def test_replace_skills(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.put(['Python', 'Go', 'Rust'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['skills'], ['Python', 'Go', 'Rust'])
+        self.assertEqual(self.skill_names(), {'Python', 'Go', 'Rust'})
+        # Existing skills are reused, new ones created once
+        self.assertEqual(ProgrammingSkill.objects.filter(name='Python').get(), self.python)
+        self.assertTrue(ProgrammingSkill.objects.filter(name='Java').exists())
+        self.assertEqual(sorted(UserAnalytics.objects.get(pk=self.user.pk).skills_name),
+                         ['Go', 'Python', 'Rust'])
+
+    def test_clear_skills(self):
+        response = self.put([])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.skill_names(), set())
+
+    def test_duplicates_count_once(self):
+        response = self.put(['Go', 'Go', 'Go', 'Go'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.skill_names(), {'Go'})
+
+    def test_too_many_skills(self):
+        response = self.put(['Python', 'Go', 'Rust', 'C'])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.skill_names(), {'Python', 'Java'})
+        self.assertFalse(ProgrammingSkill.objects.filter(name='Go').exists())
+
+    def test_invalid_body(self):
+        for body in ({}, {'skills': 'Python'}, {'skills': ['Python', '']},
+                     {'skills': [1]}, {'skills': ['x' * 101]}):
+            response = self.client.put('/api/skills/', body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, body)
+        self.assertEqual(self.skill_names(), {'Python', 'Java'})
+
+    def test_unchanged_set_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.put(['Java', 'Python'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        writes = [query['sql'] for query in queries
+                  if query['sql'].startswith(('UPDATE', 'DELETE'))
+                  or query['sql'].startswith('INSERT') and 'api_user_programming_skills' in query['sql']]
+        self.assertEqual(writes, [])
+
+    def test_applicant_interests_are_touched(self):
+        creator = User.objects.create_user(username='creator', password='password')
+        project = OpenSourceProject.objects.create(
+            project_name='Project', description='Description', maximum_collaborators=2,
+            creator=creator)
+        eoi = ExpressionOfInterest.objects.create(user=self.user, project=project)
+        ExpressionOfInterest.objects.filter(pk=eoi.pk).update(
+            updated_at=timezone.now() - timedelta(days=1))
+
+        self.put(['Go'])
+
+        eoi.refresh_from_db()
+        self.assertGreater(eoi.updated_at, timezone.now() - timedelta(minutes=1))
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.put(['Go']).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SkillVocabularyTestCase(APITestCase):
+    def setUp(self):
+        skill_vocabulary.clear()
+        self.user = User.objects.create_user(
+            username='test_user', password='test_password')
+        self.python = ProgrammingSkill.objects.create(name='Python')
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        skill_vocabulary.clear()
+
+    def learn(self, names):
+        # Entries are only remembered once the transaction reading them
+        # commits, which TestCase never does
+        with self.captureOnCommitCallbacks(execute=True):
+            return skill_vocabulary.ids(names)
+
+    def test_resolves_both_ways_from_memory(self):
+        self.assertEqual(self.learn(['Python', 'Cobol']), {'Python': self.python.id})
+        with self.assertNumQueries(0):
+            self.assertEqual(skill_vocabulary.ids(['Python']), {'Python': self.python.id})
+            self.assertEqual(skill_vocabulary.names([self.python.id]), {self.python.id: 'Python'})
+
+    def test_unknown_names_are_not_remembered(self):
+        self.learn(['Cobol'])
+        ProgrammingSkill.objects.create(name='Cobol')
+        self.assertIn('Cobol', skill_vocabulary.ids(['Cobol']))
+
+    def test_rolled_back_skills_are_not_remembered(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            skill_vocabulary.get_or_create(['Go'])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(skill_vocabulary.stats()['size'], 0)
+
+    def test_rename_and_delete(self):
+        self.learn(['Python'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.name = 'CPython'
+            self.python.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(skill_vocabulary.names([self.python.id]), {self.python.id: 'CPython'})
+        self.assertEqual(skill_vocabulary.ids(['Python']), {})
+
+        self.python.delete()
+        self.assertEqual(skill_vocabulary.names([self.python.id]), {})
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite triggers')
+    def test_rename_and_delete_bump_the_generation(self):
+        versions = [get_cache_version(SKILL_VERSION)]
+        ProgrammingSkill.objects.create(name='Go')
+        versions.append(get_cache_version(SKILL_VERSION))
+        ProgrammingSkill.objects.filter(name='Go').update(name='Golang')
+        versions.append(get_cache_version(SKILL_VERSION))
+        ProgrammingSkill.objects.filter(name='Golang').delete()
+        versions.append(get_cache_version(SKILL_VERSION))
+
+        self.assertIsNotNone(versions[0])
+        # Inserts keep the generation, renames and deletes replace it
+        self.assertEqual(versions[0], versions[1])
+        self.assertEqual(len(set(versions)), 3)
+
+    def test_skill_endpoints_use_the_vocabulary(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/add_skill/', {'skill_name': 'Go'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(set(skill_vocabulary.ids(['Go', 'Python'])), {'Go', 'Python'})
+        hits = skill_vocabulary.stats()['hits']
+
+        response = self.client.post('/api/remove_skill/', {'skill_name': 'Go'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(self.user.programming_skills.exists())
+        self.assertEqual(skill_vocabulary.stats()['hits'], hits + 1)
+
+    def test_project_required_skills_by_name(self):
+        self.learn(['Python'])
+        response = self.client.post('/api/create_project/', {
+            'project_name': 'Project', 'description': 'Description',
+            'maximum_collaborators': 2, 'required_skills': ['Python'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['required_skills'], ['Python'])
+        self.assertEqual(list(OpenSourceProject.objects.get().required_skills.all()), [self.python])
+
+        response = self.client.post('/api/create_project/', {
+            'project_name': 'Other', 'description': 'Description',
+            'maximum_collaborators': 2, 'required_skills': ['Cobol'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['required_skills'],
+                         ['Object with name=Cobol does not exist.'])
+
+
+class SkillVocabularyReloadTestCase(TransactionTestCase):
+    # Runs outside a transaction, where the vocabulary loads the whole table
+    serialized_rollback = True
+
+    def setUp(self):
+        skill_vocabulary.clear()
+        self.python = ProgrammingSkill.objects.create(name='Python')
+
+    def tearDown(self):
+        skill_vocabulary.clear()
+
+    @override_settings(SKILL_VOCABULARY_CHECK_INTERVAL=0)
+    def test_reloads_when_the_generation_changes(self):
+        self.assertEqual(skill_vocabulary.ids(['Python']), {'Python': self.python.id})
+        # Only the generation is checked while it does not change
+        with self.assertNumQueries(1):
+            skill_vocabulary.ids(['Python'])
+
+        # A rename by another process: no signal, only the trigger
+        ProgrammingSkill.objects.filter(pk=self.python.pk).update(name='CPython')
+        with self.assertNumQueries(2):
+            self.assertEqual(skill_vocabulary.names([self.python.id]), {self.python.id: 'CPython'})
+        self.assertEqual(skill_vocabulary.ids(['Python']), {})
+
+    def test_generation_is_checked_once_per_interval(self):
+        skill_vocabulary.ids(['Python'])
+        with self.assertNumQueries(0):
+            skill_vocabulary.ids(['Python'])
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(
+            username='test_user', password='test_password')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = f'/api/get_user_analytics/{self.user.id}/'
+
+    def test_token_lookup_is_cached(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(token_cache.stats()['misses'], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+        self.assertFalse(any('authtoken_token' in query['sql']
+                             for query in queries.captured_queries))
+
+    def test_deleted_token_is_invalidated(self):
+        self.client.get(self.url)
+        self.token.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_invalidated(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates(self):
+        self.client.get(self.url)
+        self.client.post('/api/reset_password/',
+                         {'username': 'test_user', 'password': 'new_password'})
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+    @override_settings(TOKEN_CACHE={'MAX_SIZE': 1, 'TTL': 60})
+    def test_cache_is_bounded(self):
+        other = User.objects.create_user(username='other', password='password')
+        other_token = Token.objects.create(user=other)
+        self.client.get(self.url)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {other_token.key}')
+        self.client.get(f'/api/get_user_analytics/{other.id}/')
+        self.assertEqual(token_cache.stats()['size'], 1)
+
+    def test_metrics(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token_cache']['misses'], 1)
+
+
 class CreateProjectTestCase(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -240,6 +786,72 @@ class AvailableProjectsTestCase(TestCase):
         self.assertEqual(len(response.data), 2)
 
 
+class AvailableProjectsPaginationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.collaborator = User.objects.create_user(
+            username='collaborator', password='password')
+
+    def create_projects(self, count):
+        projects = OpenSourceProject.objects.bulk_create(
+            OpenSourceProject(
+                project_name=f'Project {i}',
+                description=f'Description for Project {i}',
+                maximum_collaborators=2,
+                current_collaborators=1,
+                creator=self.creator
+            ) for i in range(count))
+        for project in OpenSourceProject.objects.filter(
+                id__in=[project.id for project in projects]):
+            project.collaborators.add(self.collaborator)
+
+    def test_query_count_does_not_grow_with_table(self):
+        # The listing cache version, then the page
+        self.create_projects(5)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/available_projects/')
+        self.assertEqual(len(response.data), 5)
+
+        self.create_projects(30)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/available_projects/')
+        self.assertEqual(len(response.data), 35)
+        self.assertEqual(response.data[0]['current_collaborators'], 1)
+        self.assertEqual(response.data[0]['creator'], 'creator')
+
+    def test_cursor_pagination_walks_every_project(self):
+        self.create_projects(7)
+
+        seen = []
+        url = '/api/available_projects/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data), 3)
+            seen.extend(project['id'] for project in response.data)
+            url = response.get('Link', '')
+            url = url.split(';')[0].strip('<>') if 'rel="next"' in url else None
+
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(
+            seen, list(OpenSourceProject.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/available_projects/?cursor=garbage')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_full_projects_are_filtered_on_stored_counter(self):
+        self.create_projects(2)
+        OpenSourceProject.objects.filter(project_name='Project 0').update(
+            current_collaborators=2)
+
+        response = self.client.get('/api/available_projects/')
+        self.assertEqual([project['project_name'] for project in response.data],
+                         ['Project 1'])
+
+
 class ExpressInterestTestCase(TestCase):
     def setUp(self):
         # Create users
@@ -417,6 +1029,87 @@ class ProjectInterestsTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+class ProjectInterestsListingTestCase(APITestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.client.force_authenticate(user=self.creator)
+        self.project = OpenSourceProject.objects.create(
+            project_name='Test Project',
+            description='Description for Test Project',
+            maximum_collaborators=3,
+            creator=self.creator
+        )
+        self.skills = [ProgrammingSkill.objects.create(name=name)
+                       for name in ('Python', 'Go', 'Rust')]
+        self.url = f'/api/projects/{self.project.id}/interests/'
+        self.start = timezone.now() - timedelta(days=1)
+        skill_vocabulary.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            skill_vocabulary.ids(['Python', 'Go', 'Rust'])
+
+    def tearDown(self):
+        skill_vocabulary.clear()
+
+    def add_applicants(self, count, offset=0, status='pending'):
+        interests = []
+        for i in range(offset, offset + count):
+            user = User.objects.create(username=f'applicant{i}')
+            user.programming_skills.add(*self.skills[:i % 3 + 1])
+            interests.append(ExpressionOfInterest.objects.create(
+                user=user, project=self.project, status=status,
+                created_at=self.start + timedelta(minutes=i)))
+        return interests
+
+    def test_query_count_does_not_grow_with_applicants(self):
+        # Project, interests validator, page and applicants' skill ids; the
+        # names come from the skill vocabulary
+        self.add_applicants(2)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 2)
+
+        self.add_applicants(20, offset=2)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 22)
+        self.assertEqual(response.data[2]['user_details']['programming_skills'],
+                         ['Python', 'Go', 'Rust'])
+
+    def test_status_filter(self):
+        pending = self.add_applicants(2)
+        accepted = self.add_applicants(1, offset=2, status='accepted')
+
+        response = self.client.get(f'{self.url}?status=accepted')
+        self.assertEqual([interest['id'] for interest in response.data],
+                         [interest.id for interest in accepted])
+
+        response = self.client.get(f'{self.url}?status=pending')
+        self.assertEqual([interest['id'] for interest in response.data],
+                         [interest.id for interest in pending])
+
+        response = self.client.get(f'{self.url}?status=unknown')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PROJECT_INTERESTS_PAGE_SIZE=2)
+    def test_pagination_and_ordering(self):
+        interests = self.add_applicants(5)
+
+        def walk(url):
+            seen = []
+            while url:
+                response = self.client.get(url)
+                self.assertLessEqual(len(response.data), 2)
+                seen.extend(interest['id'] for interest in response.data)
+                link = response.get('Link', '')
+                url = link.split(';')[0].strip('<>') if 'rel="next"' in link else None
+            return seen
+
+        ids = [interest.id for interest in interests]
+        self.assertEqual(walk(self.url), ids)
+        self.assertEqual(walk(f'{self.url}?ordering=-created_at'), ids[::-1])
+
+
 class AcceptOrRejectInterestTestCase(TestCase):
     def setUp(self):
         # Create users
@@ -489,6 +1182,526 @@ class AcceptOrRejectInterestTestCase(TestCase):
         self.assertEqual(response.data['message'],
                          'User is already accepted for this project')
 
+    def test_accept_interest_project_full(self):
+        client = APIClient()
+        client.force_authenticate(user=self.creator_user)
+        self.project.current_collaborators = 2
+        self.project.save()
+
+        response = client.post(
+            f'/api/projects/{self.project.id}/accept_or_reject_interest/{self.eoi.id}/', {'action': 'accept'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Project is already full')
+        # Nothing from the failed accept is persisted
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_collaborators, 2)
+        self.assertEqual(ExpressionOfInterest.objects.get(
+            id=self.eoi.id).status, 'pending')
+        self.assertFalse(self.project.collaborators.exists())
+
+    def test_accept_interest_stops_at_capacity(self):
+        client = APIClient()
+        client.force_authenticate(user=self.creator_user)
+        self.project.maximum_collaborators = 1
+        self.project.save()
+        other_user = User.objects.create_user(
+            username='other', password='password')
+        other_eoi = ExpressionOfInterest.objects.create(
+            user=other_user, project=self.project)
+
+        responses = [
+            client.post(
+                f'/api/projects/{self.project.id}/accept_or_reject_interest/{eoi.id}/', {'action': 'accept'})
+            for eoi in (self.eoi, other_eoi)
+        ]
+
+        self.assertEqual([response.status_code for response in responses],
+                         [status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_collaborators, 1)
+        self.assertEqual(self.project.collaborators.count(), 1)
+
+    def test_reject_interest_releases_seat(self):
+        client = APIClient()
+        client.force_authenticate(user=self.creator_user)
+        self.project.collaborators.add(self.user)
+        self.project.current_collaborators = 1
+        self.project.save()
+
+        response = client.post(
+            f'/api/projects/{self.project.id}/accept_or_reject_interest/{self.eoi.id}/', {'action': 'reject'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_collaborators, 0)
+        self.assertFalse(self.project.collaborators.exists())
+
+
+class BulkAcceptOrRejectInterestsTestCase(APITestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.applicants = [
+            User.objects.create_user(username=f'applicant{i}', password='password')
+            for i in range(4)
+        ]
+        self.project = OpenSourceProject.objects.create(
+            project_name='Project',
+            description='Description for Project',
+            maximum_collaborators=2,
+            creator=self.creator,
+            status='draft'
+        )
+        self.interests = [
+            ExpressionOfInterest.objects.create(user=user, project=self.project)
+            for user in self.applicants
+        ]
+        self.url = f'/api/projects/{self.project.id}/interests/bulk/'
+        self.client.force_authenticate(user=self.creator)
+
+    def post(self, decisions):
+        return self.client.post(self.url, decisions, format='json')
+
+    def statuses(self):
+        return [eoi.status for eoi in ExpressionOfInterest.objects.order_by('id')]
+
+    def test_bulk_accept_and_reject(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post([
+                {'eoi_id': self.interests[0].id, 'action': 'accept'},
+                {'eoi_id': self.interests[1].id, 'action': 'reject'},
+                {'eoi_id': self.interests[2].id, 'action': 'accept'},
+            ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['accepted'], response.data['rejected']), (2, 1))
+        self.assertEqual([result['status'] for result in response.data['results']],
+                         ['accepted', 'rejected', 'accepted'])
+        self.assertEqual(self.statuses(), ['accepted', 'rejected', 'accepted', 'pending'])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_collaborators, 2)
+        self.assertEqual(self.project.status, 'active')
+        self.assertCountEqual(self.project.collaborators.all(),
+                              [self.applicants[0], self.applicants[2]])
+        # Collaborator rows are bulk inserted, the summaries are refreshed anyway
+        self.assertEqual(UserAnalytics.objects.get(pk=self.applicants[0].pk).collaborations_name,
+                         ['Project'])
+
+    def test_capacity_is_enforced_for_the_batch(self):
+        response = self.post([
+            {'eoi_id': eoi.id, 'action': 'accept'} for eoi in self.interests[:3]])
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['results'][2]['error'], 'Project is already full')
+        self.assertEqual(self.statuses(), ['accepted', 'accepted', 'pending', 'pending'])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_collaborators, 2)
+        self.assertEqual(self.project.collaborators.count(), 2)
+
+    def test_rejecting_a_collaborator_frees_a_seat_for_the_batch(self):
+        self.project.collaborators.add(self.applicants[0], self.applicants[1])
+        self.project.current_collaborators = 2
+        self.project.save()
+
+        response = self.post([
+            {'eoi_id': self.interests[2].id, 'action': 'accept'},
+            {'eoi_id': self.interests[0].id, 'action': 'reject'},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_collaborators, 2)
+        self.assertCountEqual(self.project.collaborators.all(),
+                              [self.applicants[1], self.applicants[2]])
+
+    def test_invalid_items(self):
+        other_project = OpenSourceProject.objects.create(
+            project_name='Other', description='Other', maximum_collaborators=2,
+            creator=self.creator)
+        foreign = ExpressionOfInterest.objects.create(user=self.applicants[0], project=other_project)
+        self.interests[3].status = 'accepted'
+        self.interests[3].save()
+
+        response = self.post([
+            'accept',
+            {'eoi_id': 'x', 'action': 'accept'},
+            {'eoi_id': self.interests[0].id, 'action': 'maybe'},
+            {'eoi_id': foreign.id, 'action': 'accept'},
+            {'eoi_id': self.interests[3].id, 'action': 'reject'},
+            {'eoi_id': self.interests[1].id, 'action': 'accept'},
+            {'eoi_id': self.interests[1].id, 'action': 'reject'},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([result.get('error') for result in response.data['results']], [
+            'Expected an object',
+            'eoi_id must be an integer',
+            'Invalid action',
+            'Expression of interest not found',
+            'User is already accepted for this project',
+            None,
+            'Expression of interest appears more than once',
+        ])
+        self.assertEqual(ExpressionOfInterest.objects.get(pk=foreign.pk).status, 'pending')
+
+    def test_only_the_creator(self):
+        self.client.force_authenticate(user=self.applicants[0])
+        response = self.post([{'eoi_id': self.interests[0].id, 'action': 'accept'}])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.statuses(), ['pending'] * 4)
+
+    def test_unknown_project_and_bad_body(self):
+        response = self.client.post('/api/projects/999999/interests/bulk/', [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(self.url, {'eoi_id': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BULK_INTEREST_MAX_ITEMS=2)
+    def test_too_many_items(self):
+        response = self.post([
+            {'eoi_id': eoi.id, 'action': 'reject'} for eoi in self.interests[:3]])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        applicants = [
+            User.objects.create_user(username=f'more{i}', password='password')
+            for i in range(20)
+        ]
+        interests = [
+            ExpressionOfInterest.objects.create(user=user, project=self.project)
+            for user in applicants
+        ]
+        self.project.maximum_collaborators = 30
+        self.project.save()
+
+        def decisions(eois):
+            return [{'eoi_id': eoi.id, 'action': 'accept' if i % 2 else 'reject'}
+                    for i, eoi in enumerate(eois)]
+
+        with CaptureQueriesContext(connection) as small:
+            self.post(decisions(interests[:4]))
+        with CaptureQueriesContext(connection) as large:
+            self.post(decisions(interests[4:]))
+        self.assertEqual(len(small), len(large))
+
+
+@unittest.skipUnless(connection.features.has_select_for_update_skip_locked, 'SKIP LOCKED')
+class BulkTriageRowLockTestCase(TransactionTestCase):
+    # Keeps the rows created by migrations (content types, cache versions)
+    # for later tests
+    serialized_rollback = True
+
+    def test_locked_interests_are_skipped(self):
+        creator = User.objects.create_user(username='creator', password='password')
+        project = OpenSourceProject.objects.create(
+            project_name='Project', description='Description for Project',
+            maximum_collaborators=5, creator=creator)
+        locked, free = [
+            ExpressionOfInterest.objects.create(
+                project=project,
+                user=User.objects.create_user(username=f'applicant{i}', password='password'))
+            for i in range(2)]
+        holding, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            # What a concurrent single accept holds until it commits
+            try:
+                with transaction.atomic():
+                    ExpressionOfInterest.objects.select_for_update().get(pk=locked.pk)
+                    holding.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        self.assertTrue(holding.wait(10))
+        client = APIClient()
+        client.force_authenticate(user=creator)
+        try:
+            response = client.post(f'/api/projects/{project.id}/interests/bulk/', [
+                {'eoi_id': locked.id, 'action': 'accept'},
+                {'eoi_id': free.id, 'action': 'accept'},
+            ], format='json')
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['results'][0]['error'],
+                         'Expression of interest is being updated, please retry')
+        self.assertEqual(response.data['results'][1]['status'], 'accepted')
+
+
+@unittest.skipUnless(connection.features.has_select_for_update, 'Row locks')
+class ConcurrentTriageTestCase(TransactionTestCase):
+    """
+    Triage requests racing in threads, each on its own connection. SQLite
+    serializes writers, so this only runs where rows are locked.
+    """
+    serialized_rollback = True
+
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='password')
+        self.project = OpenSourceProject.objects.create(
+            project_name='Project', description='Description for Project',
+            maximum_collaborators=1, creator=self.creator)
+        self.eois = [
+            ExpressionOfInterest.objects.create(
+                project=self.project,
+                user=User.objects.create_user(username=f'applicant{i}', password='password'))
+            for i in range(4)]
+
+    def race(self, requests):
+        """
+        Send ``(eoi, action)`` requests at once, return their status codes.
+        """
+        barrier = threading.Barrier(len(requests))
+        codes = []
+
+        def send(eoi, action):
+            client = APIClient()
+            client.force_authenticate(user=self.creator)
+            try:
+                barrier.wait(10)
+                codes.append(client.post(
+                    f'/api/projects/{self.project.id}/accept_or_reject_interest/{eoi.id}/',
+                    {'action': action}).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=send, args=request) for request in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return codes
+
+    def test_accept_interest_never_overbooks(self):
+        codes = self.race([(eoi, 'accept') for eoi in self.eois])
+        self.assertEqual(sorted(codes), [status.HTTP_200_OK] + [status.HTTP_400_BAD_REQUEST] * 3)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_collaborators, 1)
+        self.assertEqual(self.project.collaborators.count(), 1)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'pg_stat_activity')
+    def test_reject_racing_a_removal_releases_one_seat(self):
+        OpenSourceProject.objects.filter(pk=self.project.pk).update(
+            maximum_collaborators=2, current_collaborators=2)
+        leaving = self.eois[0]
+        self.project.collaborators.add(leaving.user, self.eois[1].user)
+        removing, release = threading.Event(), threading.Event()
+
+        def remove():
+            # A concurrent removal of the collaborator, giving the seat back
+            try:
+                with transaction.atomic():
+                    self.project.collaborators.remove(leaving.user)
+                    OpenSourceProject.objects.filter(pk=self.project.pk).update(
+                        current_collaborators=F('current_collaborators') - 1)
+                    removing.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        remover = threading.Thread(target=remove)
+        remover.start()
+        self.assertTrue(removing.wait(10))
+        codes = []
+        rejecter = threading.Thread(target=lambda: codes.extend(self.race([(leaving, 'reject')])))
+        rejecter.start()
+        try:
+            # Until the reject waits for the collaborator row
+            deadline = time.monotonic() + 10
+            with connection.cursor() as cursor:
+                while time.monotonic() < deadline:
+                    cursor.execute("SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock'")
+                    if cursor.fetchone()[0]:
+                        break
+                    time.sleep(0.01)
+        finally:
+            release.set()
+            remover.join()
+            rejecter.join()
+
+        self.assertEqual(codes, [status.HTTP_200_OK])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_collaborators, 1)
+        self.assertEqual(list(self.project.collaborators.all()), [self.eois[1].user])
+
+
+class PostgresProfileTestCase(SimpleTestCase):
+    def test_pooled_or_persistent_connections(self):
+        database = settings.POSTGRES_DATABASES['default']
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        if django.VERSION >= (5, 1):
+            self.assertEqual(database['CONN_MAX_AGE'], 0)
+            self.assertIn('pool', database['OPTIONS'])
+        else:
+            self.assertGreater(database['CONN_MAX_AGE'], 0)
+            self.assertNotIn('pool', database['OPTIONS'])
+
+
+class ReconcileCollaboratorsTestCase(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(
+            username='user1', password='password1')
+        self.user2 = User.objects.create_user(
+            username='user2', password='password2')
+        self.projects = [
+            OpenSourceProject.objects.create(
+                project_name=f'Project {i}',
+                description=f'Description for Project {i}',
+                maximum_collaborators=3,
+                creator=self.user1
+            ) for i in range(3)
+        ]
+        # Counter in sync
+        self.projects[0].collaborators.add(self.user2)
+        self.projects[0].current_collaborators = 1
+        self.projects[0].save()
+        # Counter lagging behind
+        self.projects[1].collaborators.add(self.user1, self.user2)
+        # Counter ahead of the table
+        self.projects[2].current_collaborators = 2
+        self.projects[2].save()
+
+    def counters(self):
+        return list(OpenSourceProject.objects.order_by('id').values_list(
+            'current_collaborators', flat=True))
+
+    def updated_at(self):
+        return list(OpenSourceProject.objects.order_by('id').values_list(
+            'updated_at', flat=True))
+
+    def test_reconcile_repairs_drift(self):
+        before = self.updated_at()
+        out = StringIO()
+        call_command('reconcile_collaborators', chunk_size=2, stdout=out)
+
+        self.assertEqual(self.counters(), [1, 2, 0])
+        # Repaired projects show up in incremental exports and revalidations
+        after = self.updated_at()
+        self.assertEqual(after[0], before[0])
+        self.assertGreater(after[1], before[1])
+        self.assertGreater(after[2], before[2])
+        self.assertIn('Checked 3 projects, 2 drifted, 2 repaired', out.getvalue())
+
+    def test_reconcile_dry_run(self):
+        out = StringIO()
+        call_command('reconcile_collaborators', dry_run=True, stdout=out)
+
+        self.assertEqual(self.counters(), [1, 0, 2])
+        self.assertIn('2 drifted, 0 repaired', out.getvalue())
+
+
+class SeedCommandTestCase(TestCase):
+    counts = {'users': 40, 'skills': 8, 'projects': 30, 'interests': 120}
+
+    def seed(self, **options):
+        out = StringIO()
+        call_command('seed', **{**self.counts, **options}, stdout=out)
+        return out.getvalue()
+
+    def snapshot(self):
+        return (
+            list(User.objects.order_by('id').values_list(
+                'id', 'username', 'programming_skills__name')),
+            list(OpenSourceProject.objects.order_by('id').values_list(
+                'id', 'project_name', 'description', 'maximum_collaborators',
+                'current_collaborators', 'status', 'creator_id')),
+            list(ExpressionOfInterest.objects.order_by('id').values_list(
+                'project_id', 'user_id', 'status')),
+        )
+
+    def test_seed(self):
+        version = get_cache_version(LISTING_VERSION)
+        output = self.seed()
+
+        self.assertIn('Created', output)
+        self.assertEqual(User.objects.filter(username__startswith='seed_user_').count(), 40)
+        self.assertEqual(ProgrammingSkill.objects.count(), 8)
+        self.assertEqual(OpenSourceProject.objects.count(), 30)
+        self.assertEqual(ExpressionOfInterest.objects.count(), 120)
+        self.assertNotEqual(get_cache_version(LISTING_VERSION), version)
+        self.assertTrue(User.objects.earliest('id').check_password(SEED_PASSWORD))
+
+        for project in OpenSourceProject.objects.prefetch_related('collaborators'):
+            collaborators = {user.id for user in project.collaborators.all()}
+            self.assertEqual(project.current_collaborators, len(collaborators))
+            self.assertLessEqual(len(collaborators), project.maximum_collaborators)
+            self.assertEqual(collaborators, set(project.expressionofinterest_set.filter(
+                status='accepted').values_list('user_id', flat=True)))
+        out = StringIO()
+        call_command('reconcile_collaborators', dry_run=True, stdout=out)
+        self.assertIn('0 drifted', out.getvalue())
+
+    def test_seed_is_deterministic(self):
+        with transaction.atomic():
+            self.seed(seed=5)
+            first = self.snapshot()
+            transaction.set_rollback(True)
+        self.seed(seed=5)
+        self.assertEqual(self.snapshot(), first)
+
+        self.seed(seed=5)
+        self.assertEqual(User.objects.count(), 80)
+        self.assertEqual(ProgrammingSkill.objects.count(), 8)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite bulk loading')
+    def test_bulk_load_restores_indexes_and_triggers(self):
+        def schema():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT type, name, sql FROM sqlite_master "
+                               "WHERE type IN ('index', 'trigger') ORDER BY name")
+                return cursor.fetchall()
+
+        before = schema()
+        self.seed()
+        self.assertEqual(schema(), before)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH 'seed'")
+            self.assertEqual(cursor.fetchone()[0], 30)
+
+        # The triggers work again
+        project = OpenSourceProject.objects.create(
+            project_name='Triggered', description='After seeding', maximum_collaborators=1,
+            creator=User.objects.earliest('id'))
+        response = self.client.get('/api/search_projects/', {'q': 'triggered'})
+        self.assertEqual([found['project_name'] for found in response.data],
+                         [project.project_name])
+
+    def test_invalid_counts(self):
+        with self.assertRaises(CommandError):
+            self.seed(users=-1)
+        with self.assertRaises(CommandError):
+            self.seed(users=0)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite bulk loading')
+class SeedPragmasTestCase(TransactionTestCase):
+    # Pragmas only change outside a transaction. Keeps the rows created by
+    # migrations for later tests
+    serialized_rollback = True
+
+    def pragmas(self):
+        with connection.cursor() as cursor:
+            values = []
+            for name in ('synchronous', 'cache_size', 'temp_store', 'foreign_keys'):
+                cursor.execute(f'PRAGMA {name}')
+                values.append(cursor.fetchone()[0])
+            return values
+
+    def test_pragmas_apply_during_the_load_only(self):
+        before = self.pragmas()
+        during = []
+        seed_database(users=5, skills=2, projects=5, interests=10,
+                      progress=lambda created: during.append(self.pragmas()))
+        self.assertEqual(during[-1], [0, -256 * 1024, 2, 0])  # OFF, 256 MiB, MEMORY, OFF
+        self.assertEqual(self.pragmas(), before)
+        self.assertEqual(OpenSourceProject.objects.count(), 5)
+
 
 class GetUserAnalyticsTestCase(TestCase):
     def setUp(self):
@@ -555,3 +1768,1360 @@ class GetUserAnalyticsTestCase(TestCase):
         self.assertEqual(response.data['collaborations_name'], [])
         self.assertEqual(response.data['interests_project_name'], [
                          'Project 1', 'Project 2'])
+
+
+class HotPathIndexTestCase(QueryPlanAssertionsMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='user', password='password')
+        self.project = OpenSourceProject.objects.create(
+            project_name='Project',
+            description='Description for Project',
+            maximum_collaborators=2,
+            creator=self.user
+        )
+
+    def test_express_interest_lookup(self):
+        self.assertUsesIndex(ExpressionOfInterest.objects.filter(
+            project=self.project, user=self.user))
+
+    def test_project_interests_lookup(self):
+        self.assertUsesIndex(
+            ExpressionOfInterest.objects.filter(project=self.project).order_by('created_at'),
+            'eoi_project_created_idx')
+
+    def test_pending_interests_lookup(self):
+        self.assertUsesIndex(
+            ExpressionOfInterest.objects.filter(
+                project=self.project, status='pending').order_by('created_at'),
+            'eoi_pending_idx')
+
+    def test_user_interests_lookup(self):
+        self.assertUsesIndex(
+            ExpressionOfInterest.objects.filter(user=self.user, status='accepted'),
+            'eoi_user_status_idx')
+        self.assertUsesIndex(ExpressionOfInterest.objects.filter(
+            user=self.user).values_list('project__project_name', flat=True))
+
+    def test_name_lookups(self):
+        self.assertUsesIndex(
+            OpenSourceProject.objects.filter(project_name='Project'))
+        self.assertUsesIndex(ProgrammingSkill.objects.filter(name='Python'))
+
+    def test_available_projects_listing(self):
+        self.assertUsesIndex(
+            OpenSourceProject.objects.select_related('creator').filter(
+                current_collaborators__lt=F('maximum_collaborators')).order_by('id')[:51],
+            'project_has_seats_idx')
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='admin', password='password', is_staff=True)
+        self.user = User.objects.create_user(
+            username='user', password='password')
+        self.projects = [
+            OpenSourceProject.objects.create(
+                project_name=f'Project {i}',
+                description=f'Description for Project {i}',
+                maximum_collaborators=3,
+                creator=self.user
+            ) for i in range(3)
+        ]
+        self.old_interest = ExpressionOfInterest.objects.create(
+            user=self.admin, project=self.projects[0],
+            created_at=timezone.now() - timedelta(days=2))
+        self.new_interest = ExpressionOfInterest.objects.create(
+            user=self.user, project=self.projects[1])
+        # Rows last changed two days ago
+        two_days_ago = timezone.now() - timedelta(days=2)
+        ExpressionOfInterest.objects.filter(pk=self.old_interest.pk).update(updated_at=two_days_ago)
+        OpenSourceProject.objects.filter(pk__in=[self.projects[0].pk, self.projects[2].pk]).update(
+            updated_at=two_days_ago)
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_export_projects(self):
+        self.client.force_authenticate(user=self.admin)
+        rows = self.export('/api/export/projects/')
+        self.assertEqual([row['project_name'] for row in rows],
+                         ['Project 0', 'Project 1', 'Project 2'])
+        self.assertEqual(rows[0]['creator_id'], self.user.id)
+
+    def test_export_projects_since_id(self):
+        self.client.force_authenticate(user=self.admin)
+        rows = self.export(f'/api/export/projects/?since={self.projects[0].id}')
+        self.assertEqual([row['id'] for row in rows],
+                         [self.projects[1].id, self.projects[2].id])
+
+    def test_export_interests_since_timestamp(self):
+        self.client.force_authenticate(user=self.admin)
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        rows = self.export(
+            f'/api/export/interests/?since={quote(since)}')
+        self.assertEqual([row['id'] for row in rows], [self.new_interest.id])
+        self.assertEqual(rows[0]['status'], 'pending')
+
+    def test_export_projects_since_timestamp(self):
+        self.client.force_authenticate(user=self.admin)
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        rows = self.export(f'/api/export/projects/?since={quote(since)}')
+        self.assertEqual([row['id'] for row in rows], [self.projects[1].id])
+
+        # A change brings a row back into the next incremental pull
+        self.projects[2].status = 'closed'
+        self.projects[2].save()
+        rows = self.export(f'/api/export/projects/?since={quote(since)}')
+        self.assertEqual([row['id'] for row in rows], [self.projects[1].id, self.projects[2].id])
+
+    def test_export_invalid_since(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/export/projects/?since=yesterday')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_requires_admin(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/export/projects/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_unknown_resource(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/export/users/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command('export_ndjson', 'interests', chunk_size=1, stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['id'] for row in rows],
+                         [self.old_interest.id, self.new_interest.id])
+
+
+class UserAnalyticsSummaryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.creator = User.objects.create_user(
+                username='creator', password='password')
+            self.user = User.objects.create_user(
+                username='user', password='password')
+            self.project = OpenSourceProject.objects.create(
+                project_name='Project',
+                description='Description for Project',
+                maximum_collaborators=2,
+                creator=self.creator
+            )
+
+    def tearDown(self):
+        # Committed skills are remembered past the test's rollback
+        skill_vocabulary.clear()
+
+    def summary(self, user):
+        return UserAnalytics.objects.get(pk=user.pk)
+
+    def committed(self):
+        # Summaries are refreshed when the transaction commits
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def test_endpoint_is_a_single_lookup(self):
+        self.client.force_authenticate(user=self.creator)
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/get_user_analytics/{self.creator.id}/')
+        self.assertEqual(response.data['user_projects_as_creator'], 1)
+        self.assertEqual(response.data['projects_name'], ['Project'])
+
+    def test_summary_follows_interest_and_collaboration(self):
+        with self.committed():
+            eoi = ExpressionOfInterest.objects.create(user=self.user, project=self.project)
+        self.assertEqual(self.summary(self.user).interests_project_name, ['Project'])
+
+        self.client.force_authenticate(user=self.creator)
+        with self.committed():
+            self.client.post(
+                f'/api/projects/{self.project.id}/accept_or_reject_interest/{eoi.id}/', {'action': 'accept'})
+        summary = self.summary(self.user)
+        self.assertEqual(summary.collaborations, 1)
+        self.assertEqual(summary.collaborations_name, ['Project'])
+
+        with self.committed():
+            self.project.collaborators.clear()
+        self.assertEqual(self.summary(self.user).collaborations, 0)
+
+    def test_refresh_updates_a_summary_inserted_concurrently(self):
+        user = User.objects.create_user(username='new', password='password')
+        ExpressionOfInterest.objects.create(user=user, project=self.project)
+        # Refreshes scheduled above never run: the test does not commit
+        self.assertFalse(UserAnalytics.objects.filter(pk=user.pk).exists())
+        compute = analytics.compute_users_analytics
+
+        def compute_after_other_refresh(user_ids, using=None):
+            # Another transaction inserts the first summary of the user
+            # after this refresh found none
+            UserAnalytics.objects.create(user=user, updated_at=timezone.now())
+            return compute(user_ids, using=using)
+
+        with unittest.mock.patch('api.analytics.compute_users_analytics',
+                                 compute_after_other_refresh):
+            analytics.refresh_user_analytics([user.pk])
+        self.assertEqual(self.summary(user).interests_project_name, ['Project'])
+
+    def test_summary_follows_interest_delete(self):
+        with self.committed():
+            ExpressionOfInterest.objects.create(user=self.user, project=self.project)
+        # As the admin does, without the project
+        with self.committed():
+            ExpressionOfInterest.objects.filter(user=self.user).delete()
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/api/get_user_analytics/{self.user.id}/')
+        self.assertEqual(response.data['user_interests'], 0)
+        self.assertEqual(response.data['interests_project_name'], [])
+
+    def test_summary_follows_skills(self):
+        self.client.force_authenticate(user=self.user)
+        with self.committed():
+            self.client.post('/api/add_skill/', {'skill_name': 'Python'}, format='json')
+            self.client.post('/api/add_skill/', {'skill_name': 'Go'}, format='json')
+        self.assertEqual(self.summary(self.user).skills_name, ['Python', 'Go'])
+
+        with self.committed():
+            self.client.post('/api/remove_skill/', {'skill_name': 'Python'}, format='json')
+        summary = self.summary(self.user)
+        self.assertEqual(summary.skills, 1)
+        self.assertEqual(summary.skills_name, ['Go'])
+
+    def test_summary_follows_project_rename_and_delete(self):
+        with self.committed():
+            ExpressionOfInterest.objects.create(user=self.user, project=self.project)
+            self.project.collaborators.add(self.user)
+
+        with self.committed():
+            self.project.project_name = 'Renamed'
+            self.project.save()
+        summary = self.summary(self.user)
+        self.assertEqual(summary.interests_project_name, ['Renamed'])
+        self.assertEqual(summary.collaborations_name, ['Renamed'])
+
+        with self.committed():
+            self.project.delete()
+        summary = self.summary(self.user)
+        self.assertEqual((summary.interests, summary.collaborations), (0, 0))
+        self.assertEqual(self.summary(self.creator).projects_as_creator, 0)
+
+    def test_refresh_waits_for_commit(self):
+        # The interest, the collaborator rows and the check below, then a
+        # single refresh of the user for both changes
+        with self.assertNumQueries(7), self.committed():
+            ExpressionOfInterest.objects.create(user=self.user, project=self.project)
+            self.project.collaborators.add(self.user)
+            self.assertFalse(UserAnalytics.objects.filter(pk=self.user.pk).exists())
+        summary = self.summary(self.user)
+        self.assertEqual((summary.interests, summary.collaborations), (1, 1))
+
+    def test_project_delete_cascades_in_batches(self):
+        applicants = User.objects.bulk_create(
+            User(username=f'applicant{i}', password='password') for i in range(250))
+        ExpressionOfInterest.objects.bulk_create(
+            ExpressionOfInterest(user=user, project=self.project) for user in applicants)
+        self.client.force_authenticate(user=self.creator)
+
+        # Summaries are inserted by 111 on SQLite, all at once on PostgreSQL
+        batch_size = connection.ops.bulk_batch_size(
+            UserAnalytics._meta.concrete_fields, applicants)
+        inserts = math.ceil(len(applicants) / min(batch_size, analytics.ANALYTICS_CHUNK_SIZE))
+        # Project, user, interests, related users, the cascade (collaborators,
+        # required skills, interests by 100, project), then the refresh of
+        # every related user: users, name lists, updated and inserted
+        # summaries
+        with self.assertNumQueries(13 + inserts), self.committed():
+            response = self.client.delete(f'/api/projects/{self.project.id}/delete/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.summary(applicants[0]).interests, 0)
+        self.assertEqual(self.summary(self.creator).projects_as_creator, 0)
+
+    def test_rebuild_command(self):
+        UserAnalytics.objects.filter(pk=self.creator.pk).update(
+            projects_as_creator=5, projects_name=['Stale'])
+        UserAnalytics.objects.filter(pk=self.user.pk).delete()
+
+        out = StringIO()
+        call_command('rebuild_user_analytics', chunk_size=1, stdout=out)
+
+        self.assertEqual(self.summary(self.creator).projects_name, ['Project'])
+        self.assertEqual(self.summary(self.user).projects_as_creator, 0)
+        self.assertIn('Rebuilt analytics of 2 users', out.getvalue())
+
+
+class UsersAnalyticsBatchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='admin', password='password', is_staff=True)
+        self.users = [
+            User.objects.create_user(username=f'user{i}', password='password')
+            for i in range(4)
+        ]
+        for i, user in enumerate(self.users):
+            project = OpenSourceProject.objects.create(
+                project_name=f'Project {i}',
+                description=f'Description for Project {i}',
+                maximum_collaborators=3,
+                creator=user
+            )
+            ExpressionOfInterest.objects.create(
+                user=self.users[(i + 1) % len(self.users)], project=project)
+        skill = ProgrammingSkill.objects.create(name='Python')
+        self.users[0].programming_skills.add(skill)
+
+    def test_batch_analytics(self):
+        self.client.force_authenticate(user=self.admin)
+        user_ids = [user.id for user in self.users]
+        response = self.client.post('/api/get_user_analytics/batch/',
+                                    {'user_ids': user_ids + [999]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['not_found'], [999])
+        first = response.data['results'][str(self.users[0].id)]
+        self.assertEqual(first['projects_name'], ['Project 0'])
+        self.assertEqual(first['interests_project_name'], ['Project 3'])
+        self.assertEqual(first['user_skills'], ['Python'])
+
+    def test_missing_summaries_use_grouped_queries(self):
+        self.client.force_authenticate(user=self.admin)
+        UserAnalytics.objects.all().delete()
+        user_ids = [user.id for user in self.users]
+
+        # in_bulk, then users with their existing rows, the name lists and the
+        # insert, whatever the number of users
+        with self.assertNumQueries(4):
+            response = self.client.post('/api/get_user_analytics/batch/',
+                                        {'user_ids': user_ids}, format='json')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(
+            response.data['results'][str(self.users[2].id)]['user_interests'], 1)
+
+    def test_batch_analytics_permissions(self):
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.post('/api/get_user_analytics/batch/',
+                                    {'user_ids': [self.users[0].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post('/api/get_user_analytics/batch/',
+                                    {'user_ids': [self.users[0].id, self.users[1].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_batch_analytics_invalid_ids(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post('/api/get_user_analytics/batch/',
+                                    {'user_ids': 'all'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_single_analytics_of_other_user(self):
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.get(f'/api/get_user_analytics/{self.users[1].id}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(f'/api/get_user_analytics/{self.users[1].id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['projects_name'], ['Project 1'])
+
+        response = self.client.get('/api/get_user_analytics/999/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RecommendedProjectsTestCase(APITestCase):
+    def setUp(self):
+        project_index.clear()
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.user = User.objects.create_user(
+            username='user', password='password')
+        self.python = ProgrammingSkill.objects.create(name='Python')
+        self.django = ProgrammingSkill.objects.create(name='Django')
+        self.rust = ProgrammingSkill.objects.create(name='Rust')
+        self.user.programming_skills.add(self.python, self.django)
+
+        self.projects = {}
+        for name, skills in [('both', [self.python, self.django]),
+                             ('python', [self.python]),
+                             ('django', [self.django]),
+                             ('rust', [self.rust]),
+                             ('none', [])]:
+            project = OpenSourceProject.objects.create(
+                project_name=name,
+                description=f'Description for {name}',
+                maximum_collaborators=2,
+                creator=self.creator
+            )
+            project.required_skills.set(skills)
+            self.projects[name] = project
+        self.client.force_authenticate(user=self.user)
+
+    def recommended(self, **params):
+        response = self.client.get('/api/recommended_projects/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(project['project_name'], project['matched_skills'])
+                for project in response.data]
+
+    def test_ranked_by_matched_skills(self):
+        self.assertEqual(self.recommended(),
+                         [('both', 2), ('python', 1), ('django', 1)])
+        self.assertEqual(self.recommended(limit=1), [('both', 2)])
+
+    def test_excludes_full_closed_and_own_projects(self):
+        self.projects['both'].current_collaborators = 2
+        self.projects['both'].save()
+        self.projects['python'].status = 'closed'
+        self.projects['python'].save()
+        self.projects['django'].creator = self.user
+        self.projects['django'].save()
+        self.assertEqual(self.recommended(), [])
+
+    def test_excludes_projects_already_joined(self):
+        self.projects['both'].collaborators.add(self.user)
+        self.assertEqual(self.recommended(), [('python', 1), ('django', 1)])
+
+    def test_index_follows_changes(self):
+        self.recommended()
+        self.projects['rust'].required_skills.add(self.python, self.django)
+        self.projects['both'].required_skills.remove(self.django)
+        self.projects['python'].delete()
+        self.user.programming_skills.add(self.rust)
+        self.assertEqual(self.recommended(),
+                         [('rust', 3), ('both', 1), ('django', 1)])
+
+    def test_changes_of_other_processes_wait_for_the_rebuild(self):
+        self.recommended()
+        # Writes that send no signals, like those of another process
+        OpenSourceProject.objects.filter(pk=self.projects['python'].pk).update(
+            current_collaborators=2)
+        OpenSourceProject.required_skills.through.objects.filter(
+            opensourceproject=self.projects['both'], programmingskill=self.django).delete()
+        # Candidates are re-checked for seats, but not for skills
+        self.assertEqual(self.recommended(), [('both', 2), ('django', 1)])
+
+        with override_settings(RECOMMENDATIONS_INDEX_TTL=0):
+            self.assertEqual(self.recommended(), [('both', 1), ('django', 1)])
+
+    def test_accepted_interest_fills_seats(self):
+        self.recommended()
+        other = User.objects.create_user(username='other', password='password')
+        project = self.projects['both']
+        project.current_collaborators = 1
+        project.save()
+        eoi = ExpressionOfInterest.objects.create(user=other, project=project)
+        self.client.force_authenticate(user=self.creator)
+        self.client.post(
+            f'/api/projects/{project.id}/accept_or_reject_interest/{eoi.id}/', {'action': 'accept'})
+
+        self.client.force_authenticate(user=self.user)
+        self.assertNotIn('both', [name for name, _ in self.recommended()])
+
+    def test_user_without_skills(self):
+        self.user.programming_skills.clear()
+        self.assertEqual(self.recommended(), [])
+
+    def test_invalid_limit(self):
+        response = self.client.get('/api/recommended_projects/', {'limit': 'ten'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rank_matches_brute_force(self):
+        skills = [self.python, self.django, self.rust]
+        for i in range(40):
+            project = OpenSourceProject.objects.create(
+                project_name=f'Project {i}',
+                description='Description',
+                maximum_collaborators=2,
+                creator=self.creator
+            )
+            project.required_skills.set(
+                skill for bit, skill in enumerate(skills) if i >> bit & 1)
+
+        skill_ids = [skill.id for skill in skills]
+        expected = sorted(
+            ((project.id, len(set(skill_ids) & {skill.id for skill in project.required_skills.all()}))
+             for project in OpenSourceProject.objects.all()),
+            key=lambda item: (-item[1], item[0]))
+        self.assertEqual(list(project_index.rank(skill_ids)),
+                         [item for item in expected if item[1]])
+
+
+@unittest.skipUnless(search_available(), 'FTS5 search index')
+class SearchProjectsTestCase(APITestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.projects = {}
+        for name, description, maximum in [
+                ('Django REST toolkit', 'Web APIs for Python developers', 3),
+                ('Compiler', 'A Python compiler written in Rust', 3),
+                ('Game engine', 'Rust game engine, full of collaborators', 1),
+                ('Pythonic docs', 'Documentation generator', 3)]:
+            self.projects[name] = OpenSourceProject.objects.create(
+                project_name=name,
+                description=description,
+                maximum_collaborators=maximum,
+                creator=self.creator,
+                status='active'
+            )
+        self.projects['Game engine'].current_collaborators = 1
+        self.projects['Game engine'].save()
+
+    def search(self, **params):
+        response = self.client.get('/api/search_projects/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [project['project_name'] for project in response.data]
+
+    def test_search_name_and_description(self):
+        self.assertCountEqual(self.search(q='rust'), ['Game engine', 'Compiler'])
+        self.assertEqual(self.search(q='python compiler'), ['Compiler'])
+
+    def test_name_hits_rank_first(self):
+        self.projects['Compiler'].description = 'A toolkit compiler'
+        self.projects['Compiler'].save()
+        self.assertEqual(self.search(q='toolkit'), ['Django REST toolkit', 'Compiler'])
+
+    def test_prefix_query(self):
+        self.assertEqual(self.search(q='pyth'), [])
+        results = self.search(q='pyth*')
+        self.assertEqual(results[0], 'Pythonic docs')
+        self.assertCountEqual(results[1:], ['Django REST toolkit', 'Compiler'])
+
+    def test_filters(self):
+        self.assertEqual(self.search(q='rust', available='true'), ['Compiler'])
+        self.projects['Compiler'].status = 'closed'
+        self.projects['Compiler'].save()
+        self.assertEqual(self.search(q='rust', status='closed'), ['Compiler'])
+        response = self.client.get('/api/search_projects/', {'q': 'rust', 'status': 'gone'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_changes(self):
+        project = self.projects['Pythonic docs']
+        project.project_name = 'Haskell docs'
+        project.save()
+        self.assertEqual(self.search(q='haskell'), ['Haskell docs'])
+        self.assertEqual(self.search(q='pythonic'), [])
+        project.delete()
+        self.assertEqual(self.search(q='haskell'), [])
+
+    def test_operators_are_plain_words(self):
+        self.assertEqual(self.search(q='(python) -rust^'), ['Compiler'])
+        self.assertEqual(self.search(q='"written'), ['Compiler'])
+        self.assertEqual(self.search(q='rust OR django'), [])
+
+    def test_missing_query(self):
+        for params in ({}, {'q': ''}, {'q': '*"-'}):
+            response = self.client.get('/api/search_projects/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pagination(self):
+        response = self.client.get('/api/search_projects/', {'q': 'pyth*', 'limit': 2})
+        first_page = [project['project_name'] for project in response.data]
+        self.assertEqual(len(first_page), 2)
+        next_link = re.search(r'<([^>]+)>; rel="next"', response['Link']).group(1)
+
+        response = self.client.get(next_link)
+        second_page = [project['project_name'] for project in response.data]
+        self.assertEqual(first_page + second_page, self.search(q='pyth*'))
+        self.assertNotIn('rel="next"', response['Link'])
+        self.assertIn('rel="prev"', response['Link'])
+
+
+@unittest.skipIf(search_available(), 'FTS5 search index')
+class SearchUnavailableTestCase(APITestCase):
+    def test_not_implemented(self):
+        response = self.client.get('/api/search_projects/', {'q': 'python'})
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+
+class AsyncReadViewsTestCase(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.applicant = User.objects.create_user(
+            username='applicant', password='password', email='applicant@example.com')
+        self.applicant.programming_skills.add(
+            ProgrammingSkill.objects.create(name='Python'))
+        self.projects = [
+            OpenSourceProject.objects.create(
+                project_name=f'Project {i}',
+                description=f'Description for Project {i}',
+                maximum_collaborators=2,
+                current_collaborators=2 if i == 1 else 0,
+                creator=self.creator
+            ) for i in range(4)
+        ]
+        self.eoi = ExpressionOfInterest.objects.create(
+            user=self.applicant, project=self.projects[0])
+        self.creator_token = Token.objects.create(user=self.creator)
+        self.applicant_token = Token.objects.create(user=self.applicant)
+
+    def auth(self, token):
+        return {'headers': {'Authorization': f'Token {token.key}'}}
+
+    async def test_available_projects_matches_sync_view(self):
+        sync_response = await self.async_client.get('/api/available_projects/', {'page_size': 2})
+        response = await self.async_client.get('/api/async/available_projects/', {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual([project['project_name'] for project in response.json()],
+                         ['Project 0', 'Project 2'])
+
+        # The cursors are interchangeable with the sync endpoint
+        self.assertIn('/api/async/available_projects/', response['Link'])
+        next_link = re.search(r'<([^>]+)>; rel="next"', sync_response['Link']).group(1)
+        response = await self.async_client.get(
+            next_link.replace('/api/available_projects/', '/api/async/available_projects/'))
+        self.assertEqual([project['project_name'] for project in response.json()], ['Project 3'])
+        self.assertIn('rel="prev"', response['Link'])
+
+    async def test_available_projects_invalid_cursor(self):
+        response = await self.async_client.get('/api/async/available_projects/', {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_project_interests(self):
+        url = f'/api/async/projects/{self.projects[0].id}/interests/'
+        response = await self.async_client.get(url, **self.auth(self.creator_token))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [{
+            'id': self.eoi.id,
+            'user_details': {
+                'username': 'applicant',
+                'email': 'applicant@example.com',
+                'programming_skills': ['Python'],
+            },
+            'status': 'pending',
+            'created_at': response.json()[0]['created_at'],
+        }])
+
+        response = await self.async_client.get(url, {'status': 'bogus'}, **self.auth(self.creator_token))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = await self.async_client.get(url, **self.auth(self.applicant_token))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = await self.async_client.get(
+            '/api/async/projects/999/interests/', **self.auth(self.creator_token))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_authentication(self):
+        url = f'/api/async/get_user_analytics/{self.applicant.id}/'
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+        response = await self.async_client.get(url, headers={'Authorization': 'Token bogus'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json()['detail'], 'Invalid token.')
+
+        self.applicant.is_active = False
+        await self.applicant.asave()
+        response = await self.async_client.get(url, **self.auth(self.applicant_token))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_get_user_analytics(self):
+        url = f'/api/async/get_user_analytics/{self.applicant.id}/'
+        await UserAnalytics.objects.filter(pk=self.applicant.id).adelete()
+
+        # The first request builds the summary, the second reads it
+        for _ in range(2):
+            response = await self.async_client.get(url, **self.auth(self.applicant_token))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['interests_project_name'], ['Project 0'])
+            self.assertEqual(response.json()['user_skills'], ['Python'])
+
+        response = await self.async_client.get(url, **self.auth(self.creator_token))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.creator.is_staff = True
+        await self.creator.asave()
+        response = await self.async_client.get(
+            '/api/async/get_user_analytics/999/', **self.auth(self.creator_token))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AvailableProjectsCacheTestCase(TestCase):
+    def setUp(self):
+        listing_cache.cache.clear()
+        listing_cache.clear_stats()
+        self.client = APIClient()
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.applicant = User.objects.create_user(
+            username='applicant', password='password')
+        self.project = OpenSourceProject.objects.create(
+            project_name='Project 1',
+            description='Description for Project 1',
+            maximum_collaborators=1,
+            creator=self.creator
+        )
+        self.client.force_authenticate(user=self.creator)
+
+    def names(self, url='/api/available_projects/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [project['project_name'] for project in response.data]
+
+    def test_hit_after_miss(self):
+        self.assertEqual(self.names(), ['Project 1'])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.names(), ['Project 1'])
+        self.assertEqual(self.names('/api/available_projects/?page_size=1'), ['Project 1'])
+
+        stats = listing_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 2, 0))
+
+    def test_every_listing_change_invalidates(self):
+        self.names()
+        changes = [
+            lambda: self.client.post('/api/create_project/', {
+                'project_name': 'Project 2', 'description': 'Description',
+                'maximum_collaborators': 2}),
+            lambda: OpenSourceProject.objects.bulk_create([OpenSourceProject(
+                project_name='Project 3', description='Description',
+                maximum_collaborators=2, creator=self.creator)]),
+            lambda: OpenSourceProject.objects.filter(project_name='Project 3').update(
+                description='Changed'),
+            lambda: self.client.post(f'/api/projects/close/{self.project.id}/'),
+            lambda: User.objects.filter(pk=self.creator.pk).update(username='renamed'),
+            lambda: self.client.delete(f'/api/projects/{self.project.id}/delete/'),
+        ]
+        for change in changes:
+            version = get_cache_version(LISTING_VERSION)
+            change()
+            self.assertNotEqual(get_cache_version(LISTING_VERSION), version)
+
+        self.assertEqual(self.names(), ['Project 2', 'Project 3'])
+        self.assertEqual(listing_cache.stats()['evictions'], 1)
+
+    def test_striped_version(self):
+        # As on PostgreSQL, where each transaction bumps one stripe
+        CacheVersion.objects.filter(name__startswith=LISTING_VERSION).delete()
+        CacheVersion.objects.bulk_create(
+            CacheVersion(name=f'{LISTING_VERSION}:{stripe}', version=f'{stripe}' * 32)
+            for stripe in range(3))
+        version = get_cache_version(LISTING_VERSION)
+        self.assertEqual(len(version), 32)
+
+        CacheVersion.objects.filter(name=f'{LISTING_VERSION}:1').update(version='f' * 32)
+        self.assertNotIn(get_cache_version(LISTING_VERSION), (None, version))
+        version = get_cache_version(LISTING_VERSION)
+        bump_cache_version(LISTING_VERSION)
+        self.assertNotEqual(get_cache_version(LISTING_VERSION), version)
+        self.assertEqual(CacheVersion.objects.count(), 4)
+
+    def test_accept_and_reject_invalidate(self):
+        self.assertEqual(self.names(), ['Project 1'])
+        eoi = ExpressionOfInterest.objects.create(user=self.applicant, project=self.project)
+        url = f'/api/projects/{self.project.id}/accept_or_reject_interest/{eoi.id}/'
+
+        self.client.post(url, {'action': 'accept'})
+        self.assertEqual(self.names(), [])
+
+        # Rejecting a collaborator gives the seat back
+        ExpressionOfInterest.objects.filter(pk=eoi.pk).update(status='pending')
+        self.client.post(url, {'action': 'reject'})
+        self.assertEqual(self.names(), ['Project 1'])
+
+    def test_unrelated_writes_keep_entries(self):
+        self.names()
+        User.objects.create_user(username='other', password='password')
+        self.project.collaborators.add(self.applicant)
+        ExpressionOfInterest.objects.create(user=self.applicant, project=self.project)
+        with self.assertNumQueries(1):
+            self.names()
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches_setting = {'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }}
+            with override_settings(CACHES=caches_setting):
+                self.assertEqual(self.names(), ['Project 1'])
+                self.assertTrue(os.listdir(location))
+                with self.assertNumQueries(1):
+                    self.assertEqual(self.names(), ['Project 1'])
+                self.project.maximum_collaborators = 0
+                self.project.save()
+                self.assertEqual(self.names(), [])
+                self.assertEqual(listing_cache.stats()['evictions'], 1)
+
+    @override_settings(RESPONSE_CACHE={'TIMEOUT': 0})
+    def test_disabled(self):
+        self.names()
+        # The version is still read for the ETag
+        with self.assertNumQueries(2):
+            self.names()
+        self.assertEqual(listing_cache.stats()['hits'], 0)
+
+    async def test_routes_keep_separate_entries(self):
+        await OpenSourceProject.objects.acreate(
+            project_name='Project 2', description='Description for Project 2',
+            maximum_collaborators=1, creator=self.creator)
+        for _ in range(2):
+            sync_response = await self.async_client.get('/api/available_projects/', {'page_size': 1})
+            response = await self.async_client.get('/api/async/available_projects/', {'page_size': 1})
+            self.assertEqual(response.json(), sync_response.json())
+            # Links in a cached page point back at the route that was asked
+            self.assertIn('/api/available_projects/?', sync_response['Link'])
+            self.assertNotIn('/api/async/', sync_response['Link'])
+            self.assertIn('/api/async/available_projects/?', response['Link'])
+        stats = listing_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+
+    def test_metrics(self):
+        self.names()
+        self.names()
+        admin = User.objects.create_user(username='admin', password='password', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get('/api/metrics/')
+        stats = response.data['response_cache']['available_projects']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.applicant = User.objects.create_user(
+            username='applicant', password='password', email='applicant@example.com')
+        self.project = OpenSourceProject.objects.create(
+            project_name='Project 1',
+            description='Description for Project 1',
+            maximum_collaborators=2,
+            creator=self.creator
+        )
+        self.eoi = ExpressionOfInterest.objects.create(user=self.applicant, project=self.project)
+        self.client.force_authenticate(user=self.creator)
+
+    def tearDown(self):
+        # Committed skills are remembered past the test's rollback
+        skill_vocabulary.clear()
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def assertRevalidates(self, url, change=None):
+        """
+        The ETag of ``url`` holds until ``change`` runs, then moves on.
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        if change is not None:
+            change()
+            response = self.revalidate(url, etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_available_projects(self):
+        url = '/api/available_projects/'
+        self.assertRevalidates(url, lambda: self.client.post(
+            f'/api/projects/{self.project.id}/accept_or_reject_interest/{self.eoi.id}/',
+            {'action': 'accept'}))
+
+        # Another page is another resource
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'page_size': 1})['ETag'], etag)
+
+    def test_available_projects_304_is_one_query(self):
+        url = '/api/available_projects/'
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_project_interests(self):
+        url = f'/api/projects/{self.project.id}/interests/'
+        self.assertRevalidates(url, lambda: self.client.post(
+            f'/api/projects/{self.project.id}/accept_or_reject_interest/{self.eoi.id}/',
+            {'action': 'reject'}))
+        self.assertIn('private', self.client.get(url)['Cache-Control'])
+
+    def test_project_interests_follow_applicants(self):
+        url = f'/api/projects/{self.project.id}/interests/'
+        skill = ProgrammingSkill.objects.create(name='Python')
+        changes = [
+            lambda: self.applicant.programming_skills.add(skill),
+            lambda: ProgrammingSkill.objects.filter(pk=skill.pk).first().save(),
+            lambda: User.objects.get(pk=self.applicant.pk).save(),
+            lambda: ExpressionOfInterest.objects.create(
+                user=User.objects.create_user(username='other', password='password'),
+                project=self.project),
+            lambda: ExpressionOfInterest.objects.filter(user__username='other').delete(),
+        ]
+        for change in changes:
+            self.assertRevalidates(url, change)
+
+    def test_user_analytics(self):
+        self.client.force_authenticate(user=self.applicant)
+        url = f'/api/get_user_analytics/{self.applicant.id}/'
+
+        def add_skill():
+            # The summary is refreshed when the transaction commits
+            with self.captureOnCommitCallbacks(execute=True):
+                self.applicant.programming_skills.add(ProgrammingSkill.objects.create(name='Go'))
+        self.assertRevalidates(url, add_skill)
+
+    async def test_async_views_share_validators(self):
+        token = await Token.objects.acreate(user=self.creator)
+        headers = {'Authorization': f'Token {token.key}'}
+        for path in ('available_projects/', f'projects/{self.project.id}/interests/',
+                     f'get_user_analytics/{self.creator.id}/'):
+            response = await self.async_client.get(f'/api/async/{path}', headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = await self.async_client.get(
+                f'/api/async/{path}', headers={**headers, 'If-None-Match': response['ETag']})
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_raw_updates_stamp_updated_at(self):
+        before = self.project.updated_at
+        self.client.post(
+            f'/api/projects/{self.project.id}/accept_or_reject_interest/{self.eoi.id}/',
+            {'action': 'accept'})
+        self.project.refresh_from_db()
+        self.eoi.refresh_from_db()
+        self.assertGreater(self.project.updated_at, before)
+        self.assertEqual(self.eoi.updated_at, self.project.updated_at)
+
+
+class DatabaseTriggersTestCase(TestCase):
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite triggers')
+    def test_project_triggers_survive_migrations(self):
+        # Table rebuilds in later migrations drop triggers on SQLite, see
+        # api/migrations/_triggers.py
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            triggers = {name for name, in cursor.fetchall()}
+        self.assertLessEqual({
+            'api_project_search_insert', 'api_project_search_delete', 'api_project_search_update',
+            'api_listing_version_insert', 'api_listing_version_delete',
+            'api_listing_version_update', 'api_listing_version_username',
+        }, triggers)
+
+
+class ProductionDatabaseProfileTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+        # A private alias, as SimpleTestCase refuses queries on 'default'
+        # (the handler still needs one, left unconfigured)
+        self.connections = ConnectionHandler({'default': {}, 'profile': {
+            **copy.deepcopy(settings.PRODUCTION_DATABASES['default']), 'NAME': self.path}})
+        self.addCleanup(self.connections.close_all)
+        self.connection = self.connections['profile']
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('mmap_size'), 256 * 1024 * 1024)
+        self.assertEqual(self.pragma('cache_size'), -64 * 1024)
+        self.assertEqual(self.pragma('temp_store'), 2)  # MEMORY
+
+    def test_transactions_take_the_write_lock(self):
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        # What transaction.atomic() runs when it opens a transaction
+        with self.connection.cursor() as cursor:
+            cursor.execute('BEGIN')
+        try:
+            with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+                other.execute('BEGIN IMMEDIATE')
+        finally:
+            with self.connection.cursor() as cursor:
+                cursor.execute('ROLLBACK')
+
+        # Reconnecting sets the pragmas again without stacking wrappers
+        self.connection.close()
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.connection.execute_wrappers.count(_set_transaction_mode), 1)
+
+    def test_development_profile_is_untouched(self):
+        self.assertNotIn('PRAGMAS', settings.DEVELOPMENT_DATABASES['default'])
+        self.assertNotIn(_set_transaction_mode, connection.execute_wrappers)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTestCase(SimpleTestCase):
+    def route(self, method, view=None):
+        """
+        Database of a read run by ``view`` during a ``method`` request.
+        """
+        def get_response(request):
+            if view is not None:
+                view()
+            return HttpResponse(router.db_for_read(OpenSourceProject))
+
+        request = getattr(RequestFactory(), method.lower())('/api/available_projects/')
+        return ReplicaRoutingMiddleware(get_response)(request).content.decode()
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.route('GET'), 'replica')
+        self.assertEqual(self.route('HEAD'), 'replica')
+
+    def test_unsafe_requests_read_from_primary(self):
+        self.assertEqual(self.route('POST'), 'default')
+        self.assertEqual(self.route('PUT'), 'default')
+
+    def test_reads_after_a_write_stay_on_primary(self):
+        self.assertEqual(router.db_for_write(OpenSourceProject), 'default')
+        self.assertEqual(
+            self.route('GET', lambda: router.db_for_write(OpenSourceProject)), 'default')
+        # The pin does not outlive the request
+        self.assertEqual(self.route('GET'), 'replica')
+
+    def test_reads_outside_requests(self):
+        self.assertEqual(router.db_for_read(OpenSourceProject), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.route('GET'), 'default')
+
+    def test_async_pin(self):
+        async def get_response(request):
+            self.assertEqual(router.db_for_read(OpenSourceProject), 'replica')
+            await sync_to_async(router.db_for_write)(OpenSourceProject)
+            return HttpResponse(router.db_for_read(OpenSourceProject))
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = async_to_sync(middleware)(RequestFactory().get('/'))
+        self.assertEqual(response.content, b'default')
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(router.allow_migrate('replica', 'api'))
+        self.assertTrue(router.allow_migrate('default', 'api'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTransactionTestCase(TestCase):
+    def test_reads_in_transactions_stay_on_primary(self):
+        # TestCase runs every test in a transaction, whose rows a replica
+        # could not see, so the 'replica' alias is never used
+        creator = User.objects.create_user(username='creator', password='password')
+        OpenSourceProject.objects.create(project_name='Fresh', description='Description',
+                                         maximum_collaborators=2, creator=creator)
+        response = self.client.get('/api/available_projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([project['project_name'] for project in response.data], ['Fresh'])
+
+    def test_summaries_are_computed_on_primary(self):
+        user = User.objects.create_user(username='user', password='password')
+        OpenSourceProject.objects.create(project_name='Fresh', description='Description',
+                                         maximum_collaborators=2, creator=user)
+        # As in a GET request outside a transaction; 'replica' is not a
+        # configured database, so any read routed there fails
+        with unittest.mock.patch('api.routers.PrimaryReplicaRouter.db_for_read',
+                                 return_value='replica'):
+            summary = analytics.refresh_user_analytics([user.pk])[user.pk]
+        self.assertEqual(summary.projects_name, ['Fresh'])
+
+    def test_sync_replicas_needs_replicas(self):
+        with override_settings(DATABASE_REPLICAS=[]):
+            with self.assertRaisesMessage(CommandError, 'No replicas configured'):
+                call_command('sync_replicas')
+
+
+class RequestMetricsTestCase(APITestCase):
+    SERVER_TIMING = re.compile(
+        r'^db;dur=[0-9.]+;desc="(\d+) queries", view;dur=[0-9.]+, '
+        r'(serialize;dur=[0-9.]+, )?total;dur=[0-9.]+$')
+
+    def setUp(self):
+        token_cache.clear()
+        self.creator = User.objects.create_user(
+            username='creator', password='password')
+        self.project = OpenSourceProject.objects.create(
+            project_name='Project 1',
+            description='Description for Project 1',
+            maximum_collaborators=2,
+            creator=self.creator
+        )
+        self.token = Token.objects.create(user=self.creator)
+
+    def assertServerTiming(self, response, queries, serialize=True):
+        match = self.SERVER_TIMING.match(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        self.assertEqual(int(match.group(1)), queries)
+        self.assertEqual(match.group(2) is not None, serialize)
+
+    def test_server_timing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/available_projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertServerTiming(response, len(queries))
+
+    def test_server_timing_async_view(self):
+        token_cache.clear()
+        response = self.client.get(
+            f'/api/async/projects/{self.project.id}/interests/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Token lookup, project, ETag and page: JsonResponse is not rendered
+        self.assertServerTiming(response, 4, serialize=False)
+
+    def test_log_record(self):
+        with self.assertLogs('api.middleware', 'INFO') as logs:
+            self.client.get('/api/available_projects/')
+        record, = logs.records
+        self.assertEqual(record.endpoint, 'available_projects')
+        self.assertEqual(record.status, 200)
+        self.assertEqual(record.queries, 2)
+        for field in ['db_ms', 'view_ms', 'serialize_ms', 'total_ms']:
+            self.assertGreaterEqual(getattr(record, field), 0)
+        self.assertLessEqual(record.db_ms, record.total_ms)
+
+    @override_settings(REQUEST_METRICS={'HEADER': False, 'LOG': False})
+    def test_disabled(self):
+        with self.assertNoLogs('api.middleware', 'INFO'):
+            response = self.client.get('/api/available_projects/')
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(QUERY_BUDGETS={'available_projects': 1})
+    def test_budget_exceeded_fails_tests(self):
+        with self.assertRaisesMessage(
+                QueryBudgetExceeded, 'available_projects ran 2 queries, over its budget of 1'):
+            self.client.get('/api/available_projects/')
+
+    @override_settings(QUERY_BUDGETS={'available_projects': 1}, QUERY_BUDGETS_STRICT=False)
+    def test_budget_exceeded_warns_in_production(self):
+        with self.assertLogs('api.middleware', 'WARNING') as logs:
+            response = self.client.get('/api/available_projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        record, = logs.records
+        self.assertEqual(record.getMessage(),
+                         'available_projects ran 2 queries, over its budget of 1')
+        self.assertEqual((record.queries, record.budget), (2, 1))
+
+    def test_instrument_inside_execute_wrapper(self):
+        wrappers = connection.execute_wrappers
+        connection.execute_wrappers = []
+        try:
+            with connection.execute_wrapper(lambda execute, *args: execute(*args)):
+                # As when the connection is opened inside the block
+                instrument(connection)
+            self.assertEqual(connection.execute_wrappers, [_record_query])
+        finally:
+            connection.execute_wrappers = wrappers
+
+    def test_queries_outside_requests_are_not_counted(self):
+        response = self.client.get('/api/available_projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNoLogs('api.middleware', 'INFO'):
+            list(OpenSourceProject.objects.all())
+
+
+class CommittedWriteBudgetTestCase(TransactionTestCase):
+    """
+    Writes against committed transactions, so that the refresh of the user
+    analytics summaries runs inside the request and counts against the
+    endpoint's budget (enforced by QueryBudgetTestRunner).
+    """
+    # Keeps the rows created by migrations (cache versions) for later tests
+    serialized_rollback = True
+
+    def setUp(self):
+        token_cache.clear()
+        self.creator = User.objects.create_user(username='creator', password='password')
+        self.project = OpenSourceProject.objects.create(
+            project_name='Project', description='Description for Project',
+            maximum_collaborators=5, creator=self.creator)
+        self.applicants = [
+            User.objects.create_user(username=f'applicant{i}', password='password')
+            for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.creator)
+
+    def queries(self, response):
+        return int(re.search(r'"(\d+) queries"', response['Server-Timing']).group(1))
+
+    def test_delete_project_cost_does_not_grow_with_interests(self):
+        counts = []
+        for interests in (2, 3):
+            project = OpenSourceProject.objects.create(
+                project_name=f'Doomed {interests}', description='Description',
+                maximum_collaborators=5, creator=self.creator)
+            ExpressionOfInterest.objects.bulk_create(
+                ExpressionOfInterest(user=user, project=project)
+                for user in self.applicants[:interests])
+            project.collaborators.add(self.applicants[0])
+            response = self.client.delete(f'/api/projects/{project.id}/delete/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(self.queries(response))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(UserAnalytics.objects.get(pk=self.applicants[0].pk).interests, 0)
+
+    def test_interest_and_triage_stay_within_budget(self):
+        self.client.force_authenticate(user=self.applicants[0])
+        response = self.client.post(f'/api/projects/{self.project.id}/express_interest/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(UserAnalytics.objects.get(pk=self.applicants[0].pk).interests, 1)
+
+        eoi = ExpressionOfInterest.objects.get(user=self.applicants[0])
+        self.client.force_authenticate(user=self.creator)
+        response = self.client.post(
+            f'/api/projects/{self.project.id}/accept_or_reject_interest/{eoi.id}/',
+            {'action': 'accept'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            UserAnalytics.objects.get(pk=self.applicants[0].pk).collaborations_name, ['Project'])
+
+
+class LoggingPipelineTestCase(SimpleTestCase):
+    class Collect(logging.Handler):
+        def __init__(self, gate=None):
+            super().__init__()
+            self.records = []
+            self.gate = gate
+
+        def emit(self, record):
+            if self.gate is not None:
+                self.gate.wait(5)
+            self.records.append((threading.get_ident(), self.format(record)))
+
+    class Probe:
+        """A message argument recording the threads formatting it."""
+        def __init__(self):
+            self.threads = []
+
+        def __str__(self):
+            self.threads.append(threading.get_ident())
+            return 'probe'
+
+    def setUp(self):
+        self.logger = logging.getLogger('api.tests.pipeline')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
+        self.logger.filters.clear()
+
+    def test_records_are_formatted_on_the_writer_thread(self):
+        target = self.Collect()
+        handler = QueueListenerHandler([target])
+        self.logger.addHandler(handler)
+        probe = self.Probe()
+
+        self.logger.info('value: %s', probe)
+        self.logger.debug('disabled: %s', probe)
+        handler.flush()
+
+        self.assertEqual([message for _, message in target.records], ['value: probe'])
+        self.assertEqual(len(probe.threads), 1)
+        self.assertNotEqual(probe.threads[0], threading.get_ident())
+        self.assertNotEqual(target.records[0][0], threading.get_ident())
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        gate = threading.Event()
+        target = self.Collect(gate)
+        handler = QueueListenerHandler([target], queue_size=2)
+        self.logger.addHandler(handler)
+
+        for i in range(10):
+            self.logger.info('record %s', i)
+        # One record is being written, two wait in the queue
+        self.assertGreaterEqual(handler.dropped, 7)
+        gate.set()
+        handler.flush()
+        self.assertEqual(len(target.records) + handler.dropped, 10)
+
+    def test_sampling(self):
+        target = self.Collect()
+        self.logger.addHandler(target)
+        self.logger.addFilter(SamplingFilter(rate=0.25, seed=1))
+
+        for i in range(400):
+            self.logger.info('record %s', i)
+        self.logger.warning('always kept')
+
+        self.assertTrue(50 < len(target.records) - 1 < 150, len(target.records))
+        self.assertEqual(target.records[-1][1], 'always kept')
+
+    def test_json_formatter(self):
+        formatter = JsonFormatter()
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = self.logger.makeRecord(
+                self.logger.name, logging.ERROR, __file__, 1, 'failed for %s', ('user',),
+                sys.exc_info(), extra={'user_id': 7, 'when': timezone.now()})
+
+        payload = json.loads(formatter.format(record))
+        self.assertEqual(payload['level'], 'ERROR')
+        self.assertEqual(payload['logger'], 'api.tests.pipeline')
+        self.assertEqual(payload['message'], 'failed for user')
+        self.assertEqual(payload['user_id'], 7)
+        self.assertIn('when', payload)
+        self.assertIn('ValueError: boom', payload['exception'])
+        self.assertNotIn('lineno', payload)
+
+    def test_production_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = copy.deepcopy(settings.PRODUCTION_LOGGING)
+            config['handlers']['file']['filename'] = os.path.join(directory, 'api.log')
+            config['loggers'] = {'api.tests.profile': config['loggers']['api']}
+            logging.config.dictConfig(config)
+            logger = logging.getLogger('api.tests.profile')
+            try:
+                handler, = logger.handlers
+                self.assertIsInstance(handler, QueueListenerHandler)
+                logger.info('Project %s closed', 3)
+                logger.debug('not written')
+                handler.flush()
+            finally:
+                for handler in list(logger.handlers):
+                    handler.close()
+                    logger.removeHandler(handler)
+                logger.filters.clear()
+                # dictConfig closed the handlers of the project settings
+                logging.config.dictConfig(settings.LOGGING)
+            with open(os.path.join(directory, 'api.log')) as log_file:
+                lines = [json.loads(line) for line in log_file]
+        self.assertEqual([line['message'] for line in lines], ['Project 3 closed'])
+
+    def test_production_sampling_covers_child_loggers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = copy.deepcopy(settings.PRODUCTION_LOGGING)
+            config['handlers']['file']['filename'] = os.path.join(directory, 'api.log')
+            config['filters']['sample_info']['rate'] = 0
+            logging.config.dictConfig(config)
+            try:
+                handler, = logging.getLogger('api').handlers
+                views_logger = logging.getLogger('api.views')
+                views_logger.info('Project %s closed', 3)
+                views_logger.warning('Project %s not found', 4)
+                logging.getLogger('django.request').info('Not sampled')
+                handler.flush()
+            finally:
+                # Closes the handlers configured above
+                logging.config.dictConfig(settings.LOGGING)
+            with open(os.path.join(directory, 'api.log')) as log_file:
+                lines = [json.loads(line) for line in log_file]
+        self.assertEqual([(line['logger'], line['message']) for line in lines],
+                         [('api.views', 'Project 4 not found'), ('django.request', 'Not sampled')])
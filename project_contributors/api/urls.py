@@ -1,14 +1,20 @@
 from django.urls import path
-from api import views
+from api import async_views, views
 
 urlpatterns = [
     path('create_user/', views.create_user, name='create_user'),
+    path('bulk_create_users/', views.bulk_create_users, name='bulk_create_users'),
     path('reset_password/', views.reset_password, name='reset_password'),
     path('add_skill/', views.add_skill, name='add_skill'),
     path('remove_skill/', views.remove_skill, name='remove_skill'),
+    path('skills/', views.replace_skills, name='replace_skills'),
     path('create_project/', views.create_project, name='create_project'),
     path('available_projects/', views.available_projects,
          name='available_projects'),
+    path('recommended_projects/', views.recommended_projects,
+         name='recommended_projects'),
+    path('search_projects/', views.search_projects,
+         name='search_projects'),
     path('projects/<int:project_id>/express_interest/',
          views.express_interest, name='express_interest'),
     path('projects/close/<int:project_id>/',
@@ -18,7 +24,27 @@ urlpatterns = [
          views.project_interests, name='project_interests'),
     path('projects/<int:project_id>/accept_or_reject_interest/<int:eoi_id>/',
          views.accept_or_reject_interest, name='accept_or_reject_interest'),
+    path('projects/<int:project_id>/interests/bulk/',
+         views.bulk_accept_or_reject_interests, name='bulk_accept_or_reject_interests'),
     path('get_user_analytics/<int:user_id>/',
          views.get_user_analytics, name='get_user_analytics'),
+    path('get_user_analytics/batch/',
+         views.get_users_analytics, name='get_users_analytics'),
+    path('export/<str:resource>/', views.export_resource, name='export_resource'),
+    path('metrics/', views.metrics, name='metrics'),
+
+    # Async variants that hash passwords on the password hashing executor
+    path('async/create_user/', async_views.create_user, name='create_user_async'),
+    path('async/reset_password/', async_views.reset_password,
+         name='reset_password_async'),
+    path('async/token/', async_views.obtain_auth_token, name='api_token_auth_async'),
+
+    # Async read path for ASGI deployments
+    path('async/available_projects/', async_views.available_projects,
+         name='available_projects_async'),
+    path('async/projects/<int:project_id>/interests/',
+         async_views.project_interests, name='project_interests_async'),
+    path('async/get_user_analytics/<int:user_id>/',
+         async_views.get_user_analytics, name='get_user_analytics_async'),
 
 ]
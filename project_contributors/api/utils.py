@@ -21,3 +21,26 @@ def check_object_exists(model, **kwargs):
         return model.objects.get(**kwargs)
     except model.DoesNotExist:
         return None
+
+
+def get_or_create_skills(names):
+    """
+    Get or create the programming skills with the given names in two queries.
+
+    Missing skills are inserted with a single ``bulk_create`` that ignores
+    names created concurrently, then every skill is read back by name.
+
+    Args:
+        names: Iterable of skill names.
+
+    Returns:
+        A dict mapping each name to its ProgrammingSkill.
+    """
+    from api.models import ProgrammingSkill
+
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    ProgrammingSkill.objects.bulk_create(
+        [ProgrammingSkill(name=name) for name in names], ignore_conflicts=True)
+    return ProgrammingSkill.objects.in_bulk(names, field_name='name')
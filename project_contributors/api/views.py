@@ -1,19 +1,38 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, authentication_classes, parser_classes, permission_classes
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
 from .models import ProgrammingSkill
-from django.db.models import Count
-from django.db.models import F
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
 from api.models import OpenSourceProject, ExpressionOfInterest
 from api.serializers import OpenSourceProjectSerializer, ExpressionOfInterestSerializer
 from api.utils import check_object_exists
+from api.analytics import (
+    get_user_analytics_summary, get_users_analytics_summaries, schedule_analytics_refresh,
+    serialize_user_analytics)
+from api.authentication import CachedTokenAuthentication, token_cache
+from api.cache import LISTING_VERSION, get_cache_version, listing_cache
+from api.conditional import interests_etag, not_modified, request_etag, set_validator
+from api.recommendations import project_index, recommend_projects
+from api.pagination import AvailableProjectsPagination, ProjectInterestsPagination, ProjectSearchPagination
+from api.search import build_match_query, ranked_projects, search_available
+from api.skills import skill_vocabulary, user_skill_names
+from api.hashing import hash_passwords
+from api.parsers import NDJSONParser
+from api.export import EXPORT_RESOURCES, export_rows, parse_since, to_ndjson
+from api.signals import touch_interests
 import logging
 
 
@@ -30,7 +49,7 @@ def create_user(request):
     email = request.data.get('email')
 
     # Log incoming request data
-    logger.info(f"Received request data: username={username}, email={email}")
+    logger.info("Received request data: username=%s, email=%s", username, email)
 
     # Check if all required fields are provided
     if not (username and password and email):
@@ -40,12 +59,12 @@ def create_user(request):
     # Log when checking for existing users
     existing_user = check_object_exists(User, username=username)
     if existing_user:
-        logger.warning(f"Username '{username}' already exists")
+        logger.warning("Username '%s' already exists", username)
         return Response({'error': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
     existing_email = check_object_exists(User, email=email)
     if existing_email:
-        logger.warning(f"Email '{email}' already exists")
+        logger.warning("Email '%s' already exists", email)
         return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
     # Log when creating a new user
@@ -57,11 +76,176 @@ def create_user(request):
         country=request.data.get('country'),
         residence=request.data.get('residence')
     )
-    logger.info(f"User '{username}' created successfully")
+    logger.info("User '%s' created successfully", username)
 
     return Response({'message': 'User created successfully'}, status=status.HTTP_201_CREATED)
 
 
+def _existing_values(field, values, chunk_size=500):
+    """
+    Return which of ``values`` are already taken for a unique ``User`` field,
+    using one ``IN`` query per ``chunk_size`` values.
+    """
+    values = list(values)
+    existing = set()
+    for start in range(0, len(values), chunk_size):
+        existing.update(User.objects.filter(
+            **{f'{field}__in': values[start:start + chunk_size]}
+        ).values_list(field, flat=True))
+    return existing
+
+
+def _profile_fields(row):
+    """
+    Return the optional profile fields of a bulk registration row, coerced
+    the way the model would store them, or raise ``ValueError`` with a
+    message for the row if one of them cannot be stored.
+    """
+    fields = {}
+    age = row.get('age')
+    if age is not None:
+        if isinstance(age, bool):
+            raise ValueError('Age must be a whole number')
+        try:
+            age = User._meta.get_field('age').to_python(age)
+        except ValidationError:
+            raise ValueError('Age must be a whole number')
+    fields['age'] = age
+    for name in ('country', 'residence'):
+        value = row.get(name)
+        if value is not None:
+            if not isinstance(value, str):
+                raise ValueError(f'{name.capitalize()} must be a string')
+            max_length = User._meta.get_field(name).max_length
+            if len(value) > max_length:
+                raise ValueError(f'{name.capitalize()} is at most {max_length} characters long')
+        fields[name] = value
+    return fields
+
+
+def _insert_users(users, results, batch_size):
+    """
+    Insert ``(index, user)`` pairs with ``bulk_create`` and record the outcome
+    of every row in ``results``.
+
+    A batch that hits a unique constraint (a concurrent registration took a
+    username or email after the uniqueness check) is retried row by row, so
+    only the conflicting rows are reported as failed.
+    """
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user in batch])
+            for index, user in batch:
+                results[index] = {'index': index, 'username': user.username, 'status': 'created'}
+        except IntegrityError:
+            for index, user in batch:
+                try:
+                    with transaction.atomic():
+                        user.pk = None
+                        user.save(force_insert=True)
+                    results[index] = {'index': index, 'username': user.username, 'status': 'created'}
+                except IntegrityError:
+                    results[index] = {'index': index, 'username': user.username,
+                                      'status': 'error', 'error': 'Username or email already exists'}
+
+
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAdminUser])
+@parser_classes([JSONParser, NDJSONParser])
+def bulk_create_users(request):
+    rows = request.data
+    if not isinstance(rows, list):
+        logger.error('Expected a list of users')
+        return Response({'message': 'Expected a list of users'}, status=status.HTTP_400_BAD_REQUEST)
+
+    max_rows = getattr(settings, 'BULK_USER_MAX_ROWS', 1000)
+    if len(rows) > max_rows:
+        logger.error('Too many users in one request: %s', len(rows))
+        return Response({'message': f'At most {max_rows} users can be created at once'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    logger.info('Received bulk registration of %s users', len(rows))
+    results = [None] * len(rows)
+
+    # Validate every row and reject duplicates inside the batch itself
+    candidates = []
+    seen_usernames, seen_emails = set(), set()
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results[index] = {'index': index, 'status': 'error', 'error': 'Expected an object'}
+            continue
+        username = row.get('username')
+        password = row.get('password')
+        email = row.get('email')
+        if not (username and password and email):
+            results[index] = {'index': index, 'username': username, 'status': 'error',
+                              'error': 'Please provide username, password, and email'}
+            continue
+        if not all(isinstance(value, str) for value in (username, password, email)):
+            results[index] = {'index': index, 'username': username, 'status': 'error',
+                              'error': 'Username, password and email must be strings'}
+            continue
+        try:
+            profile = _profile_fields(row)
+        except ValueError as error:
+            results[index] = {'index': index, 'username': username, 'status': 'error',
+                              'error': str(error)}
+            continue
+        username = User.normalize_username(username)
+        email = User.objects.normalize_email(email)
+        if username in seen_usernames:
+            results[index] = {'index': index, 'username': username, 'status': 'error',
+                              'error': 'Username already exists'}
+            continue
+        if email in seen_emails:
+            results[index] = {'index': index, 'username': username, 'status': 'error',
+                              'error': 'Email already exists'}
+            continue
+        seen_usernames.add(username)
+        seen_emails.add(email)
+        candidates.append((index, username, email, row['password'], profile))
+
+    # Check uniqueness against the database for the whole batch at once
+    taken_usernames = _existing_values('username', seen_usernames)
+    taken_emails = _existing_values('email', seen_emails)
+    new_users = []
+    for index, username, email, password, profile in candidates:
+        if username in taken_usernames:
+            results[index] = {'index': index, 'username': username, 'status': 'error',
+                              'error': 'Username already exists'}
+        elif email in taken_emails:
+            results[index] = {'index': index, 'username': username, 'status': 'error',
+                              'error': 'Email already exists'}
+        else:
+            new_users.append((index, username, email, password, profile))
+
+    # Hash all passwords on the shared executor, then insert in batches
+    passwords = hash_passwords([password for _, _, _, password, _ in new_users])
+    users = [
+        (index, User(
+            username=username,
+            email=email,
+            password=password,
+            **profile
+        ))
+        for (index, username, email, _, profile), password in zip(new_users, passwords)
+    ]
+    _insert_users(users, results, getattr(settings, 'BULK_USER_BATCH_SIZE', 1000))
+
+    created = sum(1 for result in results if result['status'] == 'created')
+    logger.info('Bulk registration created %s of %s users', created, len(rows))
+    if created == len(rows):
+        response_status = status.HTTP_201_CREATED
+    elif created:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response({'created': created, 'results': results}, status=response_status)
+
+
 @api_view(['POST'])
 def reset_password(request):
     if request.method == 'POST':
@@ -82,7 +266,7 @@ def reset_password(request):
         user.set_password(password)
         user.save()
 
-        logger.info(f'Password reset for user: {username}')
+        logger.info('Password reset for user: %s', username)
         return Response({'message': 'Password reset successfully'}, status=status.HTTP_200_OK)
     else:
         logger.error('Method not allowed')
@@ -90,7 +274,7 @@ def reset_password(request):
 
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def add_skill(request):
     if request.method == 'POST':
@@ -105,21 +289,18 @@ def add_skill(request):
             logger.error('Maximum three skills allowed')
             return Response({'message': 'Maximum three skills allowed'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Resolve the skill, creating it if it doesn't exist
+        skill_id = skill_vocabulary.get_or_create([skill_name])[skill_name]
+
         # Check if the skill already exists for the user
-        if request.user.programming_skills.filter(name=skill_name).exists():
-            logger.error(f'Skill "{skill_name}" already exists for the user')
+        if request.user.programming_skills.filter(pk=skill_id).exists():
+            logger.error('Skill "%s" already exists for the user', skill_name)
             return Response({'message': f'Skill "{skill_name}" already exists for the user'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if the skill already exists in the database
-        skill = check_object_exists(ProgrammingSkill, name=skill_name)
-        if not skill:
-            # Create the skill if it doesn't exist
-            skill = ProgrammingSkill.objects.create(name=skill_name)
-
         # Add the skill to the user's programming_skills
-        request.user.programming_skills.add(skill)
+        request.user.programming_skills.add(skill_id)
 
-        logger.info(f'Skill "{skill_name}" added successfully')
+        logger.info('Skill "%s" added successfully', skill_name)
         return Response({'message': 'Skill added successfully'}, status=status.HTTP_201_CREATED)
     else:
         logger.error('Method not allowed')
@@ -136,26 +317,72 @@ def remove_skill(request):
             return Response({'message': 'Skill name is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Check if the skill exists
-        skill = check_object_exists(ProgrammingSkill, name=skill_name)
-        if not skill:
-            logger.error(f'Skill "{skill_name}" does not exist')
+        skill_id = skill_vocabulary.ids([skill_name]).get(skill_name)
+        if skill_id is None:
+            logger.error('Skill "%s" does not exist', skill_name)
             return Response({'message': f'Skill "{skill_name}" does not exist'}, status=status.HTTP_404_NOT_FOUND)
 
         # Check if the user has the skill
-        if skill not in request.user.programming_skills.all():
-            logger.error(f'User does not have skill "{skill_name}"')
+        if not request.user.programming_skills.filter(pk=skill_id).exists():
+            logger.error('User does not have skill "%s"', skill_name)
             return Response({'message': f'User does not have skill "{skill_name}"'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Remove the skill from the user's programming_skills
-        request.user.programming_skills.remove(skill)
+        request.user.programming_skills.remove(skill_id)
 
-        logger.info(f'Skill "{skill_name}" removed successfully')
+        logger.info('Skill "%s" removed successfully', skill_name)
         return Response({'message': 'Skill removed successfully'}, status=status.HTTP_200_OK)
     else:
         logger.error('Method not allowed')
         return Response({'message': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+@api_view(['PUT'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def replace_skills(request):
+    skill_names = request.data.get('skills') if isinstance(request.data, dict) else None
+
+    if not isinstance(skill_names, list) or not all(
+            isinstance(name, str) and name for name in skill_names):
+        logger.error('Skills must be a list of skill names')
+        return Response({'message': 'Skills must be a list of skill names'}, status=status.HTTP_400_BAD_REQUEST)
+
+    skill_names = list(dict.fromkeys(skill_names))
+    if len(skill_names) > MAX_PROGRAMMING_SKILLS:
+        logger.error('Maximum three skills allowed')
+        return Response({'message': 'Maximum three skills allowed'}, status=status.HTTP_400_BAD_REQUEST)
+
+    max_length = ProgrammingSkill._meta.get_field('name').max_length
+    if any(len(name) > max_length for name in skill_names):
+        logger.error('Skill name too long')
+        return Response({'message': f'Skill names are at most {max_length} characters long'}, status=status.HTTP_400_BAD_REQUEST)
+
+    through = User.programming_skills.through
+    with transaction.atomic():
+        skill_ids = set(skill_vocabulary.get_or_create(skill_names).values())
+        current_ids = set(through.objects.filter(
+            user_id=request.user.id).values_list('programmingskill_id', flat=True))
+
+        if skill_ids != current_ids:
+            # Set-based writes: the final set is the requested one even if
+            # another request changed the skills in between
+            if current_ids - skill_ids:
+                through.objects.filter(user_id=request.user.id).exclude(
+                    programmingskill_id__in=skill_ids).delete()
+            through.objects.bulk_create(
+                [through(user_id=request.user.id, programmingskill_id=skill_id)
+                 for skill_id in skill_ids - current_ids],
+                ignore_conflicts=True)
+
+            # The through rows bypassed the m2m_changed signals
+            schedule_analytics_refresh([request.user.id])
+            touch_interests([request.user.id])
+
+    logger.info('Skills of user "%s" replaced', request.user.username)
+    return Response({'skills': skill_names}, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 def create_project(request):
     if request.method == 'POST':
@@ -184,38 +411,114 @@ def create_project(request):
 
 @api_view(['GET'])
 def available_projects(request):
+    # The listing version validates both the client's copy (ETag) and the
+    # server-side cache. It is read before the projects, so that a response
+    # is never labelled with a version newer than its data.
+    version = get_cache_version(LISTING_VERSION)
+    etag = request_etag(request, version) if version is not None else None
+    response = not_modified(request, etag)
+    if response is not None:
+        logger.info('Available projects not modified')
+        return response
+
+    cache_enabled = listing_cache.enabled
+    if cache_enabled:
+        cache_key = listing_cache.key(request)
+        cached = listing_cache.get(cache_key, version)
+        if cached is not None:
+            serialized_projects, link_header = cached
+            response = Response(serialized_projects, status=status.HTTP_200_OK)
+            if link_header:
+                response['Link'] = link_header
+            logger.info('Retrieved available projects from cache')
+            return set_validator(response, etag)
+
+    paginator = AvailableProjectsPagination()
     try:
-        # Annotate the queryset to count the number of collaborators
-        available_projects = OpenSourceProject.objects.annotate(
-            num_collaborators=Count('collaborators'))
+        # Filter projects with available seats on the stored collaborator
+        # counter, joining the creator so that the page is a single query
+        available_projects = OpenSourceProject.objects.select_related('creator').filter(
+            current_collaborators__lt=F('maximum_collaborators'))
 
-        # Filter projects with available seats
-        available_projects = available_projects.filter(
-            num_collaborators__lt=F('maximum_collaborators'))
+        # Fetch a single page, keyed on the project id
+        page = paginator.paginate_queryset(available_projects, request)
 
         # Serialize the projects data
         serialized_projects = []
 
-        for project in available_projects:
+        for project in page:
             serialized_projects.append({
                 'id': project.id,
                 'project_name': project.project_name,
                 'description': project.description,
                 'maximum_collaborators': project.maximum_collaborators,
-                'current_collaborators': project.collaborators.count(),
+                'current_collaborators': project.current_collaborators,
                 'creator': project.creator.username,
                 'status': project.status
             })
 
+        if cache_enabled:
+            listing_cache.set(cache_key, version, (serialized_projects, paginator.get_link_header()))
+
         logger.info('Retrieved available projects successfully')
-        return Response(serialized_projects, status=status.HTTP_200_OK)
+        return set_validator(paginator.get_paginated_response(serialized_projects), etag)
+    except NotFound:
+        logger.error('Invalid cursor')
+        return Response({'message': 'Invalid cursor'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
-        logger.error(f'Failed to retrieve available projects: {e}')
+        logger.error('Failed to retrieve available projects: %s', e)
         return Response({'message': 'Failed to retrieve available projects'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+def search_projects(request):
+    if not search_available():
+        logger.error('Project search is not available on this database')
+        return Response({'message': 'Project search is not available'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    match_query = build_match_query(request.query_params.get('q'))
+    if match_query is None:
+        logger.error('Missing search query')
+        return Response({'message': 'Please provide a search query'}, status=status.HTTP_400_BAD_REQUEST)
+
+    projects = OpenSourceProject.objects.select_related('creator')
+
+    # Same filters as available_projects, on demand
+    if request.query_params.get('available', '').lower() in ('1', 'true', 'yes'):
+        projects = projects.filter(
+            current_collaborators__lt=F('maximum_collaborators'))
+    status_filter = request.query_params.get('status')
+    if status_filter is not None:
+        if status_filter not in dict(OpenSourceProject.STATUS_CHOICES):
+            logger.error('Invalid status filter')
+            return Response({'message': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        projects = projects.filter(status=status_filter)
+
+    paginator = ProjectSearchPagination()
+    try:
+        page = paginator.paginate_queryset(ranked_projects(match_query, projects), request)
+
+        serialized_projects = []
+        for project in page:
+            serialized_projects.append({
+                'id': project.id,
+                'project_name': project.project_name,
+                'description': project.description,
+                'maximum_collaborators': project.maximum_collaborators,
+                'current_collaborators': project.current_collaborators,
+                'creator': project.creator.username,
+                'status': project.status
+            })
+
+        logger.info('Searched projects successfully')
+        return paginator.get_paginated_response(serialized_projects)
+    except Exception as e:
+        logger.error('Failed to search projects: %s', e)
+        return Response({'message': 'Failed to search projects'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def express_interest(request, project_id):
     try:
@@ -238,37 +541,43 @@ def express_interest(request, project_id):
         logger.info('User expressed interest in the project successfully')
         return Response({'message': 'User expressed interest in the project successfully'},
                         status=status.HTTP_201_CREATED)
+    except IntegrityError:
+        # A concurrent request created the same interest between the check
+        # and the insert; the unique constraint on (project, user) caught it
+        logger.warning('User has already expressed interest in this project')
+        return Response({'message': 'User has already expressed interest in this project'},
+                        status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        logger.error(f'Failed to express interest in the project: {e}')
+        logger.error('Failed to express interest in the project: %s', e)
         return Response({'message': 'Failed to express interest in the project'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def close_project(request, project_id):
     # Check if the project exists
     project = check_object_exists(OpenSourceProject, pk=project_id)
     if not project:
-        logger.error(f"Project with ID {project_id} does not exist")
+        logger.error("Project with ID %s does not exist", project_id)
         return Response({'message': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
 
     # Check if the authenticated user is the creator of the project
-    if request.user != project.creator:
-        logger.error(
-            f"User {request.user.username} is not authorized to close project {project_id}")
+    if project.creator_id != request.user.id:
+        logger.error("User %s is not authorized to close project %s",
+                     request.user.username, project_id)
         return Response({'message': 'Only the creator of the project can close it'}, status=status.HTTP_403_FORBIDDEN)
 
     # Update the project status to 'closed'
     project.status = 'closed'
-    project.save()
+    project.save(update_fields=['status', 'updated_at'])
 
-    logger.info(f"Project {project_id} closed by user {request.user.username}")
+    logger.info("Project %s closed by user %s", project_id, request.user.username)
     return Response({'message': 'Project closed successfully'}, status=status.HTTP_200_OK)
 
 
 @api_view(['DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def delete_project(request, pk):
     try:
@@ -287,12 +596,12 @@ def delete_project(request, pk):
             logger.warning('User is not authorized to delete this project')
             return Response({'message': 'You are not authorized to delete this project'}, status=status.HTTP_403_FORBIDDEN)
     except Exception as e:
-        logger.error(f'Failed to delete the project: {e}')
+        logger.error('Failed to delete the project: %s', e)
         return Response({'message': 'Failed to delete the project'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def project_interests(request, project_id):
     try:
@@ -302,29 +611,57 @@ def project_interests(request, project_id):
         return Response({'message': 'Project does not exist'}, status=status.HTTP_404_NOT_FOUND)
 
     # Check if the current user is the creator of the project
-    if request.user != project.creator:
+    if request.user.id != project.creator_id:
         logger.warning(
             'User is not authorized to see interests for this project')
         return Response({'message': 'You are not authorized to see interests for this project'}, status=status.HTTP_403_FORBIDDEN)
 
     interests = ExpressionOfInterest.objects.filter(project=project)
-    serializer = ExpressionOfInterestSerializer(interests, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+
+    # Optionally filter by status
+    interest_status = request.query_params.get('status')
+    if interest_status:
+        if interest_status not in dict(ExpressionOfInterest.STATUS_CHOICES):
+            logger.error('Invalid status filter: %s', interest_status)
+            return Response({'message': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        interests = interests.filter(status=interest_status)
+
+    # Count and latest change of the matching interests validate the page
+    etag = interests_etag(request, interests)
+    response = not_modified(request, etag)
+    if response is not None:
+        logger.info('Project interests not modified')
+        return response
+
+    # Load the applicants with the page and their skills in one query, so a
+    # page costs the same number of queries however many applicants it holds
+    interests = interests.select_related('user')
+
+    paginator = ProjectInterestsPagination()
+    try:
+        page = paginator.paginate_queryset(interests, request)
+    except NotFound:
+        logger.error('Invalid cursor')
+        return Response({'message': 'Invalid cursor'}, status=status.HTTP_404_NOT_FOUND)
+
+    skill_names = user_skill_names({interest.user_id for interest in page})
+    serializer = ExpressionOfInterestSerializer(page, many=True, context={'skill_names': skill_names})
+    return set_validator(paginator.get_paginated_response(serializer.data), etag, private=True)
 
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def accept_or_reject_interest(request, project_id, eoi_id):
     try:
-        eoi = ExpressionOfInterest.objects.get(
+        eoi = ExpressionOfInterest.objects.select_related('project').get(
             id=eoi_id, project_id=project_id)
     except ExpressionOfInterest.DoesNotExist:
         logger.error('Expression of interest not found')
         return Response({'message': 'Expression of interest not found'}, status=status.HTTP_404_NOT_FOUND)
 
     # Check if the authenticated user is the creator of the project
-    if request.user != eoi.project.creator:
+    if request.user.id != eoi.project.creator_id:
         logger.warning(
             'Only the creator of the project can accept or reject interests')
         return Response({'message': 'Only the creator of the project can accept or reject interests'}, status=status.HTTP_403_FORBIDDEN)
@@ -341,67 +678,364 @@ def accept_or_reject_interest(request, project_id, eoi_id):
         return Response({'message': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
 
     if action == 'accept':
-        # Check if the project has available capacity
-        if eoi.project.current_collaborators >= eoi.project.maximum_collaborators:
-            logger.warning('Project is already full')
-            return Response({'message': 'Project is already full'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Update the status of the expression of interest to "accepted"
-        eoi.status = 'accepted'
-        eoi.save()
-
-        # Add the user to the project collaborators
-        eoi.project.collaborators.add(eoi.user)
-
-        # Increase the current collaborators count
-        eoi.project.current_collaborators += 1
-        eoi.project.save()
-
-        # Update the project status to "active" if it's the first user signing up
-        if eoi.project.current_collaborators == 1:
-            eoi.project.status = 'active'
-            eoi.project.save()
+        with transaction.atomic():
+            # Claim the expression of interest with a conditional update, so
+            # that two concurrent accepts of the same interest cannot both win
+            now = timezone.now()
+            claimed = ExpressionOfInterest.objects.filter(pk=eoi.pk).exclude(
+                status='accepted').update(status='accepted', updated_at=now)
+            if not claimed:
+                logger.warning('User is already accepted for this project')
+                return Response({'message': 'User is already accepted for this project'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Take a seat with a single conditional UPDATE. The capacity check
+            # and the increment happen in the database, so concurrent accepts
+            # can never overbook the project. The project becomes "active"
+            # when its first collaborator signs up.
+            seated = OpenSourceProject.objects.filter(
+                pk=project_id, current_collaborators__lt=F('maximum_collaborators')
+            ).update(
+                current_collaborators=F('current_collaborators') + 1,
+                updated_at=now,
+                status=Case(
+                    When(current_collaborators=0, then=Value('active')),
+                    default=F('status')
+                )
+            )
+            if not seated:
+                transaction.set_rollback(True)
+                logger.warning('Project is already full')
+                return Response({'message': 'Project is already full'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Add the user to the project collaborators
+            eoi.project.collaborators.add(eoi.user_id)
+
+        # The seat counter was updated in SQL, bypassing the model signals
+        project_index.update_project(project_id)
 
         logger.info('Interest accepted successfully')
         return Response({'message': 'Interest accepted successfully'}, status=status.HTTP_200_OK)
     else:
-        # Update the status of the expression of interest to "rejected"
-        eoi.status = 'rejected'
-        eoi.save()
+        with transaction.atomic():
+            # Update the status of the expression of interest to "rejected"
+            eoi.status = 'rejected'
+            eoi.save(update_fields=['status', 'updated_at'])
+
+            # Remove the user from the project collaborators and give the
+            # seat back if they were holding one. Only the request whose
+            # delete removed the row gives it back, so concurrent rejects
+            # cannot release the same seat twice.
+            removed, _ = OpenSourceProject.collaborators.through.objects.filter(
+                opensourceproject_id=project_id, user_id=eoi.user_id).delete()
+            if removed:
+                OpenSourceProject.objects.filter(
+                    pk=project_id, current_collaborators__gt=0
+                ).update(current_collaborators=F('current_collaborators') - 1,
+                         updated_at=timezone.now())
+                # The collaborator row bypassed the m2m_changed signals
+                schedule_analytics_refresh([eoi.user_id])
+                project_index.update_project(project_id)
 
-        # Remove the user from the project collaborators
-        eoi.project.collaborators.remove(eoi.user)
+        logger.info('Interest rejected successfully')
+        return Response({'message': 'Interest rejected successfully'}, status=status.HTTP_200_OK)
 
-        # Decrease the current collaborators count
 
-        eoi.project.save()
+def _interest_decisions(rows, results):
+    """
+    Validate the items of a bulk accept/reject request.
+
+    Invalid items and repeated ``eoi_id`` values get an error in
+    ``results``.
+
+    Returns:
+        A dict mapping each remaining ``eoi_id`` to ``(index, action)``, in
+        request order.
+    """
+    decisions = {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results[index] = {'index': index, 'status': 'error', 'error': 'Expected an object'}
+            continue
+        eoi_id = row.get('eoi_id')
+        action = row.get('action')
+        if not isinstance(eoi_id, int) or isinstance(eoi_id, bool):
+            results[index] = {'index': index, 'eoi_id': eoi_id, 'status': 'error',
+                              'error': 'eoi_id must be an integer'}
+        elif action not in ('accept', 'reject'):
+            results[index] = {'index': index, 'eoi_id': eoi_id, 'status': 'error',
+                              'error': 'Invalid action'}
+        elif eoi_id in decisions:
+            results[index] = {'index': index, 'eoi_id': eoi_id, 'status': 'error',
+                              'error': 'Expression of interest appears more than once'}
+        else:
+            decisions[eoi_id] = (index, action)
+    return decisions
 
-        logger.info('Interest rejected successfully')
-        return Response({'message': 'Interest rejected successfully'}, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_accept_or_reject_interests(request, project_id):
+    rows = request.data
+    if not isinstance(rows, list):
+        logger.error('Expected a list of decisions')
+        return Response({'message': 'Expected a list of decisions'}, status=status.HTTP_400_BAD_REQUEST)
+
+    max_items = getattr(settings, 'BULK_INTEREST_MAX_ITEMS', 1000)
+    if len(rows) > max_items:
+        logger.error('Too many decisions in one request: %s', len(rows))
+        return Response({'message': f'At most {max_items} interests can be processed at once'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    results = [None] * len(rows)
+    decisions = _interest_decisions(rows, results)
+
+    with transaction.atomic():
+        # Lock the project row for the whole batch, so concurrent triage of
+        # the same project is serialized where the database supports it.
+        # A NO KEY UPDATE lock (PostgreSQL) still lets interests referencing
+        # the project be inserted meanwhile.
+        try:
+            project = OpenSourceProject.objects.select_for_update(
+                no_key=connection.features.has_select_for_no_key_update).only(
+                'creator_id', 'current_collaborators', 'maximum_collaborators').get(pk=project_id)
+        except OpenSourceProject.DoesNotExist:
+            logger.error('Project does not exist')
+            return Response({'message': 'Project does not exist'}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.user.id != project.creator_id:
+            logger.warning(
+                'Only the creator of the project can accept or reject interests')
+            return Response({'message': 'Only the creator of the project can accept or reject interests'}, status=status.HTTP_403_FORBIDDEN)
+
+        # Interests a concurrent accept or reject is updating are skipped
+        # rather than waited for, where the database supports it: that
+        # request locks the interest before the project, this one the other
+        # way round, and waiting would deadlock
+        skip_locked = connection.features.has_select_for_update_skip_locked
+        interests = ExpressionOfInterest.objects.select_for_update(skip_locked=skip_locked).filter(
+            project_id=project_id, id__in=list(decisions)).only('id', 'user_id', 'status').in_bulk()
+        busy = set()
+        if skip_locked and len(interests) < len(decisions):
+            busy = set(ExpressionOfInterest.objects.filter(
+                project_id=project_id, id__in=decisions.keys() - interests.keys()
+            ).values_list('id', flat=True))
+
+        accepted, rejected = [], []
+        for eoi_id, (index, action) in decisions.items():
+            eoi = interests.get(eoi_id)
+            if eoi_id in busy:
+                results[index] = {'index': index, 'eoi_id': eoi_id, 'status': 'error',
+                                  'error': 'Expression of interest is being updated, please retry'}
+            elif eoi is None:
+                results[index] = {'index': index, 'eoi_id': eoi_id, 'status': 'error',
+                                  'error': 'Expression of interest not found'}
+            elif eoi.status == 'accepted':
+                results[index] = {'index': index, 'eoi_id': eoi_id, 'status': 'error',
+                                  'error': 'User is already accepted for this project'}
+            elif action == 'accept':
+                accepted.append((index, eoi))
+            else:
+                rejected.append((index, eoi))
+
+        # Rejected users holding a seat give it back, like the single endpoint
+        through = OpenSourceProject.collaborators.through
+        leaving = set(through.objects.filter(
+            opensourceproject_id=project_id,
+            user_id__in=[eoi.user_id for _, eoi in rejected]
+        ).values_list('user_id', flat=True)) if rejected else set()
+
+        # Capacity is checked once for the batch: accepts beyond the free
+        # seats fail, in request order
+        free_seats = project.maximum_collaborators - project.current_collaborators + len(leaving)
+        for index, eoi in accepted[max(free_seats, 0):]:
+            results[index] = {'index': index, 'eoi_id': eoi.id, 'status': 'error',
+                              'error': 'Project is already full'}
+        accepted = accepted[:max(free_seats, 0)]
+
+        now = timezone.now()
+        changed = []
+        for new_status, items in (('accepted', accepted), ('rejected', rejected)):
+            for index, eoi in items:
+                eoi.status = new_status
+                eoi.updated_at = now
+                changed.append(eoi)
+                results[index] = {'index': index, 'eoi_id': eoi.id, 'user_id': eoi.user_id,
+                                  'status': new_status}
+        ExpressionOfInterest.objects.bulk_update(changed, ['status', 'updated_at'])
+
+        seats = len(accepted) - len(leaving)
+        if seats:
+            # Guarded like the single endpoint, for databases without row locks
+            seated = OpenSourceProject.objects.filter(
+                pk=project_id,
+                current_collaborators__lte=F('maximum_collaborators') - seats,
+                current_collaborators__gte=-seats
+            ).update(
+                current_collaborators=F('current_collaborators') + seats,
+                updated_at=now,
+                status=Case(
+                    When(current_collaborators=0, then=Value('active')),
+                    default=F('status')
+                )
+            )
+            if not seated:
+                transaction.set_rollback(True)
+                logger.warning('Project changed during bulk triage')
+                return Response({'message': 'Project changed, please retry'}, status=status.HTTP_409_CONFLICT)
+
+        if leaving:
+            through.objects.filter(opensourceproject_id=project_id, user_id__in=leaving).delete()
+        through.objects.bulk_create(
+            [through(opensourceproject_id=project_id, user_id=eoi.user_id) for _, eoi in accepted],
+            ignore_conflicts=True)
+
+        # The collaborator rows bypassed the m2m_changed signals
+        schedule_analytics_refresh([eoi.user_id for _, eoi in accepted] + list(leaving))
+
+    if seats:
+        project_index.update_project(project_id)
+
+    processed = len(accepted) + len(rejected)
+    logger.info('Bulk triage accepted %s and rejected %s of %s interests', len(accepted), len(rejected), len(rows))
+    if processed == len(rows):
+        response_status = status.HTTP_200_OK
+    elif processed:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response({'accepted': len(accepted), 'rejected': len(rejected), 'results': results},
+                    status=response_status)
 
 
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_user_analytics(request, user_id):
+    # Users can see their own analytics, admins can see everyone's
+    if user_id != request.user.id and not request.user.is_staff:
+        logger.warning('User is not authorized to see analytics of another user')
+        return Response({'message': 'You are not authorized to see analytics of this user'}, status=status.HTTP_403_FORBIDDEN)
+
     try:
-        user = request.user
-        user_projects = user.created_projects.all()
-        user_interests = ExpressionOfInterest.objects.filter(user=user)
-        user_skills = user.programming_skills.all()
+        # A single primary key lookup on the precomputed summary
+        summary = get_user_analytics_summary(user_id)
+        if summary is None:
+            logger.error('User does not exist')
+            return Response({'message': 'User does not exist'}, status=status.HTTP_404_NOT_FOUND)
+
+        # The summary is refreshed on every change it reflects
+        etag = request_etag(request, summary.updated_at.isoformat())
+        response = not_modified(request, etag)
+        if response is not None:
+            logger.info('User analytics not modified')
+            return response
+        serialized_data = serialize_user_analytics(summary)
+
+        logger.info('User analytics retrieved successfully')
+        return set_validator(Response(serialized_data, status=status.HTTP_200_OK), etag, private=True)
+    except Exception as e:
+        logger.error('Error retrieving user analytics: %s', e)
+        return Response({'message': 'Internal server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def get_users_analytics(request):
+    user_ids = request.data.get('user_ids')
+    if not isinstance(user_ids, list) or not all(
+            isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids):
+        logger.error('user_ids must be a list of user ids')
+        return Response({'message': 'user_ids must be a list of user ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+    max_users = getattr(settings, 'ANALYTICS_BATCH_MAX_USERS', 1000)
+    if len(user_ids) > max_users:
+        logger.error('Too many users in one analytics request: %s', len(user_ids))
+        return Response({'message': f'At most {max_users} users can be requested at once'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    # Users can see their own analytics, admins can see everyone's
+    if not request.user.is_staff and set(user_ids) - {request.user.id}:
+        logger.warning('User is not authorized to see analytics of other users')
+        return Response({'message': 'You are not authorized to see analytics of these users'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        summaries = get_users_analytics_summaries(user_ids)
         serialized_data = {
-            'user_projects_as_creator': user_projects.count(),
-            'projects_name': list(user_projects.values_list('project_name', flat=True)),
-            'user_collaborations': user.projects_contributed.count(),
-            'collaborations_name': list(user.projects_contributed.values_list('project_name', flat=True)),
-            'user_interests': user_interests.count(),
-            'interests_project_name': list(user_interests.values_list('project__project_name', flat=True)),
-            'user_skills': list(user_skills.values_list('name', flat=True))
+            'results': {
+                str(user_id): serialize_user_analytics(summary)
+                for user_id, summary in summaries.items()
+            },
+            'not_found': [user_id for user_id in dict.fromkeys(user_ids) if user_id not in summaries],
         }
 
-        logger.info('User analytics retrieved successfully')
+        logger.info('Analytics of %s users retrieved successfully', len(summaries))
         return Response(serialized_data, status=status.HTTP_200_OK)
     except Exception as e:
-        logger.error(f'Error retrieving user analytics: {str(e)}')
+        logger.error('Error retrieving users analytics: %s', e)
         return Response({'message': 'Internal server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAdminUser])
+def export_resource(request, resource):
+    if resource not in EXPORT_RESOURCES:
+        logger.error('Unknown export resource: %s', resource)
+        return Response({'message': 'Unknown export resource'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        since = parse_since(request.query_params.get('since'))
+        rows = export_rows(resource, since)
+    except ValueError as e:
+        logger.error('Invalid export request: %s', e)
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Rows are streamed straight from the database cursor, so the response
+    # never holds more than one chunk in memory
+    logger.info('Streaming %s export', resource)
+    return StreamingHttpResponse(to_ndjson(rows), content_type='application/x-ndjson')
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    return Response({
+        'token_cache': token_cache.stats(),
+        'response_cache': {listing_cache.name: listing_cache.stats()},
+        'skill_vocabulary': skill_vocabulary.stats(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def recommended_projects(request):
+    try:
+        limit = int(request.query_params.get('limit', 20))
+    except ValueError:
+        logger.error('Invalid limit')
+        return Response({'message': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(0, min(limit, getattr(settings, 'API_MAX_PAGE_SIZE', 500)))
+
+    try:
+        serialized_projects = []
+        for project, matched_skills in recommend_projects(request.user, limit):
+            serialized_projects.append({
+                'id': project.id,
+                'project_name': project.project_name,
+                'description': project.description,
+                'maximum_collaborators': project.maximum_collaborators,
+                'current_collaborators': project.current_collaborators,
+                'creator': project.creator.username,
+                'status': project.status,
+                'matched_skills': matched_skills
+            })
+
+        logger.info('Retrieved recommended projects successfully')
+        return Response(serialized_projects, status=status.HTTP_200_OK)
+    except Exception as e:
+        logger.error('Failed to retrieve recommended projects: %s', e)
+        return Response({'message': 'Failed to retrieve recommended projects'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,196 @@
+"""
+Benchmark the async read path under uvicorn against the sync views under
+gunicorn.
+
+Seeds a throw-away SQLite database, starts each server on it and drives
+the same concurrency against:
+
+- gunicorn (WSGI, threaded workers) serving the sync DRF views,
+- uvicorn (ASGI) serving the async views under ``/api/async/``,
+- uvicorn serving the sync views, i.e. the thread hop ASGI adds to them.
+
+Reports requests per second and latency percentiles per endpoint. Needs
+``uvicorn`` and ``gunicorn`` installed.
+
+    python -m benchmarks.asgi_vs_wsgi --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import PROJECT_DIR, percentile, print_table
+
+SETTINGS = 'benchmarks.server_settings'
+
+
+def seed(projects, interests):
+    from rest_framework.authtoken.models import Token
+
+    from api.analytics import refresh_user_analytics
+    from api.models import ExpressionOfInterest, OpenSourceProject, ProgrammingSkill, User
+
+    skills = ProgrammingSkill.objects.bulk_create(
+        ProgrammingSkill(name=f'Skill {i}') for i in range(10))
+    creator = User.objects.create(username='bench_creator', password='!')
+    applicants = User.objects.bulk_create(
+        User(username=f'bench_user_{i}', email=f'user{i}@example.com', password='!')
+        for i in range(interests))
+    through = User.programming_skills.through
+    through.objects.bulk_create(
+        through(user_id=user.id, programmingskill_id=skills[i % len(skills)].id)
+        for i, user in enumerate(applicants))
+    OpenSourceProject.objects.bulk_create(
+        (OpenSourceProject(
+            project_name=f'Project {i}',
+            description=f'Description for project {i}',
+            maximum_collaborators=3,
+            current_collaborators=i % 4,
+            creator=creator,
+        ) for i in range(projects)),
+        batch_size=1000)
+    project = OpenSourceProject.objects.order_by('id').first()
+    ExpressionOfInterest.objects.bulk_create(
+        ExpressionOfInterest(user=user, project=project) for user in applicants)
+    refresh_user_analytics([creator.id])
+    token = Token.objects.create(user=creator)
+    return {
+        'available_projects': 'available_projects/',
+        'project_interests': f'projects/{project.id}/interests/',
+        'get_user_analytics': f'get_user_analytics/{creator.id}/',
+    }, token.key
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server did not listen on port {port}')
+
+
+async def _client(port, path, token, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = (f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+               f'Authorization: Token {token}\r\n\r\n').encode()
+    try:
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status_line = await reader.readline()
+            length = 0
+            chunked = False
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode().partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+                elif name.lower() == 'transfer-encoding' and 'chunked' in value:
+                    chunked = True
+            if chunked:
+                while True:
+                    size = int((await reader.readline()).strip(), 16)
+                    await reader.readexactly(size + 2)
+                    if not size:
+                        break
+            else:
+                await reader.readexactly(length)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if b' 200 ' not in status_line:
+                errors.append(status_line)
+    finally:
+        writer.close()
+
+
+async def load(port, path, token, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        _client(port, path, token, deadline, latencies, errors)
+        for _ in range(concurrency)))
+    return latencies, errors
+
+
+def server_command(kind, port, workers, threads):
+    if kind == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', 'project_contributors.wsgi:application',
+                '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+                '--threads', str(threads), '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'project_contributors.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+            '--log-level', 'warning', '--no-access-log']
+
+
+def run(args):
+    os.environ['DJANGO_SETTINGS_MODULE'] = SETTINGS
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['BENCHMARK_DATABASE'] = str(Path(tmp) / 'benchmark.sqlite3')
+        if str(PROJECT_DIR) not in sys.path:
+            sys.path.insert(0, str(PROJECT_DIR))
+        import django
+        from django.core.management import call_command
+        django.setup()
+        call_command('migrate', verbosity=0)
+        endpoints, token = seed(args.projects, args.interests)
+
+        setups = [('gunicorn', '/api/'), ('uvicorn', '/api/async/'), ('uvicorn', '/api/')]
+        rows = []
+        for kind, prefix in setups:
+            port = free_port()
+            process = subprocess.Popen(
+                server_command(kind, port, args.workers, args.threads),
+                cwd=PROJECT_DIR, env=os.environ.copy())
+            try:
+                wait_for_port(port, process)
+                for name, path in endpoints.items():
+                    url = prefix + path
+                    # Warm up connections, caches and the token cache
+                    asyncio.run(load(port, url, token, args.concurrency, 1))
+                    latencies, errors = asyncio.run(
+                        load(port, url, token, args.concurrency, args.duration))
+                    latencies.sort()
+                    label = f"{kind} {'async' if 'async' in prefix else 'sync'}"
+                    rows.append((name, label, f'{len(latencies) / args.duration:.0f}',
+                                 f'{percentile(latencies, 50):.1f}',
+                                 f'{percentile(latencies, 99):.1f}', len(errors)))
+            finally:
+                process.terminate()
+                process.wait()
+
+    print(f'concurrency {args.concurrency}, {args.workers} worker(s), '
+          f'{args.threads} gunicorn thread(s) per worker')
+    print_table(('endpoint', 'server', 'req/s', 'p50 ms', 'p99 ms', 'errors'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--projects', type=int, default=10000)
+    parser.add_argument('--interests', type=int, default=200)
+    args = parser.parse_args()
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark the available_projects listing as the projects table grows.
+
+Reports the number of SQL queries and the latency of fetching the first
+page for each table size, with the response cache disabled and on cache
+hits. The query count must stay flat.
+
+    python -m benchmarks.available_projects --sizes 100 1000 10000
+"""
+import argparse
+
+from benchmarks.common import count_queries, measure, print_table, setup_django, test_database
+
+
+def seed_projects(count, collaborators_per_project=2):
+    from api.models import OpenSourceProject, User
+
+    users = User.objects.bulk_create(
+        User(username=f'bench_user_{i}', password='!')
+        for i in range(max(collaborators_per_project + 1, 10)))
+    OpenSourceProject.objects.bulk_create(
+        (OpenSourceProject(
+            project_name=f'Project {i}',
+            description=f'Description for project {i}',
+            maximum_collaborators=collaborators_per_project + 1 + i % 3,
+            creator=users[i % len(users)],
+        ) for i in range(count)),
+        batch_size=1000)
+
+    through = OpenSourceProject.collaborators.through
+    through.objects.bulk_create(
+        (through(opensourceproject_id=project_id, user_id=users[j].id)
+         for project_id in OpenSourceProject.objects.values_list('id', flat=True)
+         for j in range(collaborators_per_project)),
+        batch_size=1000)
+
+
+def run(sizes, repeat):
+    from django.db import connection
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    rows = []
+    for size in sizes:
+        with test_database():
+            seed_projects(size)
+            with override_settings(RESPONSE_CACHE={'TIMEOUT': 0}):
+                with count_queries(connection) as queries:
+                    response = client.get('/api/available_projects/')
+                assert response.status_code == 200, response.status_code
+                stats = measure(lambda: client.get('/api/available_projects/'),
+                                repeat=repeat)
+            client.get('/api/available_projects/')
+            with count_queries(connection) as cached_queries:
+                client.get('/api/available_projects/')
+            cached_stats = measure(lambda: client.get('/api/available_projects/'),
+                                   repeat=repeat)
+            rows.append((size, queries['queries'], len(response.data),
+                         f"{stats['p50_ms']:.2f}", f"{stats['p99_ms']:.2f}",
+                         cached_queries['queries'], f"{cached_stats['p50_ms']:.2f}",
+                         f"{cached_stats['p99_ms']:.2f}"))
+
+    print_table(('projects', 'queries', 'page rows', 'p50 ms', 'p99 ms',
+                 'hit queries', 'hit p50 ms', 'hit p99 ms'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
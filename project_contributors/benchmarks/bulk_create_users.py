@@ -0,0 +1,68 @@
+"""
+Compare registering users one by one through create_user with a single
+bulk_create_users request.
+
+    python -m benchmarks.bulk_create_users --users 200
+"""
+import argparse
+import time
+
+from benchmarks.common import print_table, setup_django, test_database
+
+
+def user_rows(prefix, count):
+    return [
+        {'username': f'{prefix}{i}', 'password': f'secret-{i}',
+         'email': f'{prefix}{i}@example.com'}
+        for i in range(count)
+    ]
+
+
+def run(count, workers_counts):
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    from api.models import User
+
+    rows = []
+    with test_database():
+        client = APIClient()
+
+        start = time.perf_counter()
+        for row in user_rows('loop', count):
+            response = client.post('/api/create_user/', row, format='json')
+            assert response.status_code == 201, response.data
+        elapsed = time.perf_counter() - start
+        rows.append(('create_user loop', 1, count, f'{elapsed:.2f}', f'{count / elapsed:.0f}'))
+
+        admin = User.objects.create_user(
+            username='bench_admin', password='password', is_staff=True)
+        client.force_authenticate(user=admin)
+        for workers in workers_counts:
+            # One worker hashes inline
+            config = {'KIND': 'thread', 'WORKERS': workers} if workers > 1 else {'KIND': None}
+            with override_settings(PASSWORD_HASHING_EXECUTOR=config):
+                start = time.perf_counter()
+                response = client.post('/api/bulk_create_users/',
+                                       user_rows(f'bulk{workers}_', count), format='json')
+                elapsed = time.perf_counter() - start
+            assert response.data['created'] == count, response.data
+            rows.append(('bulk_create_users', workers, count,
+                         f'{elapsed:.2f}', f'{count / elapsed:.0f}'))
+
+    print_table(('method', 'hashing threads', 'users', 'seconds', 'users/s'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4],
+                        help='Hashing threads of each bulk_create_users run')
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.users, args.workers)
+
+
+if __name__ == '__main__':
+    main()
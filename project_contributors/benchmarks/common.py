@@ -0,0 +1,124 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The scripts are run from the ``project_contributors`` directory, e.g.::
+
+    python -m benchmarks.available_projects
+
+Each script works against a throw-away test database so the development
+``db.sqlite3`` is never touched.
+"""
+import logging
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    """
+    Configure Django for a standalone benchmark script.
+    """
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                          'project_contributors.settings')
+
+    import django
+    django.setup()
+
+    # The development LOGGING config echoes every SQL statement, which
+    # would dominate the timings.
+    logging.getLogger('django.db.backends').setLevel(logging.INFO)
+
+
+@contextmanager
+def test_database(verbosity=0, name=None):
+    """
+    Create a fresh test database for the duration of the block.
+
+    SQLite test databases live in memory unless ``name`` gives a file,
+    which concurrent connections need.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict['NAME']
+    old_test_name = connection.settings_dict['TEST']['NAME']
+    if name is not None:
+        connection.settings_dict['TEST']['NAME'] = name
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        connection.settings_dict['TEST']['NAME'] = old_test_name
+        teardown_test_environment()
+
+
+@contextmanager
+def count_queries(connection):
+    """
+    Count the SQL statements executed on ``connection`` inside the block.
+
+    Unlike ``CaptureQueriesContext`` this is not affected by the query log
+    being reset at the start of every request.
+    """
+    counter = {'queries': 0}
+
+    def wrapper(execute, sql, params, many, context):
+        counter['queries'] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+def measure(func, repeat=20):
+    """
+    Call ``func`` ``repeat`` times and return latency statistics in ms.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def summarize(timings):
+    """
+    Latency statistics of a list of durations in ms.
+    """
+    timings = sorted(timings)
+    return {
+        'mean_ms': statistics.fmean(timings),
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+        'p99_ms': percentile(timings, 99),
+    }
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1,
+                       round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column)
+              for column in zip(headers, *rows)]
+    line = '  '.join(f'{{:>{width}}}' for width in widths)
+    print(line.format(*headers))
+    for row in rows:
+        print(line.format(*row))
@@ -0,0 +1,442 @@
+"""
+Benchmark every endpoint of the API against a seeded database, with
+regression baselines.
+
+The database is filled by ``api.seeding.seed_database`` at a named scale
+(``--scale``, see ``api.seeding.SCALES``) or at explicit row counts. Every
+route of api/urls.py, plus ``api/token/``, is then driven through the test
+client, authenticated with tokens like a real client. Requests that change
+data get fresh rows before each call, outside the timings.
+
+For every endpoint the report shows the throughput of back to back
+requests, the p50/p95/p99 latency, the SQL queries per request and the
+peak memory allocated while handling one request (traced separately, as
+tracemalloc slows everything down). ``available_projects`` is measured
+with the response cache off, and on cache hits as
+``available_projects (cached)``.
+
+``--save`` writes the results as a JSON baseline. ``--compare`` checks a
+run against one and exits with status 1 when an endpoint regressed: its
+p50 or p95 latency or its peak memory grew by more than ``--threshold``
+(and by more than ``--min-delta-ms`` / ``--min-delta-kib``, which keeps
+sub-millisecond endpoints from failing on noise), or it runs more queries.
+Latencies are only comparable between runs on the same machine.
+
+    python -m benchmarks.endpoints --scale small --save benchmarks/baselines/small.json
+    python -m benchmarks.endpoints --scale small --compare benchmarks/baselines/small.json
+    python -m benchmarks.endpoints --users 200 --projects 500 --only available_projects
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.common import count_queries, print_table, setup_django, summarize, test_database
+
+# Calls of the endpoints hashing a password (~0.4 s each with the default
+# hasher) are capped to this many per run
+HASHING_REPEAT = 5
+# Requests traced for the peak memory of every endpoint
+MEMORY_REPEAT = 3
+
+
+class Scenario:
+    """
+    One endpoint call.
+
+    ``prepare(i)`` runs before the ``i``-th call, outside the timings, and
+    returns the path (and optionally the body) of the request.
+    ``cleanup(i)`` undoes what the call changed when it must not pile up.
+    """
+
+    def __init__(self, name, method, prepare, token=None, expected=200,
+                 max_repeat=None, cleanup=None, settings=None):
+        self.name = name
+        self.method = method
+        self.prepare = prepare
+        self.token = token
+        self.expected = expected
+        self.max_repeat = max_repeat
+        self.cleanup = cleanup
+        self.settings = settings or {}
+        self.calls = 0
+
+    def call(self, client):
+        """
+        Make the request, reading streamed bodies to the end.
+
+        Returns:
+            ``(response, seconds, queries)``, the preparation not included.
+        """
+        from django.db import connection
+
+        index = self.calls
+        self.calls += 1
+        request = self.prepare(index)
+        path, data = request if isinstance(request, tuple) else (request, None)
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.token}'} if self.token else {}
+
+        with count_queries(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(client, self.method)(path, data, format='json', **headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+
+        if response.status_code != self.expected:
+            raise AssertionError(f'{self.name} {path} returned {response.status_code}, '
+                                 f'expected {self.expected}: {response.content[:500]!r}')
+        if self.cleanup is not None:
+            self.cleanup(index)
+        return response, elapsed, queries['queries']
+
+
+def build_scenarios(fixture):
+    """
+    The scenarios of every endpoint, for the rows created by ``fixture``.
+    """
+    from django.db.models import Count
+
+    from api.models import ExpressionOfInterest, OpenSourceProject, ProgrammingSkill, User
+    from api.seeding import SEED_PASSWORD
+
+    admin, member, owner = fixture['admin'], fixture['member'], fixture['owner']
+    tokens = fixture['tokens']
+    skills = list(ProgrammingSkill.objects.order_by('id').values_list('name', flat=True)[:6])
+    applicants = list(User.objects.filter(username__startswith='seed_user_')
+                      .exclude(pk__in=[member.pk, owner.pk]).order_by('id')
+                      .values_list('id', flat=True)[:50])
+    # The project with the most interests, as seen by its creator
+    busiest = (OpenSourceProject.objects.annotate(interest_count=Count('expressionofinterest'))
+               .order_by('-interest_count', 'id').first())
+    creator_token = fixture['token_for'](busiest.creator)
+    target = (OpenSourceProject.objects.exclude(creator=member)
+              .exclude(expressionofinterest__user=member).order_by('id').first())
+    last_id = OpenSourceProject.objects.order_by('-id').values_list('id', flat=True).first()
+
+    def new_project(index, seats=2, **fields):
+        return OpenSourceProject.objects.create(
+            project_name=f'Bench project {index} {time.monotonic_ns()}',
+            description='Created by the endpoint benchmark',
+            maximum_collaborators=seats, creator=owner, **fields)
+
+    def add_skill_cleanup(index):
+        owner.programming_skills.clear()
+
+    def remove_skill_prepare(index):
+        owner.programming_skills.add(ProgrammingSkill.objects.get(name=skills[0]))
+        return '/api/remove_skill/', {'skill_name': skills[0]}
+
+    def close_project_prepare(index):
+        project = new_project(index, status='active')
+        return f'/api/projects/close/{project.id}/'
+
+    def delete_project_prepare(index):
+        return f'/api/projects/{new_project(index).id}/delete/'
+
+    def accept_prepare(index):
+        project = new_project(index)
+        eoi = ExpressionOfInterest.objects.create(
+            project=project, user_id=applicants[index % len(applicants)])
+        return (f'/api/projects/{project.id}/accept_or_reject_interest/{eoi.id}/',
+                {'action': 'accept'})
+
+    def bulk_accept_prepare(index):
+        project = new_project(index, seats=len(applicants))
+        interests = ExpressionOfInterest.objects.bulk_create(
+            ExpressionOfInterest(project=project, user_id=user_id) for user_id in applicants[:20])
+        return (f'/api/projects/{project.id}/interests/bulk/',
+                [{'eoi_id': eoi.id, 'action': 'accept' if i % 2 else 'reject'}
+                 for i, eoi in enumerate(interests)])
+
+    def express_interest_cleanup(index):
+        ExpressionOfInterest.objects.filter(project=target, user=member).delete()
+
+    def credentials(prefix, index):
+        name = f'{prefix}_{index}_{time.monotonic_ns()}'
+        return {'username': name, 'password': SEED_PASSWORD, 'email': f'{name}@example.com'}
+
+    def static(url, data=None):
+        return lambda index: (url, data)
+
+    no_cache = {'RESPONSE_CACHE': {'TIMEOUT': 0}}
+    login = {'username': member.username, 'password': SEED_PASSWORD}
+    return [
+        Scenario('create_user', 'post',
+                 lambda index: ('/api/create_user/', credentials('bench_sync', index)),
+                 expected=201, max_repeat=HASHING_REPEAT),
+        Scenario('bulk_create_users', 'post',
+                 lambda index: ('/api/bulk_create_users/', [
+                     credentials(f'bench_bulk_{row}', index) for row in range(10)]),
+                 token=tokens[admin.pk], expected=201, max_repeat=2),
+        Scenario('reset_password', 'post', static('/api/reset_password/', login),
+                 max_repeat=HASHING_REPEAT),
+        Scenario('add_skill', 'post', static('/api/add_skill/', {'skill_name': skills[0]}),
+                 token=tokens[owner.pk], expected=201, cleanup=add_skill_cleanup),
+        Scenario('remove_skill', 'post', remove_skill_prepare, token=tokens[owner.pk]),
+        Scenario('replace_skills', 'put',
+                 lambda index: ('/api/skills/', {'skills': skills[3:6] if index % 2 else skills[:3]}),
+                 token=tokens[owner.pk]),
+        Scenario('create_project', 'post',
+                 lambda index: ('/api/create_project/', {
+                     'project_name': f'Bench created {index} {time.monotonic_ns()}',
+                     'description': 'Created by the endpoint benchmark',
+                     'maximum_collaborators': 3,
+                     'required_skills': skills[:2]}),
+                 token=tokens[member.pk], expected=201),
+        Scenario('available_projects', 'get', static('/api/available_projects/'),
+                 settings=no_cache),
+        Scenario('available_projects (cached)', 'get', static('/api/available_projects/')),
+        Scenario('recommended_projects', 'get', static('/api/recommended_projects/'),
+                 token=tokens[member.pk]),
+        Scenario('search_projects', 'get', static('/api/search_projects/', {'q': 'python'})),
+        Scenario('express_interest', 'post', static(f'/api/projects/{target.id}/express_interest/'),
+                 token=tokens[member.pk], expected=201, cleanup=express_interest_cleanup),
+        Scenario('close_project', 'post', close_project_prepare, token=tokens[owner.pk]),
+        Scenario('delete_project', 'delete', delete_project_prepare, token=tokens[owner.pk]),
+        Scenario('project_interests', 'get', static(f'/api/projects/{busiest.id}/interests/'),
+                 token=creator_token),
+        Scenario('accept_or_reject_interest', 'post', accept_prepare, token=tokens[owner.pk]),
+        Scenario('bulk_accept_or_reject_interests', 'post', bulk_accept_prepare,
+                 token=tokens[owner.pk]),
+        Scenario('get_user_analytics', 'get', static(f'/api/get_user_analytics/{member.id}/'),
+                 token=tokens[member.pk]),
+        Scenario('get_users_analytics', 'post',
+                 static('/api/get_user_analytics/batch/', {'user_ids': applicants}),
+                 token=tokens[admin.pk]),
+        Scenario('export_resource', 'get',
+                 static('/api/export/projects/', {'since': max(last_id - 1000, 0)}),
+                 token=tokens[admin.pk]),
+        Scenario('metrics', 'get', static('/api/metrics/'), token=tokens[admin.pk]),
+        Scenario('create_user_async', 'post',
+                 lambda index: ('/api/async/create_user/', credentials('bench_async', index)),
+                 expected=201, max_repeat=HASHING_REPEAT),
+        Scenario('reset_password_async', 'post', static('/api/async/reset_password/', login),
+                 max_repeat=HASHING_REPEAT),
+        Scenario('api_token_auth_async', 'post', static('/api/async/token/', login),
+                 max_repeat=HASHING_REPEAT),
+        Scenario('available_projects_async', 'get', static('/api/async/available_projects/'),
+                 settings=no_cache),
+        Scenario('project_interests_async', 'get',
+                 static(f'/api/async/projects/{busiest.id}/interests/'), token=creator_token),
+        Scenario('get_user_analytics_async', 'get',
+                 static(f'/api/async/get_user_analytics/{member.id}/'), token=tokens[member.pk]),
+        Scenario('api_token_auth', 'post', static('/api/token/', login),
+                 max_repeat=HASHING_REPEAT),
+    ]
+
+
+def create_fixture():
+    """
+    Users the scenarios act as: an admin, a seeded user with skills
+    (``member``) and a user owning the projects the write scenarios create
+    (``owner``).
+    """
+    from rest_framework.authtoken.models import Token
+
+    from api.models import User
+    from api.seeding import SEED_PASSWORD
+
+    password = User.objects.filter(username__startswith='seed_user_').values_list(
+        'password', flat=True).first()
+    admin = User.objects.create(username='bench_admin', is_staff=True, password=password)
+    owner = User.objects.create(username='bench_owner', password=password)
+    member = (User.objects.filter(username__startswith='seed_user_', programming_skills__isnull=False)
+              .order_by('id').first())
+    tokens = {}
+
+    def token_for(user):
+        if user.pk not in tokens:
+            tokens[user.pk] = Token.objects.get_or_create(user=user)[0].key
+        return tokens[user.pk]
+
+    for user in (admin, owner, member):
+        token_for(user)
+    assert password is not None and member is not None, f'seed users with {SEED_PASSWORD!r} first'
+    return {'admin': admin, 'member': member, 'owner': owner, 'tokens': tokens,
+            'token_for': token_for}
+
+
+def check_coverage(scenarios):
+    """
+    Fail when a route of the API has no scenario. Scenarios are named
+    after the URL names of their routes.
+    """
+    from api.urls import urlpatterns
+
+    routes = {pattern.name for pattern in urlpatterns} | {'api_token_auth'}
+    covered = {scenario.name.split(' ')[0] for scenario in scenarios}
+    missing = routes - covered
+    if missing:
+        raise SystemExit(f'No benchmark scenario for: {", ".join(sorted(missing))}')
+
+
+def run_scenario(client, scenario, repeat):
+    from django.test import override_settings
+
+    repeat = min(repeat, scenario.max_repeat or repeat)
+    with override_settings(**scenario.settings):
+        # Warm up the caches and connections the endpoint uses
+        scenario.call(client)
+
+        timings = []
+        queries = []
+        for _ in range(repeat):
+            _, elapsed, count = scenario.call(client)
+            timings.append(elapsed * 1000)
+            queries.append(count)
+
+        tracemalloc.start()
+        try:
+            peaks = []
+            for _ in range(min(repeat, MEMORY_REPEAT)):
+                tracemalloc.reset_peak()
+                current, _ = tracemalloc.get_traced_memory()
+                scenario.call(client)
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+
+    stats = summarize(timings)
+    return {
+        'requests': repeat,
+        'throughput_rps': round(repeat / (sum(timings) / 1000), 1),
+        'mean_ms': round(stats['mean_ms'], 3),
+        'p50_ms': round(stats['p50_ms'], 3),
+        'p95_ms': round(stats['p95_ms'], 3),
+        'p99_ms': round(stats['p99_ms'], 3),
+        # Queries depend on cache state, the median is the steady state
+        'queries': int(statistics.median_low(queries)),
+        'peak_kib': round(max(peaks) / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms, min_delta_kib):
+    """
+    Endpoints of ``results`` that regressed from ``baseline``.
+
+    Returns:
+        A list of ``(endpoint, reason)`` pairs.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline['endpoints'].get(name)
+        if base is None:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if (result[key] > base[key] * (1 + threshold)
+                    and result[key] - base[key] > min_delta_ms):
+                regressions.append((name, f'{key} {base[key]:.2f} -> {result[key]:.2f}'))
+        if result['queries'] > base['queries']:
+            regressions.append((name, f"queries {base['queries']} -> {result['queries']}"))
+        if (result['peak_kib'] > base['peak_kib'] * (1 + threshold)
+                and result['peak_kib'] - base['peak_kib'] > min_delta_kib):
+            regressions.append((name, f"peak_kib {base['peak_kib']} -> {result['peak_kib']}"))
+    return regressions
+
+
+def environment():
+    import django
+
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def run(args):
+    from rest_framework.test import APIClient
+
+    from api.seeding import SCALES, seed_database
+
+    counts = dict(SCALES[args.scale])
+    for kind in counts:
+        if getattr(args, kind) is not None:
+            counts[kind] = getattr(args, kind)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    client = APIClient()
+    results = {}
+    with test_database():
+        start = time.perf_counter()
+        seeded = seed_database(seed=args.seed, **counts)
+        print(f'Seeded {seeded} in {time.perf_counter() - start:.1f} s\n')
+
+        scenarios = build_scenarios(create_fixture())
+        if args.only:
+            scenarios = [scenario for scenario in scenarios
+                         if scenario.name.split(' ')[0] in args.only]
+        else:
+            check_coverage(scenarios)
+        for scenario in scenarios:
+            results[scenario.name] = run_scenario(client, scenario, args.repeat)
+
+    rows = []
+    for name, result in results.items():
+        base = baseline['endpoints'].get(name) if baseline else None
+        change = (f"{(result['p50_ms'] / base['p50_ms'] - 1) * 100:+.0f}%"
+                  if base and base['p50_ms'] else '')
+        rows.append((name, result['requests'], f"{result['throughput_rps']:.1f}",
+                     f"{result['p50_ms']:.2f}", f"{result['p95_ms']:.2f}",
+                     f"{result['p99_ms']:.2f}", result['queries'],
+                     f"{result['peak_kib']:.1f}", change))
+    print_table(('endpoint', 'requests', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms',
+                 'queries', 'peak KiB', 'p50 vs base'), rows)
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({'scale': counts, 'seed': args.seed, 'repeat': args.repeat,
+                       'environment': environment(), 'endpoints': results},
+                      baseline_file, indent=2)
+            baseline_file.write('\n')
+        print(f'\nBaseline written to {args.save}')
+
+    if baseline is not None:
+        if baseline.get('scale') != counts:
+            print(f"\nWarning: the baseline was recorded at scale {baseline.get('scale')}")
+        regressions = compare(results, baseline, args.threshold,
+                              args.min_delta_ms, args.min_delta_kib)
+        if regressions:
+            print('\nRegressions:')
+            for name, reason in regressions:
+                print(f'  {name}: {reason}')
+            return 1
+        print('\nNo regressions')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='small', choices=['small', 'medium', 'large'])
+    for kind in ('users', 'skills', 'projects', 'interests'):
+        parser.add_argument(f'--{kind}', type=int, help=f'override the {kind} of --scale')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--only', nargs='+', metavar='ENDPOINT')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='baseline to check the run against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative growth counted as a regression (default 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0)
+    parser.add_argument('--min-delta-kib', type=float, default=64.0)
+    args = parser.parse_args()
+
+    setup_django()
+    sys.exit(run(args))
+
+
+if __name__ == '__main__':
+    main()
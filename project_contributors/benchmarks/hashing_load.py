@@ -0,0 +1,89 @@
+"""
+Latency of available_projects while a burst of registrations is running,
+with and without the password hashing executor.
+
+Without an executor every async registration hashes its password on the
+event loop, so every other request waits behind it. With the executor the
+loop stays free and available_projects keeps its normal latency.
+
+    python -m benchmarks.hashing_load --registrations 20
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+
+
+async def registration_burst(client, prefix, count):
+    await asyncio.gather(*(
+        client.post('/api/async/create_user/',
+                    {'username': f'{prefix}{i}', 'password': f'secret-{i}',
+                     'email': f'{prefix}{i}@example.com'},
+                    content_type='application/json')
+        for i in range(count)))
+
+
+async def poll_listing(client, done, latencies):
+    while not done.is_set():
+        start = time.perf_counter()
+        response = await client.get('/api/available_projects/')
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+        await asyncio.sleep(0.005)
+
+
+async def scenario(prefix, registrations):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    done = asyncio.Event()
+    latencies = []
+    poller = asyncio.create_task(poll_listing(client, done, latencies))
+    start = time.perf_counter()
+    await registration_burst(client, prefix, registrations)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await poller
+    latencies.sort()
+    return elapsed, latencies
+
+
+def run(registrations, workers):
+    from django.test import override_settings
+
+    from api.models import OpenSourceProject, User
+
+    rows = []
+    with test_database():
+        creator = User.objects.create_user(username='creator', password='password')
+        OpenSourceProject.objects.bulk_create(
+            OpenSourceProject(project_name=f'Project {i}', description='Description',
+                              maximum_collaborators=5, creator=creator)
+            for i in range(200))
+
+        for label, config in (('inline', {'KIND': None}),
+                              ('thread pool', {'KIND': 'thread', 'WORKERS': workers})):
+            with override_settings(PASSWORD_HASHING_EXECUTOR=config):
+                elapsed, latencies = asyncio.run(
+                    scenario(label.replace(' ', '_'), registrations))
+            rows.append((label, registrations, f'{elapsed:.2f}', len(latencies),
+                         f'{percentile(latencies, 50):.1f}',
+                         f'{percentile(latencies, 99):.1f}'))
+
+    print_table(('executor', 'registrations', 'burst s', 'listing calls',
+                 'listing p50 ms', 'listing p99 ms'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--registrations', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.registrations, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark the request-thread cost of logging under each logging profile.
+
+For every profile, reports the latency of the available_projects listing
+(response cache disabled, so each request runs its queries and logs) and
+the time a single ``logger.info`` call takes on the calling thread. Log
+output goes to files in a temporary directory. ``--sink-delay-ms`` makes
+every write to those files that much slower, standing in for a busy disk
+or a remote log collector.
+
+Profiles:
+  off            no handlers, the floor
+  development    settings.DEVELOPMENT_LOGGING with SQL logging, as with DEBUG on
+  dev-no-sql     settings.DEVELOPMENT_LOGGING, SQL logging off
+  production     settings.PRODUCTION_LOGGING (queue + JSON writer thread)
+  production-10% the same, keeping 10% of the api INFO records
+
+    python -m benchmarks.logging_pipeline --projects 1000 --repeat 200
+    python -m benchmarks.logging_pipeline --sink-delay-ms 1
+"""
+import argparse
+import contextlib
+import copy
+import logging
+import logging.config
+import os
+import tempfile
+import time
+
+from benchmarks.available_projects import seed_projects
+from benchmarks.common import measure, print_table, setup_django, test_database
+
+
+class SlowFileHandler(logging.FileHandler):
+    """
+    FileHandler taking ``delay_ms`` longer to write every record.
+    """
+
+    def __init__(self, filename, delay_ms=0, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.delay = delay_ms / 1000
+
+    def emit(self, record):
+        if self.delay:
+            time.sleep(self.delay)
+        super().emit(record)
+
+
+def file_handler(config, filename, delay_ms):
+    handler = config['handlers']['file']
+    handler.pop('class')
+    handler.update({'()': SlowFileHandler, 'filename': filename, 'delay_ms': delay_ms})
+
+
+def profiles(directory, delay_ms):
+    from django.conf import settings
+
+    development = copy.deepcopy(settings.DEVELOPMENT_LOGGING)
+    file_handler(development, os.path.join(directory, 'development.log'), delay_ms)
+
+    production = copy.deepcopy(settings.PRODUCTION_LOGGING)
+    file_handler(production, os.path.join(directory, 'production.log'), delay_ms)
+    sampled = copy.deepcopy(production)
+    sampled['handlers']['file']['filename'] = os.path.join(directory, 'sampled.log')
+    sampled['filters']['sample_info']['rate'] = 0.1
+
+    return [
+        ('off', {'version': 1, 'disable_existing_loggers': False,
+                 'root': {'level': 'WARNING'}}, False),
+        ('development', development, True),
+        ('dev-no-sql', development, False),
+        ('production', production, False),
+        ('production-10%', sampled, False),
+    ]
+
+
+def reset_logging():
+    """
+    Stop the handlers of the previous profile, flushing queued records.
+    """
+    for name in [None, 'django', 'django.db.backends', 'api']:
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+        logger.filters.clear()
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def run(projects, repeat, delay_ms):
+    from django.db import connection
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    logger = logging.getLogger('api.views')
+    rows = []
+    with test_database(), tempfile.TemporaryDirectory() as directory:
+        seed_projects(projects)
+        console = open(os.path.join(directory, 'console.log'), 'w')
+        for name, config, log_sql in profiles(directory, delay_ms):
+            reset_logging()
+            # The console handler binds to sys.stderr when it is configured
+            with contextlib.redirect_stderr(console):
+                logging.config.dictConfig(config)
+            connection.force_debug_cursor = log_sql
+            try:
+                with override_settings(RESPONSE_CACHE={'TIMEOUT': 0}):
+                    client.get('/api/available_projects/')
+                    stats = measure(lambda: client.get('/api/available_projects/'),
+                                    repeat=repeat)
+                call_stats = measure(
+                    lambda: logger.info('Project %s closed by user %s', 42, 'bench_user'),
+                    repeat=repeat * 10)
+            finally:
+                connection.force_debug_cursor = False
+            rows.append((name, f"{stats['mean_ms']:.3f}", f"{stats['p50_ms']:.3f}",
+                         f"{stats['p99_ms']:.3f}", f"{call_stats['p50_ms'] * 1000:.1f}",
+                         f"{call_stats['p99_ms'] * 1000:.1f}"))
+        reset_logging()
+        console.close()
+
+    print_table(('profile', 'req mean ms', 'req p50 ms', 'req p99 ms',
+                 'log call p50 us', 'log call p99 us'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--sink-delay-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.projects, args.repeat, args.sink_delay_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Concurrency benchmarks against a local PostgreSQL server, with the
+'postgres' database profile (see ``DATABASES`` in settings.py). A
+throw-away test database, test_<POSTGRES_DB>, is created on the server.
+
+mixed   the workload of benchmarks.sqlite_concurrency (available_projects
+        reads, express_interest and PUT skills/ writes) at each thread
+        count of ``--threads``.
+triage  applicants express interest in a few projects while the creators
+        accept them, through accept_or_reject_interest and bulk triage at
+        the same time. Bulk triage skips (SKIP LOCKED) the interests a
+        single accept is holding and reports them as busy; its NO KEY
+        UPDATE lock on the project lets new interests in meanwhile.
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:16
+    pip install -r requirements-postgres.txt
+    DATABASE_PROFILE=postgres POSTGRES_PASSWORD=postgres python -m benchmarks.postgres
+"""
+import argparse
+import logging
+import random
+import sys
+import threading
+import time
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+from benchmarks.sqlite_concurrency import run_workload, seed_workload, workload_row
+
+
+# Interests accepted per bulk triage request
+TRIAGE_BATCH = 20
+
+BUSY_ERROR = 'Expression of interest is being updated, please retry'
+
+
+def run_mixed(thread_counts, seconds, write_share):
+    from django.db import connection
+
+    rows = []
+    with test_database():
+        tokens, project_ids = seed_workload(max(thread_counts))
+        connection.close()
+        for threads in thread_counts:
+            results = run_workload(tokens[:threads], project_ids, seconds, write_share)
+            rows.append([threads] + workload_row(results, seconds))
+    print_table(('threads', 'reads/s', 'read p50 ms', 'read p99 ms', 'writes/s',
+                 'write p50 ms', 'write p99 ms', 'errors'), rows)
+
+
+def request(results, kind, call):
+    """
+    Time ``call()`` as one request of ``kind``, then release the connection
+    like the WSGI handler does.
+    """
+    from django.db import DatabaseError, close_old_connections
+
+    start = time.perf_counter()
+    busy = 0
+    try:
+        response = call()
+        ok = response.status_code < 500
+        if kind == 'bulk triage' and ok:
+            busy = sum(result.get('error') == BUSY_ERROR for result in response.data['results'])
+    except DatabaseError:
+        ok = False
+    finally:
+        close_old_connections()
+    results.append((kind, (time.perf_counter() - start) * 1000, ok, busy))
+
+
+def applicant(index, tokens, project_ids, deadline, results):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    # Every (user, project) pair once, spread over the applicant threads
+    pairs = [(token, project_id) for token in tokens for project_id in project_ids]
+    for token, project_id in pairs[index::len(tokens)]:
+        if time.perf_counter() >= deadline:
+            break
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        request(results, 'express_interest',
+                lambda: client.post(f'/api/projects/{project_id}/express_interest/'))
+
+
+def creator(kind, token, project_id, deadline, results):
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    from api.models import ExpressionOfInterest
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+    rng = random.Random(project_id)
+    try:
+        while time.perf_counter() < deadline:
+            pending = list(ExpressionOfInterest.objects.filter(
+                project_id=project_id, status='pending'
+            ).order_by('id').values_list('id', flat=True)[:TRIAGE_BATCH])
+            if not pending:
+                time.sleep(0.001)
+                continue
+            if kind == 'bulk triage':
+                request(results, kind, lambda: client.post(
+                    f'/api/projects/{project_id}/interests/bulk/',
+                    [{'eoi_id': eoi_id, 'action': 'accept'} for eoi_id in pending],
+                    format='json'))
+            else:
+                # Among the interests bulk triage is about to take
+                eoi_id = rng.choice(pending)
+                request(results, kind, lambda: client.post(
+                    f'/api/projects/{project_id}/accept_or_reject_interest/{eoi_id}/',
+                    {'action': 'accept'}, format='json'))
+    finally:
+        connection.close()
+
+
+def run_triage(projects, applicants, seconds):
+    from django.db import connection
+    from rest_framework.authtoken.models import Token
+
+    from api.models import OpenSourceProject, User
+    from api.seeding import seed_database
+
+    with test_database():
+        seed_database(users=projects + applicants, skills=10, projects=0, interests=0)
+        users = list(User.objects.order_by('id'))
+        tokens = {token.user_id: token.key for token in Token.objects.bulk_create(
+            Token(user=user, key=Token.generate_key()) for user in users)}
+        creators, applicant_users = users[:projects], users[projects:]
+        project_ids = [OpenSourceProject.objects.create(
+            project_name=f'Triage {index}', description='Triage benchmark',
+            maximum_collaborators=1000000, creator=user, status='active').id
+            for index, user in enumerate(creators)]
+        connection.close()
+
+        results = []
+        deadline = time.perf_counter() + seconds
+        applicant_tokens = [tokens[user.id] for user in applicant_users]
+        threads = [threading.Thread(target=applicant, args=(
+            index, applicant_tokens, project_ids, deadline, results))
+            for index in range(min(8, len(applicant_tokens)))]
+        for user, project_id in zip(creators, project_ids):
+            for kind in ('bulk triage', 'single accept'):
+                threads.append(threading.Thread(target=creator, args=(
+                    kind, tokens[user.id], project_id, deadline, results)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    rows = []
+    for kind in ('express_interest', 'single accept', 'bulk triage'):
+        latencies = sorted(ms for op, ms, ok, busy in results if op == kind and ok)
+        rows.append((kind, f'{len(latencies) / seconds:.1f}', f'{percentile(latencies, 50):.1f}',
+                     f'{percentile(latencies, 99):.1f}',
+                     sum(not ok for op, ms, ok, busy in results if op == kind),
+                     sum(busy for op, ms, ok, busy in results if op == kind)))
+    print_table(('request', 'req/s', 'p50 ms', 'p99 ms', 'errors', 'busy interests'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', default='1,4,8,16',
+                        help='Comma-separated thread counts of the mixed workload')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-share', type=float, default=0.2)
+    parser.add_argument('--projects', type=int, default=4,
+                        help='Projects triaged concurrently in the triage benchmark')
+    parser.add_argument('--applicants', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+
+    if connection.vendor != 'postgresql':
+        sys.exit('Run with DATABASE_PROFILE=postgres, see the docstring')
+    # Rejected duplicate interests and retried triage items log warnings
+    logging.disable(logging.ERROR)
+
+    database = settings.DATABASES['default']
+    pool = database['OPTIONS'].get('pool')
+    print(f"PostgreSQL at {database['HOST']}:{database['PORT']}, "
+          + (f'pool {pool}' if pool else f"CONN_MAX_AGE={database['CONN_MAX_AGE']}"))
+    print('\nmixed workload')
+    run_mixed([int(count) for count in args.threads.split(',')], args.seconds, args.write_share)
+    print('\ntriage')
+    run_triage(args.projects, args.applicants, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
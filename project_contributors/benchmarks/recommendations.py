@@ -0,0 +1,98 @@
+"""
+Benchmark project recommendations as the projects table grows.
+
+Reports the time to build the skill index, to rank all projects for one
+user straight from the index, and the latency of the recommended_projects
+endpoint (index lookup plus the database check of the candidates).
+
+    python -m benchmarks.recommendations --sizes 1000 10000 100000
+"""
+import argparse
+import time
+
+from benchmarks.common import count_queries, measure, print_table, setup_django, test_database
+
+SKILLS = 50
+
+
+def seed_projects(count, skills_per_project=3):
+    from api.models import OpenSourceProject, ProgrammingSkill, User
+
+    skills = ProgrammingSkill.objects.bulk_create(
+        ProgrammingSkill(name=f'Skill {i}') for i in range(SKILLS))
+    creators = User.objects.bulk_create(
+        User(username=f'bench_creator_{i}', password='!') for i in range(10))
+    OpenSourceProject.objects.bulk_create(
+        (OpenSourceProject(
+            project_name=f'Project {i}',
+            description=f'Description for project {i}',
+            maximum_collaborators=3,
+            current_collaborators=i % 4,
+            status='closed' if i % 10 == 0 else 'active',
+            creator=creators[i % len(creators)],
+        ) for i in range(count)),
+        batch_size=1000)
+
+    # Spread the skills so that every combination of matches occurs
+    through = OpenSourceProject.required_skills.through
+    through.objects.bulk_create(
+        (through(opensourceproject_id=project_id,
+                 programmingskill_id=skills[(project_id * (j + 1) * 7) % SKILLS].id)
+         for project_id in OpenSourceProject.objects.values_list('id', flat=True)
+         for j in range(skills_per_project)),
+        batch_size=1000, ignore_conflicts=True)
+
+    user = User.objects.create(username='bench_user', password='!')
+    user.programming_skills.add(*skills[:3])
+    return user
+
+
+def run(sizes, repeat, limit):
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    from api.recommendations import project_index
+
+    rows = []
+    for size in sizes:
+        with test_database():
+            user = seed_projects(size)
+            skill_ids = list(user.programming_skills.values_list('id', flat=True))
+            client = APIClient()
+            client.force_authenticate(user=user)
+
+            start = time.perf_counter()
+            project_index.rebuild()
+            build_ms = (time.perf_counter() - start) * 1000
+
+            ranked = len(list(project_index.rank(skill_ids)))
+            rank_stats = measure(lambda: list(project_index.rank(skill_ids)),
+                                 repeat=repeat)
+            url = f'/api/recommended_projects/?limit={limit}'
+            with count_queries(connection) as queries:
+                response = client.get(url)
+            assert response.status_code == 200, response.status_code
+            stats = measure(lambda: client.get(url), repeat=repeat)
+            rows.append((size, ranked, f'{build_ms:.0f}',
+                         f"{rank_stats['p50_ms']:.2f}", queries['queries'],
+                         f"{stats['p50_ms']:.2f}", f"{stats['p99_ms']:.2f}"))
+            project_index.clear()
+
+    print_table(('projects', 'ranked', 'build ms', 'rank p50 ms', 'queries',
+                 'p50 ms', 'p99 ms'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.repeat, args.limit)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark project search as the projects table grows.
+
+Compares the FTS5 backed search_projects endpoint with the LIKE '%term%'
+scan it replaces, for a selective word, a selective prefix query and a
+query matching most of the table (every match has to be ranked).
+
+    python -m benchmarks.search --sizes 1000 10000 100000
+"""
+import argparse
+import random
+
+from benchmarks.common import measure, print_table, setup_django, test_database
+
+WORDS = ('python', 'django', 'rust', 'compiler', 'web', 'api', 'database',
+         'game', 'engine', 'docs', 'parser', 'async', 'queue', 'cache',
+         'search', 'index', 'graph', 'mobile', 'cloud', 'security')
+
+
+def seed_projects(count):
+    from api.models import OpenSourceProject, User
+
+    rng = random.Random(count)
+    creator = User.objects.create(username='bench_creator', password='!')
+    OpenSourceProject.objects.bulk_create(
+        (OpenSourceProject(
+            project_name=f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+            description=' '.join(rng.choice(WORDS) for _ in range(40))
+                        + f' project{i}',
+            maximum_collaborators=3,
+            creator=creator,
+        ) for i in range(count)),
+        batch_size=1000)
+
+
+def run(sizes, repeat):
+    from rest_framework.test import APIClient
+
+    from api.models import OpenSourceProject
+
+    client = APIClient()
+    rows = []
+    for size in sizes:
+        with test_database():
+            seed_projects(size)
+            term = f'project{size // 2}'
+
+            def like():
+                return list(OpenSourceProject.objects.filter(
+                    description__icontains=term)[:20])
+
+            assert len(like()) == 1
+            like_stats = measure(like, repeat=repeat)
+            fts_stats = measure(
+                lambda: client.get('/api/search_projects/', {'q': term}), repeat=repeat)
+            prefix_stats = measure(
+                lambda: client.get('/api/search_projects/', {'q': term[:-1] + '*'}),
+                repeat=repeat)
+            common_stats = measure(
+                lambda: client.get('/api/search_projects/', {'q': 'pyth*'}),
+                repeat=repeat)
+            rows.append((size, f"{like_stats['p50_ms']:.2f}",
+                         f"{fts_stats['p50_ms']:.2f}", f"{fts_stats['p99_ms']:.2f}",
+                         f"{prefix_stats['p50_ms']:.2f}", f"{common_stats['p50_ms']:.2f}"))
+
+    print_table(('projects', 'LIKE p50 ms', 'FTS p50 ms', 'FTS p99 ms',
+                 'prefix p50 ms', 'common p50 ms'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""
+Settings for benchmark runs against real server processes.
+
+Same as the project settings, but production-like (no DEBUG, no SQL
+logging) and pointed at the database file named by the
+``BENCHMARK_DATABASE`` environment variable.
+"""
+import os
+
+from project_contributors.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BENCHMARK_DATABASE'],
+    }
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'root': {'level': 'WARNING'},
+}
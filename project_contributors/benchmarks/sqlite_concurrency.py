@@ -0,0 +1,166 @@
+"""
+Read and write throughput of concurrent requests on a SQLite file, under
+the development and production database profiles (see ``DATABASES`` in
+settings.py).
+
+Every thread plays one user. Each request is a write with probability
+``--write-share``, otherwise an available_projects read (response cache
+off). Writes alternate between express_interest and PUT skills/, which
+reads the current skills before changing them inside a transaction.
+After every request the thread calls ``close_old_connections()``, as the
+WSGI handler does, so CONN_MAX_AGE decides whether connections are reused.
+Requests failing with a database error ("database is locked") are counted
+as errors.
+
+    python -m benchmarks.sqlite_concurrency --threads 8 --seconds 5
+"""
+import argparse
+import copy
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+
+
+PROFILE_KEYS = ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS', 'PRAGMAS', 'TRANSACTION_MODE')
+
+
+def apply_profile(name):
+    """
+    Switch the settings of the default connection to a database profile.
+    Connections opened afterwards, in any thread, use them.
+    """
+    from django.conf import settings
+    from django.db import connection
+
+    profile = getattr(settings, f'{name.upper()}_DATABASES')['default']
+    for key in PROFILE_KEYS:
+        connection.settings_dict.pop(key, None)
+    connection.settings_dict.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS={})
+    connection.settings_dict.update(
+        {key: copy.deepcopy(value) for key, value in profile.items() if key in PROFILE_KEYS})
+
+
+def worker(index, token, project_ids, skills, deadline, write_share, results):
+    from django.db import DatabaseError, close_old_connections, connection
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+    rng = random.Random(index)
+    projects = iter(rng.sample(project_ids, len(project_ids)))
+    writes = 0
+    try:
+        while time.perf_counter() < deadline:
+            write = rng.random() < write_share
+            start = time.perf_counter()
+            try:
+                if not write:
+                    response = client.get('/api/available_projects/')
+                elif writes % 2 == 0:
+                    response = client.post(f'/api/projects/{next(projects)}/express_interest/')
+                else:
+                    response = client.put('/api/skills/', {'skills': rng.sample(skills, 2)},
+                                          format='json')
+                ok = response.status_code < 500
+            except DatabaseError:
+                ok = False
+            finally:
+                close_old_connections()
+            writes += write
+            results.append(('write' if write else 'read', (time.perf_counter() - start) * 1000, ok))
+    finally:
+        connection.close()
+
+
+def run_workload(tokens, project_ids, seconds, write_share):
+    """
+    Run one worker thread per token for ``seconds``.
+
+    Returns:
+        A list of ``(kind, ms, ok)`` tuples, one per request.
+    """
+    from django.test import override_settings
+
+    from api.seeding import SKILL_NAMES
+
+    results = []
+    deadline = time.perf_counter() + seconds
+    with override_settings(RESPONSE_CACHE={'TIMEOUT': 0}):
+        workers = [threading.Thread(target=worker, args=(
+            index, token, project_ids, list(SKILL_NAMES[:10]), deadline, write_share, results))
+            for index, token in enumerate(tokens)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    return results
+
+
+def workload_row(results, seconds):
+    """
+    Throughput, p50 and p99 of the reads, then the writes, then the error count.
+    """
+    row = []
+    for kind in ('read', 'write'):
+        latencies = sorted(ms for op, ms, ok in results if op == kind and ok)
+        row += [f'{len(latencies) / seconds:.1f}', f'{percentile(latencies, 50):.1f}',
+                f'{percentile(latencies, 99):.1f}']
+    row.append(sum(not ok for op, ms, ok in results))
+    return row
+
+
+def seed_workload(threads):
+    """
+    Seed the small scale and return the tokens of ``threads`` users and the
+    ids of all projects.
+    """
+    from rest_framework.authtoken.models import Token
+
+    from api.models import OpenSourceProject, User
+    from api.seeding import SCALES, seed_database
+
+    seed_database(**SCALES['small'])
+    tokens = [Token.objects.create(user=user).key
+              for user in User.objects.order_by('id')[:threads]]
+    return tokens, list(OpenSourceProject.objects.values_list('id', flat=True))
+
+
+def run_profile(name, threads, seconds, write_share):
+    from django.db import connection
+
+    apply_profile(name)
+    with tempfile.TemporaryDirectory() as directory, \
+            test_database(name=os.path.join(directory, 'concurrency.sqlite3')):
+        tokens, project_ids = seed_workload(threads)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode, = cursor.fetchone()
+        connection.close()
+        results = run_workload(tokens, project_ids, seconds, write_share)
+    return [name, journal_mode] + workload_row(results, seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-share', type=float, default=0.2)
+    args = parser.parse_args()
+
+    setup_django()
+    # Locked-database tracebacks and rejected duplicate interests are
+    # expected here, and would bury the results
+    logging.disable(logging.ERROR)
+    rows = [run_profile(name, args.threads, args.seconds, args.write_share)
+            for name in ('development', 'production')]
+    print_table(('profile', 'journal', 'reads/s', 'read p50 ms', 'read p99 ms',
+                 'writes/s', 'write p50 ms', 'write p99 ms', 'errors'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,13 +50,135 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         # Add other authentication classes if needed
     ],
     # Other REST framework settings...
 }
 
-LOGGING = {
+# In-process cache of token -> user lookups (see api/authentication.py)
+TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,  # seconds
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'project-contributors',
+    },
+    # Shared by all the worker processes of a host:
+    # 'default': {
+    #     'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    #     'LOCATION': '/var/tmp/project_contributors_cache',
+    # },
+}
+
+# Versioned cache of the available_projects responses (see api/cache.py).
+# TIMEOUT 0 disables it.
+RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Pagination of the listing endpoints (see api/pagination.py)
+AVAILABLE_PROJECTS_PAGE_SIZE = 50
+PROJECT_INTERESTS_PAGE_SIZE = 50
+PROJECT_SEARCH_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 500
+
+# Seconds after which each process rebuilds its project recommendation
+# index, to pick up changes made by other processes. Until then those
+# changes are missing from its recommendations (see api/recommendations.py).
+RECOMMENDATIONS_INDEX_TTL = 30
+
+# Seconds between checks of the skill vocabulary generation, i.e. how long
+# other processes may keep resolving a renamed or deleted skill
+# (see api/skills.py)
+SKILL_VOCABULARY_CHECK_INTERVAL = 5
+
+# Maximum number of users per batch analytics request
+ANALYTICS_BATCH_MAX_USERS = 1000
+
+# Bulk user registration (see api.views.bulk_create_users). Every row is
+# hashed within the request, about 0.2 s of CPU with the default PBKDF2
+# hasher, so a full request keeps 4 hashing workers busy for about a minute.
+# Larger imports are split over several requests.
+BULK_USER_BATCH_SIZE = 1000
+BULK_USER_MAX_ROWS = 1000
+# Bulk accept/reject of interests (see api.views.bulk_accept_or_reject_interests)
+BULK_INTEREST_MAX_ITEMS = 1000
+# Executor the async views and bulk registration hash and verify passwords
+# on (see api/hashing.py).
+# KIND is 'thread', 'process' or None to hash inline; WORKERS defaults to
+# the CPU count.
+PASSWORD_HASHING_EXECUTOR = {
+    'KIND': 'thread',
+    'WORKERS': 4,
+}
+
+# Per-request query count and timings (see api/middleware.py): HEADER sends
+# them in a Server-Timing header, LOG writes one api.middleware INFO record
+# per request.
+REQUEST_METRICS = {
+    'HEADER': True,
+    'LOG': True,
+}
+# Most queries a request to each endpoint (URL name) may run. Going over
+# logs a warning, and fails the test under QueryBudgetTestRunner. The
+# counts are the constant cost of each endpoint on a cold process (token,
+# skill vocabulary, recommendation index and response caches empty), as
+# measured with benchmarks.endpoints. Writes saving a project also allow for
+# the two queries re-reading it into the recommendation index once that is
+# loaded. Writes include the single refresh of the user analytics summaries
+# done when their transaction commits, which updates and inserts summaries
+# in batches of about 100 users on SQLite: deleting or triaging a project
+# with more related users costs a query per extra batch, and deleting a
+# project also deletes its interests by 100. Endpoints whose query count
+# grows with the request body (bulk_create_users) or that stream
+# (export_resource) have no budget.
+QUERY_BUDGETS = {
+    'create_user': 3,
+    'create_user_async': 3,
+    'reset_password': 3,
+    'reset_password_async': 3,
+    'api_token_auth': 5,
+    'api_token_auth_async': 5,
+    'add_skill': 14,
+    'remove_skill': 12,
+    'replace_skills': 11,
+    'create_project': 16,
+    'available_projects': 2,
+    'available_projects_async': 2,
+    'recommended_projects': 5,
+    'search_projects': 1,
+    'express_interest': 9,
+    'close_project': 4,
+    'delete_project': 15,
+    'project_interests': 7,
+    'project_interests_async': 7,
+    'accept_or_reject_interest': 12,
+    'bulk_accept_or_reject_interests': 15,
+    'get_user_analytics': 6,
+    'get_user_analytics_async': 7,
+    'get_users_analytics': 6,
+    'metrics': 1,
+}
+QUERY_BUDGETS_STRICT = False
+TEST_RUNNER = 'api.test_runner.QueryBudgetTestRunner'
+
+# Logging profiles, picked with the LOG_PROFILE environment variable.
+#
+# 'development' (default) writes everything, SQL included, to the console
+# and django.log from the request thread.
+#
+# 'production' writes JSON lines to LOG_FILE (default django.log) from a
+# background thread fed by a bounded queue (see api/logs.py). Django logs
+# at INFO without SQL and the api loggers keep a LOG_SAMPLE_RATE fraction
+# (default 1) of their INFO records. Warnings and errors are always kept.
+LOG_PROFILE = os.environ.get('LOG_PROFILE', 'development')
+
+DEVELOPMENT_LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'handlers': {
@@ -76,10 +201,59 @@ LOGGING = {
     },
 }
 
+PRODUCTION_LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'api.logs.JsonFormatter'},
+    },
+    'filters': {
+        'sample_info': {
+            '()': 'api.logs.SamplingFilter',
+            'rate': float(os.environ.get('LOG_SAMPLE_RATE', 1)),
+            'name': 'api',
+        },
+    },
+    'handlers': {
+        'file': {
+            'class': 'logging.FileHandler',
+            'filename': os.environ.get('LOG_FILE', 'django.log'),
+            'formatter': 'json',
+        },
+        # Configured after 'file', which it writes to
+        # Samples on the handler, which sees the records of api.views,
+        # api.middleware and the other child loggers too
+        'queue': {
+            '()': 'api.logs.QueueListenerHandler',
+            'handlers': ['cfg://handlers.file'],
+            'queue_size': 10000,
+            'filters': ['sample_info'],
+        },
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'django.db.backends': {
+            'level': 'WARNING',
+        },
+        'api': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+LOGGING = PRODUCTION_LOGGING if LOG_PROFILE == 'production' else DEVELOPMENT_LOGGING
 
 AUTH_USER_MODEL = 'api.User'
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
+    'api.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -112,13 +286,108 @@ WSGI_APPLICATION = 'project_contributors.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+#
+# Database profiles, picked with the DATABASE_PROFILE environment variable.
+#
+# 'development' (default) is Django's stock SQLite configuration.
+#
+# 'postgres' connects to PostgreSQL (needs psycopg, see
+# requirements-postgres.txt) as configured by the POSTGRES_DB,
+# POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST and POSTGRES_PORT
+# environment variables. Connections come from Django's psycopg pool on
+# Django 5.1 and later, and are kept open across requests on older versions.
+# POSTGRES_PGBOUNCER=1 suits a PgBouncer in transaction pooling mode in
+# front of the server, which breaks server-side cursors.
+#
+# 'production' keeps connections open across requests and tunes every new
+# SQLite connection (see api/database.py). It uses the WAL journal, so
+# readers never wait for the writer, and synchronous=NORMAL, which only
+# fsyncs at checkpoints. Pages are read through a memory map and a larger
+# cache, and temporary tables stay in memory. Transactions take the write
+# lock when they begin (BEGIN IMMEDIATE), so concurrent writers wait up to
+# the busy timeout instead of failing with "database is locked".
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'development')
+
+DEVELOPMENT_DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
 
-DATABASES = {
+PRODUCTION_DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds a connection is reused for, health-checked before reuse.
+        # Set CONN_MAX_AGE=0 when serving through ASGI, where Django does
+        # not support persistent connections.
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a statement waits for a lock before failing
+            'timeout': 20,
+        },
+        # Set on every new connection, in this order
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,  # negative: KiB rather than pages
+            'temp_store': 'MEMORY',
+        },
+        # BEGIN of transaction.atomic() blocks: DEFERRED, IMMEDIATE or EXCLUSIVE
+        'TRANSACTION_MODE': 'IMMEDIATE',
+    }
+}
+
+POSTGRES_DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'project_contributors'),
+        'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('POSTGRES_PGBOUNCER') == '1',
+        'OPTIONS': {},
     }
 }
+if django.VERSION >= (5, 1):
+    # Pooled connections go back to the pool at the end of every request,
+    # and cannot also be persistent
+    POSTGRES_DATABASES['default']['CONN_MAX_AGE'] = 0
+    POSTGRES_DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', 10)),
+        # Seconds a request waits for a free connection
+        'timeout': 10,
+    }
+
+DATABASES = {
+    'production': PRODUCTION_DATABASES,
+    'postgres': POSTGRES_DATABASES,
+}.get(DATABASE_PROFILE, DEVELOPMENT_DATABASES)
+
+# Read replicas of the default database, from the DATABASE_REPLICAS
+# environment variable: comma-separated SQLite files, kept in sync with the
+# primary by a replication tool or, locally, by `manage.py sync_replicas`,
+# or PostgreSQL standby hosts with the 'postgres' profile.
+# The reads of GET, HEAD and OPTIONS requests go to one of them, the rest
+# to the primary (see api/routers.py). In tests, they mirror the default
+# test database.
+DATABASE_REPLICAS = []
+for index, location in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), 1):
+    DATABASE_REPLICAS.append(f'replica{index}')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST' if DATABASE_PROFILE == 'postgres' else 'NAME': location.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.routers.PrimaryReplicaRouter']
 
 
 # Password validation